@@ -21,6 +21,7 @@ class ImageSettings(BaseSettings):
     # PNG Optimization
     ENABLE_PNG_OPTIMIZATION: bool = True
     PNG_COMPRESSION_LEVEL: int = 6 # Pillow: 0 (no compression) to 9 (max)
+    MIN_OPTIMIZE_BYTES: int = 50_000 # Smaller PNGs are returned as-is: re-encoding costs more than it saves
 
     # Cache (Placeholder for future, not implemented in current scope)
     # ENABLE_IMAGE_CACHE: bool = False
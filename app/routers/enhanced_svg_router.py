@@ -11,7 +11,7 @@ from app.models import SVGChartRequest, NatalChartRequest, TransitRequest
 from pydantic import BaseModel, Field as PydanticField # Aliased Field to avoid conflict with fastapi.Query if any confusion
 from app.security import verify_api_key
 from app.utils.astro_helpers import create_subject
-from app.utils.image_converter import convert_svg_to_png # Added for PNG conversion
+from app.utils.image_converter import convert_svg_to_png_async # Added for PNG conversion
 from app.svg.enhanced_svg_generator import EnhancedSVGGenerator
 from app.config.image_settings import image_settings # Added image_settings import
 from kerykeion import CompositeSubjectFactory # Added for composite charts
@@ -156,7 +156,7 @@ async def generate_enhanced_svg_chart(
 
         if format == "png":
             try:
-                png_content = convert_svg_to_png(
+                png_content = await convert_svg_to_png_async(
                     svg_content,
                     quality=png_quality,
                     width=png_width,
@@ -222,7 +222,7 @@ async def convert_svg_to_png_endpoint(
     request_data: SVGToPNGConversionRequest = Body(...)
 ):
     try:
-        png_content = convert_svg_to_png(
+        png_content = await convert_svg_to_png_async(
             svg_content=request_data.svg_content,
             quality=request_data.quality,
             width=request_data.width,
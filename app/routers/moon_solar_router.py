@@ -5,7 +5,7 @@ try:
 except ImportError:
     SolarReturn = None # Placeholder if import fails
 from app.security import verify_api_key
-from app.utils.astro_helpers import create_subject, get_house_from_kerykeion_attribute, PLANETS_MAP, HOUSE_NUMBER_TO_NAME_BASE # Added PLANETS_MAP, HOUSE_NUMBER_TO_NAME_BASE
+from app.utils.astro_helpers import create_subject, get_house_from_kerykeion_attribute, extract_all_planets, HOUSE_NUMBER_TO_NAME_BASE
 from app.models import (
     NatalChartRequest, SolarReturnRequestModel as SolarReturnRequest,
     SolarReturnResponseModel as SolarReturnResponse, SolarReturnChartDetails,
@@ -232,10 +232,8 @@ def calculate_solar_return(birth_year: int, birth_month: int, birth_day: int,
         # 4. Populate SolarReturnChartDetails if sr_subject_for_calculations exists
         if sr_subject_for_calculations and precise_sr_datetime: # Ensure precise_sr_datetime is also available
             planets_sr_dict: Dict[str, PlanetData] = {}
-            for k_name, api_name in PLANETS_MAP.items():
-                planet_pos_data = get_planet_data(sr_subject_for_calculations, k_name, api_name)
-                if planet_pos_data:
-                    planets_sr_dict[api_name] = PlanetData(**planet_pos_data.model_dump()) # Convert PlanetPosition to PlanetData
+            for planet_pos_data in extract_all_planets(sr_subject_for_calculations).values():
+                planets_sr_dict[planet_pos_data.name] = PlanetData(**planet_pos_data.model_dump()) # Convert PlanetPosition to PlanetData
 
             houses_sr_dict: Dict[str, HouseCuspData] = {}
             for i in range(1, 13):
@@ -458,10 +456,8 @@ async def calculate_lunar_return_data(
 
     if lr_subject_instance and precise_lr_dt_obj: # Proceed only if we have a subject and a datetime
         planets_lr_dict: Dict[str, PlanetData] = {}
-        for k_name, api_name in PLANETS_MAP.items():
-            planet_pos_data = get_planet_data(lr_subject_instance, k_name, api_name)
-            if planet_pos_data:
-                planets_lr_dict[api_name] = PlanetData(**planet_pos_data.model_dump())
+        for planet_pos_data in extract_all_planets(lr_subject_instance).values():
+            planets_lr_dict[planet_pos_data.name] = PlanetData(**planet_pos_data.model_dump())
 
         houses_lr_dict: Dict[str, HouseCuspData] = {}
         for i in range(1, 13):
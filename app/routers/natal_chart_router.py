@@ -2,13 +2,42 @@ from fastapi import APIRouter, HTTPException, Depends
 from kerykeion import AstrologicalSubject
 from app.models import NatalChartRequest, NatalChartResponse, PlanetData, HouseCuspData, AspectData
 from app.security import verify_api_key
-from app.utils.astro_helpers import create_subject, get_planet_data, PLANETS_MAP, HOUSE_NUMBER_TO_NAME_BASE
-from typing import List, Optional, Dict
+from app.utils.astro_helpers import create_subject, get_planet_data, extract_all_planets, HOUSE_NUMBER_TO_NAME_BASE
+from typing import List, Optional, Dict, Any
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Índice fixo dos planetas usados no cálculo de aspectos (Sun=0 ... Pluto=9)
+_ASPECT_PLANET_IDS = {
+    "Sun": 0, "Moon": 1, "Mercury": 2, "Venus": 3, "Mars": 4,
+    "Jupiter": 5, "Saturn": 6, "Uranus": 7, "Neptune": 8, "Pluto": 9
+}
+
+
+def _unique_aspects(planets: List[Any]) -> List[tuple]:
+    """
+    Aspectos (nome do planeta 1, aspecto) sem repetição de pares.
+
+    Kerykeion emite cada aspecto nas listas dos dois planetas; guardamos apenas
+    o par (i, j) com i < j, sem montar chaves ordenadas a cada iteração.
+    """
+    by_pair: Dict[tuple, Any] = {}
+    for p1 in planets:
+        if not p1 or not hasattr(p1, 'aspects'): continue
+        id1 = _ASPECT_PLANET_IDS[p1.name]
+        for asp in p1.aspects:
+            p2_name = asp.p2_name
+            id2 = _ASPECT_PLANET_IDS.get(p2_name)
+            if id2 is not None and id2 <= id1:
+                continue
+            key = (id1, p2_name if id2 is None else id2, asp.aspect_name)
+            if key not in by_pair:
+                by_pair[key] = (p1.name, asp)
+    return list(by_pair.values())
+
+
 router = APIRouter(
     prefix="/api/v1",
     tags=["Natal Chart"],
@@ -30,24 +59,22 @@ async def create_natal_chart(request: NatalChartRequest):
         
         # Dicionário para armazenar os planetas
         planets_dict: Dict[str, PlanetData] = {}
-        for k_name, api_name in PLANETS_MAP.items():
-            planet_data = get_planet_data(subject, k_name, api_name)
-            if planet_data:
-                # Converter PlanetPosition para PlanetData
-                planets_dict[k_name] = PlanetData(
-                    name=planet_data.name,
-                    sign=planet_data.sign,
-                    sign_num=planet_data.sign_num,
-                    position=planet_data.position,
-                    abs_pos=planet_data.abs_pos,
-                    house_name=planet_data.house_name,
-                    house_number=planet_data.house_number,
-                    speed=planet_data.speed,
-                    retrograde=planet_data.retrograde,
-                    quality=planet_data.quality,
-                    element=planet_data.element,
-                    emoji=planet_data.emoji
-                )
+        for k_name, planet_data in extract_all_planets(subject).items():
+            # Converter PlanetPosition para PlanetData
+            planets_dict[k_name] = PlanetData(
+                name=planet_data.name,
+                sign=planet_data.sign,
+                sign_num=planet_data.sign_num,
+                position=planet_data.position,
+                abs_pos=planet_data.abs_pos,
+                house_name=planet_data.house_name,
+                house_number=planet_data.house_number,
+                speed=planet_data.speed,
+                retrograde=planet_data.retrograde,
+                quality=planet_data.quality,
+                element=planet_data.element,
+                emoji=planet_data.emoji
+            )
         
         if hasattr(subject, 'chiron') and subject.chiron:
             chiron_data = get_planet_data(subject, 'chiron', 'Chiron') # get_planet_data now returns PlanetPosition with new fields
@@ -113,24 +140,9 @@ async def create_natal_chart(request: NatalChartRequest):
                 emoji=house_obj.sign_emoji if hasattr(house_obj, 'sign_emoji') else None
             )
 
-        # Ascendente e Meio do Céu
-        ascendant = HouseCuspData(
-            house=1,
-            sign=subject.first_house.sign,
-            position=round(subject.first_house.position, 4),
-            quality=subject.first_house.quality if hasattr(subject.first_house, 'quality') else None,
-            element=subject.first_house.element if hasattr(subject.first_house, 'element') else None,
-            emoji=subject.first_house.sign_emoji if hasattr(subject.first_house, 'sign_emoji') else None
-        )
-        
-        midheaven = HouseCuspData(
-            house=10,
-            sign=subject.tenth_house.sign,
-            position=round(subject.tenth_house.position, 4),
-            quality=subject.tenth_house.quality if hasattr(subject.tenth_house, 'quality') else None,
-            element=subject.tenth_house.element if hasattr(subject.tenth_house, 'element') else None,
-            emoji=subject.tenth_house.sign_emoji if hasattr(subject.tenth_house, 'sign_emoji') else None
-        )
+        # Ascendente e Meio do Céu: mesmas cúspides já arredondadas das casas 1 e 10
+        ascendant = houses_dict["1"]
+        midheaven = houses_dict["10"]
 
         # Lista para armazenar os aspectos
         aspects_list: List[AspectData] = []
@@ -139,28 +151,22 @@ async def create_natal_chart(request: NatalChartRequest):
             subject.jupiter, subject.saturn, subject.uranus, subject.neptune, subject.pluto
         ]
 
-        processed_aspects = set()
-        for p1 in main_planets_for_aspects:
-            if not p1 or not hasattr(p1, 'aspects'): continue
-            for asp in p1.aspects:
-                p2_name = asp.p2_name
-                pair = tuple(sorted((p1.name, p2_name)) + (asp.aspect_name,))
-                if pair not in processed_aspects:
-                    aspects_list.append(AspectData(
-                        p1_name=p1.name,
-                        p1_name_original=p1.name,
-                        p1_owner="chart",
-                        p2_name=p2_name,
-                        p2_name_original=p2_name,
-                        p2_owner="chart",
-                        aspect=asp.aspect_name,
-                        aspect_original=asp.aspect_name,
-                        orbit=round(asp.orbit, 4),
-                        aspect_degrees=float(asp.aspect_name.split("_")[0]) if "_" in asp.aspect_name else 0.0,
-                        diff=abs(round(asp.orbit, 4)),
-                        applying=False  # Valor padrão, não disponível diretamente
-                    ))
-                    processed_aspects.add(pair)
+        for p1_name, asp in _unique_aspects(main_planets_for_aspects):
+            p2_name = asp.p2_name
+            aspects_list.append(AspectData(
+                p1_name=p1_name,
+                p1_name_original=p1_name,
+                p1_owner="chart",
+                p2_name=p2_name,
+                p2_name_original=p2_name,
+                p2_owner="chart",
+                aspect=asp.aspect_name,
+                aspect_original=asp.aspect_name,
+                orbit=round(asp.orbit, 4),
+                aspect_degrees=float(asp.aspect_name.split("_")[0]) if "_" in asp.aspect_name else 0.0,
+                diff=abs(round(asp.orbit, 4)),
+                applying=False  # Valor padrão, não disponível diretamente
+            ))
         
         # Criar o objeto de resposta
         response = NatalChartResponse(
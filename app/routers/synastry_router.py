@@ -1,9 +1,13 @@
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
 from kerykeion import AstrologicalSubject
 from app.models import SynastryRequest, SynastryResponse, SynastryAspect, NatalChartRequest # Added NatalChartRequest for create_subject
 from app.security import verify_api_key
 from app.utils.astro_helpers import create_subject, PLANETS_MAP # Added PLANETS_MAP
+from app.utils.aspect_tables import ASPECT_TYPE, ASPECT_TYPE_WEIGHT, PLANET_WEIGHT
 from typing import List, Dict, Optional, Any # Added Optional, Any
+from dataclasses import dataclass
+import asyncio
 import math
 
 # Speculative import for Kerykeion SynastryAspects
@@ -24,6 +28,14 @@ router = APIRouter(
     dependencies=[Depends(verify_api_key)]
 )
 
+@dataclass(slots=True, frozen=True)
+class _RawAspect:
+    """Registro leve de aspecto usado no laço de cálculo manual antes da conversão para Pydantic."""
+    planet1: str
+    planet2: str
+    aspect: str
+    orb: float
+
 def calculate_aspect_angle(pos1: float, pos2: float) -> float:
     """Calcula o ângulo entre duas posições planetárias."""
     diff = abs(pos1 - pos2)
@@ -59,44 +71,14 @@ def calculate_compatibility_score(aspects: List[SynastryAspect]) -> float:
     score = 0.0
     total_weight = 0.0
 
-    # Pesos por tipo de aspecto
-    _ASPECT_NAME_TO_TYPE = {
-        "conjunction": "harmonic", # Can be neutral or vary; simplified here
-        "opposition": "tense",
-        "trine": "harmonic",
-        "square": "tense",
-        "sextile": "harmonic",
-        "quincunx": "neutral", # Often seen as requiring adjustment
-        "semi_sextile": "neutral",
-        "semi_square": "tense",
-        "sesquiquadrate": "tense", # Kerykeion might use sesquisquare
-        "quintile": "harmonic", # Often seen as minor creative
-        "biquintile": "harmonic" # Often seen as minor creative
-        # Add other aspect names Kerykeion might return if necessary
-    }
-    aspect_type_weights = {
-        "harmonic": 2.0,
-        "neutral": 1.0,
-        "tense": -1.0
-    }
-
-    # Pesos por planetas envolvidos
-    planet_weights = {
-        "Sun": 3.0, "Moon": 3.0, "Venus": 2.5, "Mars": 2.0,
-        "Mercury": 1.5, "Jupiter": 2.0, "Saturn": 1.5,
-        "Uranus": 1.0, "Neptune": 1.0, "Pluto": 1.0,
-        # Default for other points if they appear in aspects
-        "Default": 0.5
-    }
-
     for aspect_detail in aspects: # aspect_detail is SynastryAspect Pydantic model
         # Derive aspect_type from aspect_detail.aspect (name)
-        aspect_type = _ASPECT_NAME_TO_TYPE.get(aspect_detail.aspect.lower(), "neutral")
+        aspect_type = ASPECT_TYPE.get(aspect_detail.aspect.lower(), "neutral")
 
-        aspect_weight = aspect_type_weights.get(aspect_type, 1.0)
+        aspect_weight = ASPECT_TYPE_WEIGHT.get(aspect_type, 1.0)
         # Use aspect_detail.planet1 and aspect_detail.planet2 which are the planet names
-        p1_weight = planet_weights.get(aspect_detail.planet1, planet_weights["Default"])
-        p2_weight = planet_weights.get(aspect_detail.planet2, planet_weights["Default"])
+        p1_weight = PLANET_WEIGHT.get(aspect_detail.planet1, PLANET_WEIGHT["Default"])
+        p2_weight = PLANET_WEIGHT.get(aspect_detail.planet2, PLANET_WEIGHT["Default"])
         
         # Peso diminui com orbe maior
         orb_factor = max(0.1, 1.0 - (aspect_detail.orb / 10.0)) # Using aspect_detail.orb
@@ -117,20 +99,12 @@ def generate_summary(aspects: List[SynastryAspect], score: float) -> str:
     if not aspects:
         return "Não foram encontrados aspectos significativos entre os mapas."
     
-    # Re-use the _ASPECT_NAME_TO_TYPE from calculate_compatibility_score
-    _ASPECT_NAME_TO_TYPE = {
-        "conjunction": "harmonic", "opposition": "tense", "trine": "harmonic",
-        "square": "tense", "sextile": "harmonic", "quincunx": "neutral",
-        "semi_sextile": "neutral", "semi_square": "tense", "sesquiquadrate": "tense",
-        "quintile": "harmonic", "biquintile": "harmonic"
-    }
-
     harmonic_count = 0
     tense_count = 0
     neutral_count = 0
 
     for aspect_detail in aspects:
-        aspect_type = _ASPECT_NAME_TO_TYPE.get(aspect_detail.aspect.lower(), "neutral")
+        aspect_type = ASPECT_TYPE.get(aspect_detail.aspect.lower(), "neutral")
         if aspect_type == "harmonic":
             harmonic_count += 1
         elif aspect_type == "tense":
@@ -162,8 +136,11 @@ async def calculate_synastry(request: SynastryRequest):
     Analisa aspectos entre planetas de ambos os mapas natais.
     """
     try:
-        subject1, _ = create_subject(request.person1, request.person1.name or "Person1")
-        subject2, _ = create_subject(request.person2, request.person2.name or "Person2")
+        # As duas pessoas são independentes (geocodificação + efemérides): resolver em paralelo
+        (subject1, _), (subject2, _) = await asyncio.gather(
+            run_in_threadpool(create_subject, request.person1, request.person1.name or "Person1"),
+            run_in_threadpool(create_subject, request.person2, request.person2.name or "Person2")
+        )
 
         aspects: List[SynastryAspect] = []
         use_manual_calculation = True # Default to manual, override if K5 works
@@ -221,21 +198,25 @@ async def calculate_synastry(request: SynastryRequest):
             s2_planets_data = {PLANETS_MAP.get(k, k.capitalize()): getattr(subject2, k).abs_pos
                                for k in main_planets_k_names if hasattr(subject2, k) and getattr(subject2, k)}
 
+            raw_aspects: List[_RawAspect] = []
             for p1_name, p1_abs_pos in s1_planets_data.items():
                 for p2_name, p2_abs_pos in s2_planets_data.items():
                     angle = calculate_aspect_angle(p1_abs_pos, p2_abs_pos)
                     aspect_name_calc, _, orb_calc = get_aspect_name(angle)
 
                     if aspect_name_calc and orb_calc is not None and orb_calc <= 6.0: # Synastry orb
-                        aspects.append(SynastryAspect(
-                            planet1=p1_name,
-                            person1=str(subject1.name),
-                            planet2=p2_name,
-                            person2=str(subject2.name),
-                            aspect=aspect_name_calc,
-                            orb=round(orb_calc, 2),
-                            applying=False
-                        ))
+                        raw_aspects.append(_RawAspect(p1_name, p2_name, aspect_name_calc, round(orb_calc, 2)))
+
+            # Conversão em lote: os valores vêm do próprio cálculo, então dispensamos a validação
+            person1_name, person2_name = str(subject1.name), str(subject2.name)
+            aspects.extend(
+                SynastryAspect.model_construct(
+                    planet1=r.planet1, person1=person1_name,
+                    planet2=r.planet2, person2=person2_name,
+                    aspect=r.aspect, orb=r.orb, applying=False
+                )
+                for r in raw_aspects
+            )
             if aspects: print(f"Manual synastry calculation resulted in {len(aspects)} aspects.")
 
         aspects.sort(key=lambda x: x.orb)
@@ -9,7 +9,7 @@ from app.security import verify_api_key
 from app.utils.astro_helpers import (
     create_subject,
     get_planet_data,
-    PLANETS_MAP,
+    extract_all_planets,
     get_house_from_kerykeion_attribute,
 )
 from typing import List, Optional
@@ -26,11 +26,7 @@ async def get_current_transits(request: TransitRequest):
         # Usar a função utilitária para criar o subject
         transit_subject = create_subject(request, "CurrentTransits")
 
-        transit_planets: List[PlanetPosition] = []
-        for k_name, api_name in PLANETS_MAP.items():
-            planet_data = get_planet_data(transit_subject, k_name, api_name)
-            if planet_data:
-                transit_planets.append(planet_data)
+        transit_planets: List[PlanetPosition] = list(extract_all_planets(transit_subject).values())
 
         if hasattr(transit_subject, 'chiron') and transit_subject.chiron:
             chiron_data = get_planet_data(transit_subject, 'chiron', 'Chiron')
@@ -65,11 +61,7 @@ async def get_transits_to_natal(request: TransitsToNatalRequest):
                                       request.natal_data.name if request.natal_data.name else "NatalChart")
         transit_subject = create_subject(request.transit_data, "TransitChart")
 
-        transit_planets_positions: List[PlanetPosition] = []
-        for k_name, api_name in PLANETS_MAP.items():
-            planet_data = get_planet_data(transit_subject, k_name, api_name)
-            if planet_data:
-                transit_planets_positions.append(planet_data)
+        transit_planets_positions: List[PlanetPosition] = list(extract_all_planets(transit_subject).values())
 
         if hasattr(transit_subject, 'chiron') and transit_subject.chiron:
             chiron_data = get_planet_data(transit_subject, 'chiron', 'Chiron')
@@ -4,14 +4,210 @@ Gerador Aprimorado de SVG Astrológico para AstroManus.
 Este módulo implementa um gerador de SVG de alta qualidade que produz
 mapas astrológicos profissionais similares aos exemplos fornecidos.
 """
-from kerykeion import AstrologicalSubject, KerykeionChartSVG
-from kerykeion.settings.kerykeion_settings import get_settings
-from typing import Optional, Dict, Any, Tuple, Union, List
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional, Dict, Any, Tuple, Union, List, Mapping
+from types import MappingProxyType
 import os
 import tempfile
 import shutil
+import threading
+import logging
+import operator
+import atexit
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
 from pathlib import Path
-import xml.etree.ElementTree as ET
+import re
+from html import escape as _html_escape
+
+_LOGGER = logging.getLogger(__name__)
+
+# Dependências pesadas (Kerykeion, pool de processos) são importadas sob demanda dentro dos
+# métodos que as usam; aqui o Kerykeion aparece só para as anotações
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+    from kerykeion import AstrologicalSubject
+
+# Pós-processamento do SVG: apenas a tag <svg ...> de abertura e o <title> são alterados,
+# então fazemos um patch textual em vez de parse/serialização do documento inteiro
+_SVG_TAG_RE = re.compile(rb'<svg\b[^>]*>')
+_TITLE_RE = re.compile(rb'<title>[^<]*</title>')
+_SVG_REPLACED_ATTRS_RE = re.compile(
+    rb'\s+(?:viewBox|width|height|preserveAspectRatio)\s*=\s*(?:"[^"]*"|\'[^\']*\')'
+)
+_SVG_OPTIMIZED_ATTRS = (
+    b' viewBox="0 0 820 550.0" width="100%" height="100%" preserveAspectRatio="xMidYMid"'
+)
+_KR_NAMESPACE_ATTR = b' xmlns:kr="https://www.kerykeion.net/"'
+
+# Minificação: atributos com números longos e espaços entre tags
+_ATTR_RE = re.compile(rb'(\s)([\w:.-]+)(\s*=\s*)("[^"]*"|\'[^\']*\')')
+_LONG_NUMBER_RE = re.compile(rb'\d+\.\d{3,}')
+_INTER_TAG_WS_RE = re.compile(rb'>\s+<')
+# Elementos cujo conteúdo é texto renderizado ou CSS: ficam fora da minificação
+_PROTECTED_ELEMENT_RE = re.compile(rb'<(text|style|title|desc)\b.*?</\1\s*>', re.DOTALL)
+# Atributos que precisam da precisão original (matrizes de transformação e graus do Kerykeion)
+_KEEP_PRECISION_ATTRS = frozenset((b'transform',))
+_KEEP_PRECISION_PREFIX = b'kr:'
+
+
+# Atributos do subject que determinam o gráfico gerado (usados na chave do cache de SVG)
+# Todos os campos do sujeito que o KerykeionChartSVG escreve no SVG (ou dos quais as posições dependem)
+_SUBJECT_KEY_ATTRS = (
+    "name", "year", "month", "day", "hour", "minute", "lat", "lng", "tz_str",
+    "city", "nation", "iso_formatted_local_datetime",
+    "houses_system_identifier", "houses_system_name", "zodiac_type", "sidereal_mode", "perspective_type"
+)
+
+
+class _SVGCache:
+    """Cache LRU simples e thread-safe para SVGs já gerados e otimizados."""
+
+    def __init__(self, max_size: int = 256) -> None:
+        self._data: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._max_size = max_size
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: tuple, value: bytes) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self._max_size:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_svg_cache = _SVGCache()
+
+
+# Diretório temporário único por processo (criado sob demanda e removido na saída);
+# cada geração usa um subdiretório próprio, apagado em segundo plano
+_SCRATCH_ROOT: Optional[Path] = None
+_SCRATCH_LOCK = threading.Lock()
+_SCRATCH_CLEANUP = ThreadPoolExecutor(max_workers=1, thread_name_prefix="astromanus_svg_cleanup")
+
+
+def _new_scratch_dir() -> Path:
+    global _SCRATCH_ROOT
+    if _SCRATCH_ROOT is None:
+        with _SCRATCH_LOCK:
+            if _SCRATCH_ROOT is None:
+                root = Path(tempfile.mkdtemp(prefix="astromanus_svg_"))
+                atexit.register(shutil.rmtree, root, True)
+                _SCRATCH_ROOT = root
+    subdir = _SCRATCH_ROOT / uuid.uuid4().hex
+    subdir.mkdir()
+    return subdir
+
+
+# Formatos gerados a partir do SVG em generate_multiple_formats
+_CONVERTIBLE_FORMATS = ("png", "pdf")
+
+
+# Pool de processos para as conversões, criado na primeira geração com mais de um formato
+# e reaproveitado até o fim do processo
+_FORMAT_POOL: Optional["ProcessPoolExecutor"] = None
+_FORMAT_POOL_LOCK = threading.Lock()
+
+
+def _get_format_pool() -> "ProcessPoolExecutor":
+    global _FORMAT_POOL
+    if _FORMAT_POOL is None:
+        with _FORMAT_POOL_LOCK:
+            if _FORMAT_POOL is None:
+                # Importados aqui: concurrent.futures.process e multiprocessing são caros de carregar
+                # e só são usados neste caminho
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+
+                # Um processo por formato: a rasterização do Cairo roda em paralelo em núcleos distintos.
+                # forkserver (spawn no Windows): o processo da API já tem threads, e um fork
+                # herdaria locks em uso
+                start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                pool = ProcessPoolExecutor(
+                    max_workers=len(_CONVERTIBLE_FORMATS),
+                    mp_context=multiprocessing.get_context(start_method)
+                )
+                atexit.register(pool.shutdown, wait=False)
+                _FORMAT_POOL = pool
+    return _FORMAT_POOL
+
+
+def _get_cairosvg() -> Any:
+    """
+    Retorna o cairosvg já importado (com proteção) por app.utils.image_converter.
+    """
+    # Importado sob demanda: o conversor carrega os renderizadores opcionais ao ser importado
+    from app.utils import image_converter
+
+    if not image_converter.CAIROSVG_AVAILABLE:
+        raise RuntimeError("Conversão para PNG/PDF indisponível: instale cairosvg e a biblioteca Cairo do sistema")
+    return image_converter.cairosvg
+
+
+def _render_format(svg_content: bytes, fmt: str) -> bytes:
+    """
+    Converte o SVG para o formato pedido (função de módulo para poder ser enviada a outro processo).
+    """
+    cairosvg = _get_cairosvg()
+
+    if fmt == "png":
+        return cairosvg.svg2png(bytestring=svg_content)
+    if fmt == "pdf":
+        return cairosvg.svg2pdf(bytestring=svg_content)
+    raise ValueError(f"Formato não suportado: {fmt}")
+
+
+def _round_number(match: "re.Match[bytes]") -> bytes:
+    return b'%.2f' % float(match.group(0))
+
+
+def _round_attr_numbers(match: "re.Match[bytes]") -> bytes:
+    name = match.group(2)
+    if name in _KEEP_PRECISION_ATTRS or name.startswith(_KEEP_PRECISION_PREFIX):
+        return match.group(0)
+    return match.group(1) + name + match.group(3) + _LONG_NUMBER_RE.sub(_round_number, match.group(4))
+
+
+def _minify_markup(markup: bytes) -> bytes:
+    markup = _ATTR_RE.sub(_round_attr_numbers, markup)
+    return _INTER_TAG_WS_RE.sub(b'><', markup)
+
+
+def _minify_svg(svg_bytes: bytes) -> bytes:
+    """
+    Reduz o tamanho do SVG: números dos atributos com 2 casas decimais e sem espaços entre tags.
+
+    Só a marcação é alterada; <text>/<tspan>, <style>, <title> e <desc> são copiados
+    intactos para não juntar palavras nem mexer no CSS do tema.
+    """
+    parts = []
+    pos = 0
+    for match in _PROTECTED_ELEMENT_RE.finditer(svg_bytes):
+        parts.append(_minify_markup(svg_bytes[pos:match.start()]))
+        parts.append(match.group(0))
+        pos = match.end()
+    parts.append(_minify_markup(svg_bytes[pos:]))
+    return b''.join(parts)
+
+
+def _subject_key(subject: Any) -> Optional[tuple]:
+    if subject is None:
+        return None
+    return tuple(getattr(subject, attr, None) for attr in _SUBJECT_KEY_ATTRS)
 
 
 class EnhancedSVGGenerator:
@@ -19,7 +215,10 @@ class EnhancedSVGGenerator:
     Gerador aprimorado de SVG com configurações avançadas para máxima qualidade.
     """
 
-    DEFAULT_ASPECTS_SETTINGS = { # Added default aspects
+    # Só os atributos de instância; as tabelas de configuração abaixo continuam atributos de classe
+    __slots__ = ('natal_subject', 'transit_subject', 'settings', '_chart_info_cache')
+
+    DEFAULT_ASPECTS_SETTINGS = MappingProxyType({ # Added default aspects
         "conjunction": {"active": True, "orb": 8, "color": "#ff0000"},
         "opposition": {"active": True, "orb": 8, "color": "#0000ff"},
         "trine": {"active": True, "orb": 8, "color": "#00ff00"},
@@ -31,10 +230,10 @@ class EnhancedSVGGenerator:
         "sesqui_square": {"active": True, "orb": 3, "color": "#008080"},
         "quintile": {"active": True, "orb": 2, "color": "#800000"},
         "bi_quintile": {"active": True, "orb": 2, "color": "#808000"}
-    }
+    })
 
     # Configurações avançadas para diferentes tipos de mapas
-    CHART_CONFIGURATIONS = {
+    CHART_CONFIGURATIONS = MappingProxyType({
         "natal": {
             "chart_type": "Natal", # Kerykeion internal type for KerykeionChartSVG
             "show_aspects": True,
@@ -91,10 +290,10 @@ class EnhancedSVGGenerator:
             # "draw_house_cusps_tropical_pos": False, # if show_houses is False
             # "draw_house_numbers": False, # if show_houses is False
         }
-    }
+    })
 
     # Configurações de tema avançadas
-    THEME_CONFIGURATIONS = {
+    THEME_CONFIGURATIONS = MappingProxyType({
         "strawberry": {
             "paper_0": "#330011",  # Dark text, deep berry
             "paper_1": "#FFDDEE",  # Light pink background
@@ -167,7 +366,36 @@ class EnhancedSVGGenerator:
                 "minor": "#95a5a6"
             }
         }
-    }
+    })
+
+    # Chaves válidas (checagem de pertinência O(1) antes do acesso direto às tabelas)
+    _VALID_CHART_TYPES = frozenset(CHART_CONFIGURATIONS)
+    _VALID_THEMES = frozenset(THEME_CONFIGURATIONS)
+
+    # Chaves das cores zodiacais aplicadas em chart.colors (uma por signo)
+    _ZODIAC_BG_KEYS = tuple(f'zodiac_bg_{i}' for i in range(12))
+    _ZODIAC_ICON_KEYS = tuple(f'zodiac_icon_{i}' for i in range(12))
+
+    @classmethod
+    def _build_theme_chart_colors(cls, theme_config: Mapping[str, Any]) -> Dict[str, str]:
+        """
+        Monta as cores do papel e dos 12 signos aplicadas ao chart para um tema.
+        """
+        zodiac_colors = theme_config["zodiac_bg_base"]
+        zodiac_icons = theme_config["zodiac_icon_base"]
+
+        custom_colors = {
+            'paper_0': theme_config["paper_0"],
+            'paper_1': theme_config["paper_1"]
+        }
+        # Paletas percorridas ciclicamente (podem ter tamanhos diferentes, ex.: "strawberry")
+        custom_colors.update(zip(cls._ZODIAC_BG_KEYS, (zodiac_colors[i % len(zodiac_colors)] for i in range(12))))
+        custom_colors.update(zip(cls._ZODIAC_ICON_KEYS, (zodiac_icons[i % len(zodiac_icons)] for i in range(12))))
+        return custom_colors
+
+    # Atributos obrigatórios do subject, lidos de uma vez por um attrgetter
+    _REQ_ATTRS = ('name', 'year', 'month', 'day', 'hour', 'minute', 'lat', 'lng')
+    _REQ_GETTER = operator.attrgetter(*_REQ_ATTRS)
 
     def __init__(self, natal_subject: AstrologicalSubject, 
                  transit_subject: Optional[AstrologicalSubject] = None) -> None:
@@ -176,120 +404,98 @@ class EnhancedSVGGenerator:
         """
         self.natal_subject = natal_subject
         self.transit_subject = transit_subject
-        self.settings = get_settings()
-        
-    def _configure_advanced_settings(self, chart_type: str, theme: str = "light") -> Dict[str, Any]:
+        self.settings = self._get_settings()
+        # get_chart_info por tipo de chart: (natal, trânsito, info) dos subjects usados
+        self._chart_info_cache: Dict[str, Tuple[Any, Any, Dict[str, Any]]] = {}
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _get_settings() -> Any:
         """
-        Configura configurações avançadas para o Kerykeion baseadas no tipo e tema.
+        Carrega as configurações do Kerykeion uma única vez por processo.
         """
-        config = self.CHART_CONFIGURATIONS.get(chart_type, self.CHART_CONFIGURATIONS["natal"])
-        theme_config = self.THEME_CONFIGURATIONS.get(theme, self.THEME_CONFIGURATIONS["light"])
+        from kerykeion.settings.kerykeion_settings import get_settings
+        return get_settings()
         
-        # Configurações avançadas do Kerykeion
-        advanced_config = {
-            # Configurações gerais
-            "chart_type": config["chart_type"],
-            "new_output_directory": True,
-            "output_file_format": "svg",
-            
-            # Configurações visuais
-            "chart_size": 550,  # Tamanho otimizado como nos exemplos
-            "chart_width": 820,  # Largura otimizada como nos exemplos
-            "chart_height": 550,  # Altura otimizada como nos exemplos
-            
-            # Configurações dos elementos
-            "show_aspects": config["show_aspects"],
-            "show_degree_symbols": config["show_degree_symbols"],
-            "show_planet_symbols": config["show_planet_symbols"],
-            "show_zodiac_symbols": config["show_zodiac_symbols"],
-            "show_houses": config["show_houses"],
-            
-            # Configurações de aspectos
-            "aspects_settings": config["aspects_settings"],
-            
-            # Configurações de tema
-            "theme_colors": theme_config,
-            
-            # Configurações de qualidade
-            "high_resolution": True,
-            "antialiasing": True,
-            "vector_optimization": True
-        }
-        
-        return advanced_config
+    def _configure_advanced_settings(self, chart_type: str) -> Mapping[str, Any]:
+        """
+        Parâmetros do KerykeionChartSVG para o tipo de chart (tipo interno e aspectos ativos).
+
+        Retorna a configuração pré-calculada (somente leitura) do tipo.
+        """
+        if chart_type not in self._VALID_CHART_TYPES:
+            chart_type = "natal"
+        return _PRECOMPUTED_CONFIGS[chart_type]
+
+    @staticmethod
+    def _build_active_aspects(aspects_settings: Mapping[str, Mapping[str, Any]], orb_factor: float = 1.0) -> List[Dict[str, Any]]:
+        """
+        Converte aspects_settings ({"trine": {"active": True, "orb": 8}, ...}) para o
+        active_aspects do Kerykeion 4 ([{"name": "trine", "orb": 8}, ...]).
+        """
+        return [
+            {"name": _KERYKEION_ASPECT_NAMES.get(name, name), "orb": settings["orb"] * orb_factor}
+            for name, settings in aspects_settings.items()
+            if settings.get("active", True)
+        ]
 
     def _apply_theme_to_chart(self, chart_instance, theme: str = "light") -> None:
         """
         Aplica tema avançado ao objeto de chart do Kerykeion.
+
+        O Kerykeion 4 desenha com variáveis CSS (--kerykeion-chart-color-*) definidas no
+        <style> do tema; as cores do nosso tema são sobrepostas ao tema base do Kerykeion.
         """
-        theme_config = self.THEME_CONFIGURATIONS.get(theme, self.THEME_CONFIGURATIONS["light"])
-        
         try:
-            # Kerykeion v5's set_up_theme(theme_name) is not standard in v4.
-            # Theme colors are typically passed via `custom_colors` to constructor or by updating `chart.colors` directly.
-            # The `custom_colors` parameter in the constructor (added in previous step) should handle most of this.
-            # This method's direct update of chart.colors can remain as a supplement if needed for more granular control
-            # or if the constructor's `custom_colors` doesn't map all theme aspects perfectly.
-
-            # Ensure chart.colors object exists and can be updated.
-            if hasattr(chart_instance, 'colors') and hasattr(chart_instance.colors, 'update'):
-                custom_colors = {}
-                
-                # Aplicar cores do papel
-                custom_colors.update({
-                    'paper_0': theme_config["paper_0"],
-                    'paper_1': theme_config["paper_1"]
-                })
-                
-                # Aplicar cores zodiacais
-                zodiac_colors = theme_config["zodiac_bg_base"]
-                for i in range(12):
-                    color_index = i % len(zodiac_colors)
-                    custom_colors[f'zodiac_bg_{i}'] = zodiac_colors[color_index]
-                    custom_colors[f'zodiac_icon_{i}'] = theme_config["zodiac_icon_base"][color_index]
-                
-                chart_instance.colors.update(custom_colors)
-                
+            theme = theme if theme in self._VALID_THEMES else "light"
+            chart_instance.set_up_theme(_KERYKEION_BASE_THEMES.get(theme, "light"))
+            chart_instance.color_style_tag += _THEME_CSS[theme]
         except Exception as e:
-            print(f"Aviso: Não foi possível aplicar tema personalizado: {e}")
+            _LOGGER.warning("Aviso: Não foi possível aplicar tema personalizado: %s", e)
 
-    def _optimize_svg_output(self, svg_content: str, chart_type: str) -> str:
+    def _optimize_svg_output(self, svg_bytes: bytes, chart_type: str) -> bytes:
         """
-        Otimiza o conteúdo SVG para melhor qualidade e compatibilidade.
+        Otimiza o conteúdo SVG (bytes UTF-8) para melhor qualidade e compatibilidade.
         """
         try:
-            # Parse do XML para manipulação
-            root = ET.fromstring(svg_content)
-            
-            # Adicionar namespace Kerykeion se não existir
-            if 'kr' not in root.attrib:
-                root.set('xmlns:kr', 'https://www.kerykeion.net/')
-            
-            # Otimizar viewBox para qualidade máxima
-            root.set('viewBox', '0 0 820 550.0')
-            root.set('width', '100%')
-            root.set('height', '100%')
-            root.set('preserveAspectRatio', 'xMidYMid')
-            
             # Adicionar título profissional
-            title_elem = root.find('.//title')
+            if chart_type == "transit":
+                title = f"{self.natal_subject.name} - Trânsitos | AstroManus"
+            elif chart_type == "synastry" and self.transit_subject:
+                title = f"{self.natal_subject.name} & {self.transit_subject.name} - Sinastria | AstroManus"
+            elif chart_type == "composite":
+                # self.natal_subject is the composite_subject in this case
+                title = f"{self.natal_subject.name} - Mapa Composto | AstroManus"
+            else: # Default for "natal"
+                title = f"{self.natal_subject.name} - Mapa Natal | AstroManus"
+
+            parts = []
+            pos = 0
+
+            # Otimizar viewBox para qualidade máxima e garantir o namespace Kerykeion
+            svg_tag = _SVG_TAG_RE.search(svg_bytes)
+            if svg_tag is not None:
+                tag = _SVG_REPLACED_ATTRS_RE.sub(b'', svg_tag.group(0))
+                extra_attrs = _SVG_OPTIMIZED_ATTRS
+                if b'xmlns:kr' not in tag:
+                    extra_attrs += _KR_NAMESPACE_ATTR
+                parts += (svg_bytes[:svg_tag.start()], tag[:-1].rstrip(), extra_attrs, b'>')
+                pos = svg_tag.end()
+
+            # O Kerykeion emite o <title> logo após a tag <svg>: a busca continua de onde parou
+            title_elem = _TITLE_RE.search(svg_bytes, pos)
             if title_elem is not None:
-                if chart_type == "transit":
-                    title_elem.text = f"{self.natal_subject.name} - Trânsitos | AstroManus"
-                elif chart_type == "synastry" and self.transit_subject:
-                    title_elem.text = f"{self.natal_subject.name} & {self.transit_subject.name} - Sinastria | AstroManus"
-                elif chart_type == "composite":
-                    # self.natal_subject is the composite_subject in this case
-                    title_elem.text = f"{self.natal_subject.name} - Mapa Composto | AstroManus"
-                else: # Default for "natal"
-                    title_elem.text = f"{self.natal_subject.name} - Mapa Natal | AstroManus"
-            
-            # Converter de volta para string
-            return ET.tostring(root, encoding='unicode', method='xml')
-            
+                parts += (svg_bytes[pos:title_elem.start()], f"<title>{_html_escape(title, quote=False)}</title>".encode('utf-8'))
+                pos = title_elem.end()
+
+            if not parts:
+                return svg_bytes
+            parts.append(svg_bytes[pos:])
+            return b''.join(parts)
+
         except Exception as e:
-            print(f"Aviso: Não foi possível otimizar SVG: {e}")
-            return svg_content
+            _LOGGER.warning("Aviso: Não foi possível otimizar SVG: %s", e)
+            return svg_bytes
 
     def _validate_chart_data(self, chart_type: str) -> None:
         """
@@ -302,15 +508,25 @@ class EnhancedSVGGenerator:
             raise ValueError(f"Dados de trânsito/segunda pessoa são necessários para charts do tipo '{chart_type}'")
         
         # Validar dados essenciais do subject
-        required_attrs = ['name', 'year', 'month', 'day', 'hour', 'minute', 'lat', 'lng']
-        for attr in required_attrs:
-            if not hasattr(self.natal_subject, attr) or getattr(self.natal_subject, attr) is None:
-                raise ValueError(f"Dados incompletos no mapa natal: faltando '{attr}'")
+        self._check_required_attrs(self.natal_subject, "no mapa natal")
         
         if self.transit_subject:
-            for attr in required_attrs:
-                if not hasattr(self.transit_subject, attr) or getattr(self.transit_subject, attr) is None:
-                    raise ValueError(f"Dados incompletos no trânsito/segunda pessoa: faltando '{attr}'")
+            self._check_required_attrs(self.transit_subject, "no trânsito/segunda pessoa")
+
+    @classmethod
+    def _check_required_attrs(cls, subject: Any, where: str) -> None:
+        """
+        Verifica de uma só vez (via attrgetter) os atributos obrigatórios do subject.
+        """
+        try:
+            values = cls._REQ_GETTER(subject)
+        except AttributeError as e:
+            missing_attr = next(attr for attr in cls._REQ_ATTRS if not hasattr(subject, attr))
+            raise ValueError(f"Dados incompletos {where}: faltando '{missing_attr}'") from e
+
+        if None in values:
+            missing = [attr for attr, value in zip(cls._REQ_ATTRS, values) if value is None]
+            raise ValueError(f"Dados incompletos {where}: faltando '{missing[0]}'")
 
     def generate_enhanced_svg(
         self,
@@ -319,8 +535,9 @@ class EnhancedSVGGenerator:
         show_aspects: bool = True,
         high_quality: bool = True,
         custom_settings: Optional[Dict[str, Any]] = None,
-        active_points: Optional[List[str]] = None
-    ) -> str:
+        active_points: Optional[List[str]] = None,
+        minify: bool = False
+    ) -> bytes:
         """
         Gera um SVG de alta qualidade com configurações avançadas.
         
@@ -330,150 +547,287 @@ class EnhancedSVGGenerator:
             show_aspects: Se deve mostrar aspectos
             high_quality: Se deve usar configurações de alta qualidade
             custom_settings: Configurações personalizadas opcionais
+            minify: Se deve reduzir o tamanho do SVG (opcional: casas decimais e espaços entre tags, sem tocar nos textos)
             
         Returns:
-            Conteúdo SVG como string
+            Conteúdo SVG em bytes (UTF-8)
         """
         # Validar dados de entrada
         self._validate_chart_data(chart_type)
-        
-        # Configurar parâmetros avançados
-        config = self._configure_advanced_settings(chart_type, theme)
-        
-        # Aplicar configurações personalizadas se fornecidas
-        if custom_settings:
-            config.update(custom_settings)
-        
-        # Criar diretório temporário para output
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
+
+        # Mesmo subject + mesmas opções produzem o mesmo SVG: reutilizar se já foi gerado
+        cache_key = self._cache_key(chart_type, theme, high_quality, custom_settings, active_points, minify)
+        if cache_key is not None:
+            cached_svg = _svg_cache.get(cache_key)
+            if cached_svg is not None:
+                return cached_svg
+
+        svg_content = self._render_svg(chart_type, theme, high_quality, custom_settings, active_points)
+        if minify:
+            svg_content = _minify_svg(svg_content)
+        if cache_key is not None:
+            _svg_cache.set(cache_key, svg_content)
+        return svg_content
+
+    @classmethod
+    def generate_batch(
+        cls,
+        subjects: List[AstrologicalSubject],
+        chart_type: str = "natal",
+        theme: str = "light",
+        high_quality: bool = True,
+        minify: bool = False
+    ) -> List[bytes]:
+        """
+        Gera SVGs para vários subjects em sequência (exportações em lote).
+
+        As configurações do Kerykeion e os parâmetros do chart são resolvidos uma
+        única vez e o mesmo gerador é reaproveitado para todos os subjects.
+
+        Args:
+            subjects: Subjects a renderizar (um chart por subject)
+            chart_type: Tipo do chart de um único subject ("natal" ou "composite")
+            theme: Tema do chart
+            high_quality: Se deve usar configurações de alta qualidade
+            minify: Se deve reduzir o tamanho do SVG
+
+        Returns:
+            Lista de SVGs em bytes, na mesma ordem de `subjects`
+        """
+        if chart_type not in ("natal", "composite"):
+            raise ValueError(f"Geração em lote suporta apenas charts de um subject, não '{chart_type}'")
+
+        if not subjects:
+            return []
+
+        generator = cls(subjects[0])
+        results = []
+        for subject in subjects:
+            generator.natal_subject = subject
+            results.append(generator.generate_enhanced_svg(
+                chart_type, theme, high_quality=high_quality, minify=minify
+            ))
+        return results
+
+    def _cache_key(
+        self,
+        chart_type: str,
+        theme: str,
+        high_quality: bool,
+        custom_settings: Optional[Dict[str, Any]],
+        active_points: Optional[List[str]],
+        minify: bool = False
+    ) -> Optional[tuple]:
+        """
+        Monta a chave do cache de SVG. Retorna None se alguma opção não for hashable.
+        """
+        key = (
+            _subject_key(self.natal_subject),
+            _subject_key(self.transit_subject),
+            chart_type, theme, high_quality,
+            tuple(sorted((custom_settings or {}).items())),
+            tuple(active_points) if active_points is not None else None,
+            minify
+        )
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def _render_svg(
+        self,
+        chart_type: str,
+        theme: str,
+        high_quality: bool,
+        custom_settings: Optional[Dict[str, Any]],
+        active_points: Optional[List[str]]
+    ) -> bytes:
+        """
+        Gera o SVG via Kerykeion (sem cache).
+        """
+        try:
+            chart = self._build_chart(chart_type, theme, custom_settings, active_points)
+            return self._chart_to_svg(chart, chart_type, high_quality)
             
+        except Exception as e:
+            raise Exception(f"Erro ao gerar SVG aprimorado: {str(e)}")
+
+    def generate_theme_variants(
+        self,
+        chart_type: str = "natal",
+        themes: Tuple[str, ...] = ("light",),
+        high_quality: bool = True,
+        minify: bool = False
+    ) -> Dict[str, bytes]:
+        """
+        Gera o mesmo chart em vários temas.
+
+        Temas já em cache não são renderizados de novo; os demais compartilham um único
+        KerykeionChartSVG calculado (posições, casas e aspectos), trocando só o estilo do tema.
+
+        Args:
+            chart_type: Tipo do chart ("natal", "transit", "synastry")
+            themes: Temas a gerar
+            high_quality: Se deve usar configurações de alta qualidade
+            minify: Se deve reduzir o tamanho do SVG
+
+        Returns:
+            Dicionário tema -> SVG em bytes, na ordem de `themes`
+        """
+        self._validate_chart_data(chart_type)
+
+        results: Dict[str, bytes] = {}
+        pending = []
+        for theme in dict.fromkeys(themes):
+            cache_key = self._cache_key(chart_type, theme, high_quality, None, None, minify)
+            cached_svg = _svg_cache.get(cache_key) if cache_key is not None else None
+            if cached_svg is not None:
+                results[theme] = cached_svg
+            else:
+                pending.append((theme, cache_key))
+
+        if pending:
             try:
-                # Prepare parameters for KerykeionChartSVG constructor
-                # Kerykeion v4 usually takes chart_type_name, and other visual settings directly.
-                # Custom colors from the theme are also often passed via a parameter like `custom_colors`.
-
-                chart_params = {
-                    "chart_type_name": config["chart_type"], # Use chart_type_name for K4
-                    "output_directory": temp_path,
-                    # Visual settings from config:
-                    "chart_size_percentage": config.get("chart_size", 100), # Assuming chart_size is a percentage or needs mapping
-                    # Kerykeion v4 might use chart_size_px for pixel dimensions directly
-                    # For now, let's assume chart_size_percentage is what K4 expects or can handle.
-                    # Or, if K4 uses width/height:
-                    # "chart_width": config.get("chart_width"),
-                    # "chart_height": config.get("chart_height"),
-                    "show_aspects": config["show_aspects"],
-                    "show_degree_symbols": config["show_degree_symbols"],
-                    "show_planet_glyphs": config["show_planet_symbols"], # K4 often uses 'show_planet_glyphs'
-                    "show_zodiac_glyphs": config["show_zodiac_symbols"], # K4 often uses 'show_zodiac_glyphs'
-                    "show_houses": config["show_houses"],
-                    "aspects_settings": config["aspects_settings"],
-                    # Custom colors from theme:
-                    # The _apply_theme_to_chart method currently updates chart.colors directly.
-                    # Alternatively, if K4 KerykeionChartSVG takes custom_colors dict:
-                    "custom_colors": self.THEME_CONFIGURATIONS.get(theme, self.THEME_CONFIGURATIONS["light"]),
-                    # Add active_points to chart_params if provided, based on K4 guide
-                    "active_points": active_points if active_points else None
-                }
-
-                # Filter out None values from chart_params for optional parameters like active_points
-                chart_params = {k: v for k, v in chart_params.items() if v is not None or k not in ["active_points"]}
-                # If active_points is None, it might still need to be passed as None if the constructor expects it.
-                # Or, if KerykeionChartSVG uses its default if 'active_points' is missing, we can filter None.
-                # For safety, let's ensure active_points is in chart_params if it was originally provided by the user, even if None.
-                # A better filter might be:
-                # chart_params = {k: v for k, v in chart_params.items() if not (k == "active_points" and v is None)}
-                # This ensures active_points is only added if it's not None.
-                # However, Kerykeion might expect active_points=None to mean "use defaults".
-                # The previous chart_params update already includes active_points: active_points if active_points else None
-                # So, if active_points is None from the function call, it will be None in chart_params.
-                # The filtering chart_params = {k: v for k,v in chart_params.items() if v is not None} will remove it if it's None.
-                # This is probably fine, as KerykeionChartSVG will use its default list of points if active_points param is missing.
-                # Let's refine the filtering to keep active_points if it's explicitly None.
-                # No, the original filter is better: if active_points is None from input, it will be None in dict.
-                # Then {k: v for k, v in chart_params.items() if v is not None} will REMOVE active_points from chart_params
-                # if its value is None. This is generally the desired behavior for optional params.
-                # If active_points is an empty list, it will be passed as an empty list.
-
-                # Revised filtering for clarity for active_points:
-                # We want to pass active_points if it's a list (even empty).
-                # If it's None (default from function signature), we don't want to pass the key at all to KSVG.
-                if active_points is None:
-                    if "active_points" in chart_params: # It would be None here
-                        del chart_params["active_points"]
-                # All other None values for other parameters will be filtered by the next line:
-                chart_params = {k: v for k, v in chart_params.items() if v is not None}
-
-
-
-                # Create KerykeionChartSVG instance
-                if chart_type == "natal":
-                    chart = KerykeionChartSVG(self.natal_subject, **chart_params)
-                elif chart_type == "transit":
-                    chart = KerykeionChartSVG(self.transit_subject, self.natal_subject, **chart_params)
-                elif chart_type == "synastry":
-                    chart = KerykeionChartSVG(self.natal_subject, self.transit_subject, **chart_params)
-                elif chart_type == "composite":
-                    chart = KerykeionChartSVG(self.natal_subject, **chart_params) # self.natal_subject is the composite_subject
-                else:
-                    chart = KerykeionChartSVG(self.natal_subject, **chart_params) # Default to natal
-
-                # The `show_aspects` parameter is now passed to KerykeionChartSVG constructor.
-                # The old logic to manually clear aspects_settings if show_aspects is False is no longer needed here.
-                # if not config["show_aspects"] and hasattr(chart, 'aspects_settings'):
-                #    chart.aspects_settings = {} # Or an empty list, depending on Kerykeion's expectation
-
-                # Kerykeion v4 typically generates SVG by calling makeSVG() which writes to a file.
-                # It usually does not have get_svg_string() or makeSVG(get_svg=True).
-                print(f"Calling KerykeionChartSVG.makeSVG() for chart_type: {chart_type} in dir: {temp_path}")
-                chart.makeSVG()
-
-                svg_content = None
-                # Attempt to read from file first (most reliable for K4)
-                # Kerykeion typically names the file based on the subject's name or type.
-                # Example: Natal_Chart_John_Doe.svg or Transit_Chart_Event.svg
-                # We need a robust way to find the generated file.
-                # Assuming Kerykeion uses subject name and chart type in filename.
-                # A simpler way is to list all SVGs in temp_dir and pick the newest one if only one chart is made.
-                
-                svg_files = list(temp_path.glob("*.svg"))
-                if not svg_files:
-                    # Check for .xml as Kerykeion sometimes used that extension for SVG data.
-                    svg_files = list(temp_path.glob("*.xml"))
-
-                if svg_files:
-                    svg_files.sort(key=lambda x: os.path.getmtime(x), reverse=True)
-                    svg_file_path = svg_files[0]
-                    with open(svg_file_path, 'r', encoding='utf-8') as f:
-                        svg_content = f.read()
-                    print(f"Retrieved SVG from file: {svg_file_path}")
-                else: # Fallback to checking attributes, though less likely for K4
-                    if hasattr(chart, 'svg_string') and chart.svg_string:
-                        svg_content = chart.svg_string
-                        print("Retrieved SVG from chart.svg_string attribute.")
-                    elif hasattr(chart, 'svg') and chart.svg:
-                        svg_content = chart.svg
-                        print("Retrieved SVG from chart.svg attribute.")
-                
-                if not svg_content:
-                    raise FileNotFoundError(f"Nenhum arquivo SVG foi gerado por KerykeionChartSVG.makeSVG() no diretório {temp_path} ou encontrado nos atributos.")
-
-                # Otimizar SVG para melhor qualidade
-                if high_quality: # high_quality is a parameter of generate_enhanced_svg
-                    svg_content = self._optimize_svg_output(svg_content, chart_type)
-                
-                return svg_content
-                
+                # Geometria calculada uma vez; a cada tema só o <style> do chart é trocado
+                chart = self._build_chart(chart_type, pending[0][0], None, None)
+                for theme, cache_key in pending:
+                    self._apply_theme_to_chart(chart, theme)
+                    svg_content = self._chart_to_svg(chart, chart_type, high_quality)
+                    if minify:
+                        svg_content = _minify_svg(svg_content)
+                    if cache_key is not None:
+                        _svg_cache.set(cache_key, svg_content)
+                    results[theme] = svg_content
             except Exception as e:
                 raise Exception(f"Erro ao gerar SVG aprimorado: {str(e)}")
 
+        return {theme: results[theme] for theme in themes}
+
+    def _build_chart(
+        self,
+        chart_type: str,
+        theme: str,
+        custom_settings: Optional[Dict[str, Any]],
+        active_points: Optional[List[str]]
+    ) -> Any:
+        """
+        Cria o KerykeionChartSVG (cálculo de posições, casas e aspectos) com as cores do tema.
+        """
+        # Transit: mapa natal por dentro e trânsitos por fora; synastry: as duas pessoas.
+        # Em "composite", natal_subject é o CompositeSubjectModel
+        second_subject = self.transit_subject if chart_type in ("transit", "synastry") else None
+
+        # Parâmetros do KerykeionChartSVG; opcionais só entram quando definidos
+        chart_params = {
+            **self._configure_advanced_settings(chart_type),
+            "second_obj": second_subject
+        }
+        if custom_settings:
+            chart_params["active_aspects"] = self._custom_active_aspects(chart_type, custom_settings)
+        # Lista vazia ou None: o Kerykeion usa seus pontos padrão
+        if active_points:
+            chart_params["active_points"] = active_points
+
+        from kerykeion import KerykeionChartSVG
+
+        chart = KerykeionChartSVG(self.natal_subject, **chart_params)
+        self._apply_theme_to_chart(chart, theme)
+        return chart
+
+    def _custom_active_aspects(self, chart_type: str, custom_settings: Mapping[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Aspectos ativos com as configurações personalizadas aplicadas.
+
+        O Kerykeion 4 só aceita a lista de aspectos (com orbes) no construtor do chart:
+        "aspects_settings" substitui os aspectos do tipo e "orb_reduction" multiplica os orbes.
+        As demais chaves não têm equivalente e são ignoradas.
+        """
+        ignored = set(custom_settings) - _SUPPORTED_CUSTOM_SETTINGS
+        if ignored:
+            _LOGGER.debug("Configurações sem efeito no Kerykeion 4 ignoradas: %s", sorted(ignored))
+        aspects_settings = custom_settings.get(
+            "aspects_settings",
+            self.CHART_CONFIGURATIONS.get(chart_type, self.CHART_CONFIGURATIONS["natal"])["aspects_settings"]
+        )
+        return self._build_active_aspects(aspects_settings, custom_settings.get("orb_reduction", 1.0))
+
+    def _chart_to_svg(self, chart: Any, chart_type: str, high_quality: bool) -> bytes:
+        """
+        Renderiza um KerykeionChartSVG já calculado e aplica a otimização de saída.
+        """
+        svg_content = None
+
+        # Kerykeion v4 expõe makeTemplate(), que devolve o SVG já renderizado em memória:
+        # evita a escrita do arquivo por makeSVG() e a leitura de volta
+        make_template = getattr(chart, 'makeTemplate', None)
+        if callable(make_template):
+            _LOGGER.debug("Calling KerykeionChartSVG.makeTemplate() for chart_type: %s", chart_type)
+            template = make_template()
+            if template:
+                svg_content = template.encode('utf-8')
+
+        if svg_content is None:
+            svg_content = self._chart_to_svg_via_file(chart, chart_type)
+
+        # Otimizar SVG para melhor qualidade
+        if high_quality: # high_quality is a parameter of generate_enhanced_svg
+            svg_content = self._optimize_svg_output(svg_content, chart_type)
+        
+        return svg_content
+
+    def _chart_to_svg_via_file(self, chart: Any, chart_type: str) -> bytes:
+        """
+        Alternativa para versões sem makeTemplate(): makeSVG() grava o arquivo num
+        subdiretório temporário próprio, lido de volta e removido em segundo plano.
+        """
+        temp_path = _new_scratch_dir()
+        try:
+            chart.set_output_directory(temp_path)
+            _LOGGER.debug("Calling KerykeionChartSVG.makeSVG() for chart_type: %s in dir: %s", chart_type, temp_path)
+            chart.makeSVG()
+
+            svg_file_path = self._find_newest_svg_file(temp_path)
+            if svg_file_path:
+                _LOGGER.debug("Retrieved SVG from file: %s", svg_file_path)
+                return Path(svg_file_path).read_bytes()
+            # Fallback to checking attributes, though less likely for K4
+            if getattr(chart, 'svg_string', None):
+                _LOGGER.debug("Retrieved SVG from chart.svg_string attribute.")
+                return chart.svg_string.encode('utf-8')
+            if getattr(chart, 'svg', None):
+                _LOGGER.debug("Retrieved SVG from chart.svg attribute.")
+                return chart.svg.encode('utf-8')
+            raise FileNotFoundError(f"Nenhum arquivo SVG foi gerado por KerykeionChartSVG.makeSVG() no diretório {temp_path} ou encontrado nos atributos.")
+        finally:
+            # Remoção em segundo plano: o chamador não espera o rmtree
+            _SCRATCH_CLEANUP.submit(shutil.rmtree, temp_path, True)
+
+    @staticmethod
+    def _find_newest_svg_file(directory: Path) -> Optional[str]:
+        """
+        Retorna o arquivo SVG mais recente do diretório (ou .xml, se não houver .svg).
+
+        Em um diretório temporário novo normalmente existe um único arquivo, então
+        o mtime só é consultado quando há mais de um candidato.
+        """
+        with os.scandir(directory) as it:
+            entries = [entry for entry in it if entry.name.endswith(('.svg', '.xml')) and entry.is_file()]
+
+        # Kerykeion às vezes usava a extensão .xml para o SVG: só considerar se não houver .svg
+        candidates = [entry for entry in entries if entry.name.endswith('.svg')] or entries
+        if not candidates:
+            return None
+        if len(candidates) == 1:
+            return candidates[0].path
+        return max(candidates, key=lambda entry: entry.stat().st_mtime_ns).path
+
     def generate_multiple_formats(
         self,
         chart_type: str = "natal",
         theme: str = "light",
         formats: List[str] = ["svg"]
-    ) -> Dict[str, str]:
+    ) -> Dict[str, bytes]:
         """
         Gera o chart em múltiplos formatos.
         
@@ -483,7 +837,7 @@ class EnhancedSVGGenerator:
             formats: Lista de formatos desejados ["svg", "png", "pdf"]
             
         Returns:
-            Dicionário com formato -> conteúdo
+            Dicionário com formato -> conteúdo (bytes); "svg" sempre incluído
         """
         results = {}
         
@@ -491,8 +845,23 @@ class EnhancedSVGGenerator:
         svg_content = self.generate_enhanced_svg(chart_type, theme)
         results["svg"] = svg_content
         
-        # TODO: Implementar conversão para outros formatos se necessário
-        # Para PNG e PDF, seria necessário usar bibliotecas como cairosvg ou wkhtmltopdf
+        # Conversões (CPU-bound) para os demais formatos
+        extra_formats = [fmt for fmt in dict.fromkeys(formats) if fmt != "svg"]
+        unsupported = [fmt for fmt in extra_formats if fmt not in _CONVERTIBLE_FORMATS]
+        if unsupported:
+            raise ValueError(f"Formatos não suportados: {unsupported}")
+
+        if not extra_formats:
+            return results
+        # Falha aqui, com a mensagem clara, antes de enviar trabalho ao pool
+        _get_cairosvg()
+
+        if len(extra_formats) == 1:
+            results[extra_formats[0]] = _render_format(svg_content, extra_formats[0])
+        else:
+            executor = _get_format_pool()
+            futures = {fmt: executor.submit(_render_format, svg_content, fmt) for fmt in extra_formats}
+            results.update({fmt: future.result() for fmt, future in futures.items()})
         
         return results
 
@@ -506,8 +875,19 @@ class EnhancedSVGGenerator:
         Returns:
             Dicionário com informações do chart
         """
-        self._validate_chart_data(chart_type)
+        cached = self._chart_info_cache.get(chart_type)
+        if cached is None or cached[0] is not self.natal_subject or cached[1] is not self.transit_subject:
+            self._validate_chart_data(chart_type)
+            cached = (self.natal_subject, self.transit_subject, self._build_chart_info(chart_type))
+            self._chart_info_cache[chart_type] = cached
         
+        # Cópia dos dicionários: os chamadores podem alterar o resultado (ex.: o router)
+        return {key: dict(value) if isinstance(value, dict) else value for key, value in cached[2].items()}
+
+    def _build_chart_info(self, chart_type: str) -> Dict[str, Any]:
+        """
+        Monta as informações do chart a partir dos subjects atuais.
+        """
         info = {
             "chart_type": chart_type,
             "primary_subject": {
@@ -526,4 +906,42 @@ class EnhancedSVGGenerator:
                 "location": f"Lat: {self.transit_subject.lat}, Lon: {self.transit_subject.lng}"
             }
         
-        return info
\ No newline at end of file
+        return info
+
+
+# Nomes dos aspectos do Kerykeion 4 que diferem das chaves de aspects_settings
+_KERYKEION_ASPECT_NAMES: Mapping[str, str] = MappingProxyType({
+    "semi_sextile": "semi-sextile",
+    "semi_square": "semi-square",
+    "sesqui_square": "sesquiquadrate",
+    "bi_quintile": "biquintile",
+})
+
+# Chaves de custom_settings que têm efeito no chart (ver _custom_active_aspects)
+_SUPPORTED_CUSTOM_SETTINGS = frozenset(("aspects_settings", "orb_reduction"))
+
+# Parâmetros do KerykeionChartSVG pré-calculados para cada tipo de chart
+_PRECOMPUTED_CONFIGS: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    chart_type: MappingProxyType({
+        "chart_type": config["chart_type"],
+        "active_aspects": EnhancedSVGGenerator._build_active_aspects(config["aspects_settings"]),
+    })
+    for chart_type, config in EnhancedSVGGenerator.CHART_CONFIGURATIONS.items()
+})
+
+# Cores aplicadas em chart.colors, pré-calculadas para cada tema
+_THEME_CHART_COLORS: Mapping[str, Mapping[str, str]] = MappingProxyType({
+    theme: MappingProxyType(EnhancedSVGGenerator._build_theme_chart_colors(theme_config))
+    for theme, theme_config in EnhancedSVGGenerator.THEME_CONFIGURATIONS.items()
+})
+
+# Tema base do Kerykeion sobre o qual cada tema é aplicado (os demais usam "light")
+_KERYKEION_BASE_THEMES: Mapping[str, str] = MappingProxyType({"dark": "dark"})
+
+# Cores de cada tema como variáveis CSS do Kerykeion, acrescentadas ao <style> do tema base
+_THEME_CSS: Mapping[str, str] = MappingProxyType({
+    theme: ":root {" + "".join(
+        f" --kerykeion-chart-color-{key.replace('_', '-')}: {color};" for key, color in colors.items()
+    ) + " }"
+    for theme, colors in _THEME_CHART_COLORS.items()
+})
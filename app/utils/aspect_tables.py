@@ -0,0 +1,38 @@
+"""
+Tabelas de aspectos compartilhadas entre os módulos de pontuação e resumo.
+
+As tabelas são criadas uma única vez na importação e expostas como
+mapeamentos somente leitura.
+"""
+from types import MappingProxyType
+from typing import Mapping
+
+# Classificação de cada aspecto (nome -> tipo)
+ASPECT_TYPE: Mapping[str, str] = MappingProxyType({
+    "conjunction": "harmonic", # Can be neutral or vary; simplified here
+    "opposition": "tense",
+    "trine": "harmonic",
+    "square": "tense",
+    "sextile": "harmonic",
+    "quincunx": "neutral", # Often seen as requiring adjustment
+    "semi_sextile": "neutral",
+    "semi_square": "tense",
+    "sesquiquadrate": "tense", # Kerykeion might use sesquisquare
+    "quintile": "harmonic", # Often seen as minor creative
+    "biquintile": "harmonic" # Often seen as minor creative
+})
+
+# Pesos por tipo de aspecto
+ASPECT_TYPE_WEIGHT: Mapping[str, float] = MappingProxyType({
+    "harmonic": 2.0,
+    "neutral": 1.0,
+    "tense": -1.0
+})
+
+# Pesos por planetas envolvidos ("Default" para outros pontos)
+PLANET_WEIGHT: Mapping[str, float] = MappingProxyType({
+    "Sun": 3.0, "Moon": 3.0, "Venus": 2.5, "Mars": 2.0,
+    "Mercury": 1.5, "Jupiter": 2.0, "Saturn": 1.5,
+    "Uranus": 1.0, "Neptune": 1.0, "Pluto": 1.0,
+    "Default": 0.5
+})
@@ -18,74 +18,334 @@ Versão: 1.0.0
 from geopy.geocoders import Nominatim
 from geopy.exc import GeocoderTimedOut, GeocoderServiceError
 from timezonefinder import TimezoneFinder
-from datetime import datetime
+# tzfpy (Rust) é opcional: consulta de fuso por coordenadas bem mais rápida que o TimezoneFinder
+try:
+    from tzfpy import get_tz as _tzfpy_get_tz
+    TZFPY_AVAILABLE = True
+except ImportError:
+    _tzfpy_get_tz = None
+    TZFPY_AVAILABLE = False
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 import pytz
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import functools
 import json
+# orjson é opcional: parse de JSON em C, mais rápido que o módulo json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+# aiohttp é opcional: versões assíncronas das consultas sem bloquear o event loop
+try:
+    import aiohttp
+    from geopy.adapters import AioHTTPAdapter
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    aiohttp = None
+    AioHTTPAdapter = None
+    AIOHTTP_AVAILABLE = False
+import asyncio
+import logging
 import math
+import os
+import unicodedata
+import atexit
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+_LOGGER = logging.getLogger(__name__)
+
+# Diretório dos caches persistentes (sobrevivem a reinícios do processo)
+_CACHE_DIR = os.path.expanduser(os.environ.get("ASTRO_GEO_CACHE_DIR", "~/.cache/astro"))
+
+# Escritas no SQLite são confirmadas em lote: a cada _COMMIT_EVERY escritas, quando a
+# última confirmação tem mais de _COMMIT_INTERVAL segundos, no clear() e na saída do processo
+_COMMIT_EVERY = 32
+_COMMIT_INTERVAL = 5.0
+
+# Marcador de resultado negativo conhecido ("não encontrado"), distinto de ausência no cache
+_MISS = object()
 
 class GeocodingCache:
-    """Cache para evitar consultas repetidas de geocodificação e dados astronômicos"""
-    def __init__(self, max_size=1000):
-        self._cache = {}
+    """
+    Cache LRU para evitar consultas repetidas de geocodificação e dados astronômicos.
+
+    Com `persist_path`, os itens também são gravados (como JSON) numa tabela SQLite, de
+    modo que consultas já feitas por outros processos (ou antes de um reinício) não voltam à API.
+    `ttl` (segundos) limita a idade das entradas. Valores `None` são guardados como
+    resultado negativo: `get` retorna `_MISS` enquanto valerem (`negative_ttl`).
+    """
+    def __init__(self, max_size=1000, persist_path=None, ttl=None, negative_ttl=86400):
+        self._cache = OrderedDict()  # chave -> (valor, instante de expiração ou None)
         self._max_size = max_size
+        self._persist_path = persist_path
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._db = None
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+        self._last_commit = time.monotonic()
+        if persist_path:
+            atexit.register(self.flush)
+    
+    def _expires_at(self, value, stored_at):
+        ttl = self._negative_ttl if value is None else self._ttl
+        return None if ttl is None else stored_at + ttl
+    
+    def _get_db(self):
+        """Abre (sob demanda) a conexão SQLite; retorna None se a persistência estiver indisponível"""
+        if self._db is None and self._persist_path:
+            try:
+                os.makedirs(os.path.dirname(self._persist_path), exist_ok=True)
+                db = sqlite3.connect(self._persist_path, check_same_thread=False)
+                db.execute("CREATE TABLE IF NOT EXISTS kv_json (k TEXT PRIMARY KEY, v TEXT, ts REAL)")
+                db.commit()
+                self._db = db
+            except (OSError, sqlite3.Error) as e:
+                _LOGGER.warning("Cache persistente indisponível em %s: %s", self._persist_path, e)
+                self._persist_path = None
+        return self._db
     
     def get(self, key):
-        """Obtém um valor do cache se existir"""
-        return self._cache.get(key)
+        """
+        Obtém um valor do cache (e o marca como usado recentemente).
+        Retorna None se ausente/expirado e `_MISS` para um resultado negativo conhecido.
+        """
+        # O cache é acessado por várias threads (threadpool do FastAPI, _IO_EXECUTOR):
+        # leituras, reordenações e descartes do OrderedDict ficam sob o lock
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or time.time() < expires_at:
+                    self._cache.move_to_end(key)
+                    return _MISS if value is None else value
+                del self._cache[key]
+            
+            if not self._persist_path:
+                return None
+            db = self._get_db()
+            if db is None:
+                return None
+            row = db.execute("SELECT v, ts FROM kv_json WHERE k = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            try:
+                value = json.loads(row[0])
+            except ValueError:
+                return None
+            expires_at = self._expires_at(value, row[1])
+            if expires_at is not None and time.time() >= expires_at:
+                return None
+            self._remember(key, value, expires_at)
+        return _MISS if value is None else value
     
     def set(self, key, value):
-        """Armazena um valor no cache com controle de tamanho"""
-        # Implementação simples de LRU: se o cache estiver cheio, limpa 20% dos itens
-        if len(self._cache) >= self._max_size:
-            # Remove 20% dos itens mais antigos
-            remove_count = int(self._max_size * 0.2)
-            keys_to_remove = list(self._cache.keys())[:remove_count]
-            for k in keys_to_remove:
-                del self._cache[k]
-        
-        self._cache[key] = value
+        """Armazena um valor no cache, descartando o item usado há mais tempo se estiver cheio"""
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, self._expires_at(value, now))
+            
+            if not self._persist_path:
+                return
+            db = self._get_db()
+            if db is None:
+                return
+            db.execute(
+                "INSERT OR REPLACE INTO kv_json (k, v, ts) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now)
+            )
+            self._pending_writes += 1
+            if self._pending_writes >= _COMMIT_EVERY or time.monotonic() - self._last_commit >= _COMMIT_INTERVAL:
+                self._commit(db)
+    
+    def _commit(self, db):
+        """Confirma as escritas pendentes; deve ser chamado com `self._lock` adquirido"""
+        db.commit()
+        self._pending_writes = 0
+        self._last_commit = time.monotonic()
+    
+    def flush(self):
+        """Confirma no disco as escritas ainda pendentes"""
+        with self._lock:
+            if self._db is not None and self._pending_writes:
+                self._commit(self._db)
+    
+    def _remember(self, key, value, expires_at):
+        """Insere no LRU em memória; deve ser chamado com `self._lock` adquirido"""
+        if key in self._cache:
+            self._cache.move_to_end(key)
+        self._cache[key] = (value, expires_at)
+        if len(self._cache) > self._max_size:
+            self._cache.popitem(last=False)
     
     def clear(self):
-        """Limpa todo o cache"""
-        self._cache.clear()
+        """Limpa todo o cache (memória e disco)"""
+        with self._lock:
+            self._cache.clear()
+            if self._persist_path:
+                db = self._get_db()
+                if db is not None:
+                    db.execute("DELETE FROM kv_json")
+                    self._commit(db)
     
     def size(self):
-        """Retorna o número de itens no cache"""
+        """Retorna o número de itens no cache em memória"""
         return len(self._cache)
 
-# Caches globais
-_geocoding_cache = GeocodingCache()
-_timezone_cache = GeocodingCache()
-_elevation_cache = GeocodingCache()
-_astro_data_cache = GeocodingCache()
+# Caches globais (persistidos em disco; a elevação praticamente não muda, fusos podem mudar de regra)
+_geocoding_cache = GeocodingCache(persist_path=os.path.join(_CACHE_DIR, "geo.db"), ttl=30 * 86400, negative_ttl=86400)
+_timezone_cache = GeocodingCache(persist_path=os.path.join(_CACHE_DIR, "timezone_name.db"), ttl=7 * 86400)
+_elevation_cache = GeocodingCache(persist_path=os.path.join(_CACHE_DIR, "elevation.db"))
+_astro_data_cache = GeocodingCache(persist_path=os.path.join(_CACHE_DIR, "astro_data.db"), ttl=7 * 86400)
+
+def _loads_response(response):
+    """Decodifica o corpo JSON de uma resposta HTTP (com orjson quando disponível)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(response.content)
+    return json.loads(response.content)
+
+# Campos da resposta do Nominatim mantidos em "raw_data" (o restante não é usado)
+_RAW_KEEP_KEYS = ("place_id", "type", "display_name", "boundingbox")
+
+# Sessão HTTP compartilhada: keep-alive (sem novo handshake TLS a cada chamada) e
+# retentativas uniformes para 429/5xx
+_SESSION = requests.Session()
+_SESSION.headers["User-Agent"] = "astrology_app/1.0"
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=None)
+))
+
+# Geolocalizador Nominatim único (mantém sua própria conexão aberta entre consultas)
+_GEOLOCATOR = None
+
+def _get_geolocator():
+    global _GEOLOCATOR
+    if _GEOLOCATOR is None:
+        _GEOLOCATOR = Nominatim(
+            user_agent="astrology_app_geocoder_v1.0",
+            timeout=10
+        )
+    return _GEOLOCATOR
+
+# Threads para as chamadas de rede independentes de get_astro_location_data
+_IO_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="astro_geo")
+
+# TimezoneFinder carrega seus binários na inicialização: uma única instância por processo
+_TF = None
+_TF_LOCK = threading.Lock()
+
+def _get_tf():
+    """Retorna o TimezoneFinder compartilhado, criando-o na primeira chamada"""
+    global _TF
+    if _TF is None:
+        with _TF_LOCK:
+            if _TF is None:
+                _TF = TimezoneFinder(in_memory=True)
+    return _TF
 
-def rate_limit(min_interval=1.0):
+# Precisão (casas decimais) das chaves de cache por coordenada: o fuso é estável na escala
+# de ~1 km e a elevação na de ~100 m, então coordenadas quase iguais compartilham a entrada
+_TIMEZONE_KEY_PRECISION = 2
+_ELEVATION_KEY_PRECISION = 3
+
+def _pos_key(latitude, longitude, precision):
+    """Chave de cache para coordenadas arredondadas a `precision` casas decimais"""
+    return f"{latitude:.{precision}f},{longitude:.{precision}f}"
+
+# Requisições remotas em andamento, por chave (single-flight)
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+def _single_flight(key, fn):
+    """
+    Executa `fn` uma única vez para chamadas simultâneas com a mesma chave: a primeira
+    thread faz o trabalho e as demais aguardam e recebem o mesmo resultado.
     """
-    Decorator para implementar rate limiting em chamadas de API
+    with _inflight_lock:
+        future = _inflight.get(key)
+        is_leader = future is None
+        if is_leader:
+            future = Future()
+            _inflight[key] = future
     
-    Args:
-        min_interval (float): Intervalo mínimo entre chamadas em segundos
+    if not is_leader:
+        return future.result()
+    
+    try:
+        result = fn()
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+def _norm_key(location_name):
     """
-    def decorator(func):
-        last_called = [0.0]
-        
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            elapsed = time.time() - last_called[0]
-            left_to_wait = min_interval - elapsed
-            if left_to_wait > 0:
-                time.sleep(left_to_wait)
-            ret = func(*args, **kwargs)
-            last_called[0] = time.time()
-            return ret
-        return wrapper
-    return decorator
-
-@rate_limit(1.1)  # Nominatim permite 1 req/segundo, usando 1.1 para segurança
-def geocode_location(location_name, use_cache=True, max_retries=3):
+    Normaliza um nome de local para uso como chave de cache
+    ("São Paulo", "sao paulo " e "SAO PAULO" viram a mesma chave).
+    """
+    # Remove apenas os acentos (marcas combinantes), preservando nomes em outros alfabetos
+    decomposed = unicodedata.normalize("NFKD", location_name)
+    folded = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(folded.casefold().split())
+
+class RateLimiter:
+    """
+    Limitador de taxa thread-safe por chave (ex.: hostname da API).
+    Cada chamada reserva o próximo horário livre sob o lock e dorme fora dele.
+    """
+    def __init__(self):
+        self._next = {}
+        self._lock = threading.Lock()
+    
+    def _reserve(self, key, min_interval):
+        """Reserva o próximo horário livre para `key` e retorna quanto falta até ele"""
+        with self._lock:
+            now = time.monotonic()
+            due = max(self._next.get(key, 0.0), now)
+            self._next[key] = due + min_interval
+        return due - now
+    
+    def wait(self, key, min_interval):
+        """Bloqueia até que a próxima chamada para `key` seja permitida"""
+        delay = self._reserve(key, min_interval)
+        if delay > 0:
+            time.sleep(delay)
+    
+    async def wait_async(self, key, min_interval):
+        """Versão assíncrona de `wait`: aguarda com asyncio.sleep, sem bloquear o event loop"""
+        delay = self._reserve(key, min_interval)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+_RATE_LIMITER = RateLimiter()
+
+def _location_result(location, include_raw=False):
+    """Converte um `geopy.Location` no dicionário retornado por geocode_location"""
+    return {
+        "address": location.address,
+        "latitude": location.latitude,
+        "longitude": location.longitude,
+        # Dados completos da resposta só quando pedidos; senão, apenas um resumo
+        "raw_data": location.raw if include_raw else {k: location.raw.get(k) for k in _RAW_KEEP_KEYS}
+    }
+
+def geocode_location(location_name, use_cache=True, max_retries=3, include_raw=False):
     """
     Converte um nome de local em coordenadas de latitude e longitude.
     Utiliza o serviço Nominatim do OpenStreetMap com melhorias.
@@ -94,75 +354,93 @@ def geocode_location(location_name, use_cache=True, max_retries=3):
         location_name (str): Nome do local para geocodificar
         use_cache (bool): Se deve usar cache para consultas repetidas
         max_retries (int): Número máximo de tentativas em caso de timeout
+        include_raw (bool): Se deve retornar a resposta completa do Nominatim em
+            "raw_data" (não usa cache); por padrão só um resumo é mantido
     
     Returns:
         dict ou None: Dados da localização ou None se não encontrada
     """
     # Validação de entrada
     if not location_name or not isinstance(location_name, str):
-        print("Erro: Nome da localização deve ser uma string não vazia.")
+        _LOGGER.debug("Nome da localização deve ser uma string não vazia.")
         return None
     
     location_name = location_name.strip()
     if not location_name:
-        print("Erro: Nome da localização não pode estar vazio.")
+        _LOGGER.debug("Nome da localização não pode estar vazio.")
         return None
     
-    # Verificar cache
+    # Verificar cache (chave normalizada; a consulta ao Nominatim usa o nome original)
+    cache_key = _norm_key(location_name)
+    # A resposta completa não vai para o cache (ocupa muito espaço)
+    use_cache = use_cache and not include_raw
     if use_cache:
-        cached_result = _geocoding_cache.get(location_name)
+        cached_result = _geocoding_cache.get(cache_key)
+        if cached_result is _MISS:
+            # Local já consultado e não encontrado recentemente
+            return None
         if cached_result is not None:
-            print(f"  (Resultado obtido do cache)")
+            _LOGGER.debug("Geocodificação obtida do cache: %s", location_name)
             return cached_result
     
-    # Configurar geolocalizador com user-agent mais específico
-    geolocator = Nominatim(
-        user_agent="astrology_app_geocoder_v1.0",
-        timeout=10
-    )
+    def _lookup():
+        # Geolocalizador compartilhado, com user-agent mais específico
+        geolocator = _get_geolocator()
     
-    # Tentar geocodificar com retry
-    for attempt in range(max_retries):
-        try:
-            location = geolocator.geocode(location_name, timeout=10)
+        # Tentar geocodificar com retry
+        for attempt in range(max_retries):
+            try:
+                # Nominatim permite 1 req/segundo, usando 1.1 para segurança
+                _RATE_LIMITER.wait("nominatim.openstreetmap.org", 1.1)
+                location = geolocator.geocode(location_name, timeout=10)
             
-            if location:
-                result = {
-                    "address": location.address,
-                    "latitude": location.latitude,
-                    "longitude": location.longitude,
-                    "raw_data": location.raw  # Dados completos da resposta
-                }
+                if location:
+                    result = _location_result(location, include_raw)
                 
-                # Salvar no cache
-                if use_cache:
-                    _geocoding_cache.set(location_name, result)
+                    # Salvar no cache
+                    if use_cache:
+                        _geocoding_cache.set(cache_key, result)
                 
-                return result
-            else:
-                # Não encontrado, salvar no cache para evitar consultas repetidas
-                if use_cache:
-                    _geocoding_cache.set(location_name, None)
-                return None
+                    return result
+                else:
+                    # Não encontrado, salvar no cache para evitar consultas repetidas
+                    if use_cache:
+                        _geocoding_cache.set(cache_key, None)
+                    return None
                 
-        except GeocoderTimedOut:
-            if attempt < max_retries - 1:
-                print(f"  Timeout na tentativa {attempt + 1}, tentando novamente...")
-                time.sleep(2)  # Aguardar antes de tentar novamente
-            else:
-                print("Erro: O serviço de geocodificação excedeu o tempo limite após múltiplas tentativas.")
-                return None
+            except GeocoderTimedOut:
+                if attempt < max_retries - 1:
+                    _LOGGER.debug("Timeout na tentativa %d para %s, tentando novamente...", attempt + 1, location_name)
+                    time.sleep(2)  # Aguardar antes de tentar novamente
+                else:
+                    _LOGGER.warning("O serviço de geocodificação excedeu o tempo limite após múltiplas tentativas: %s", location_name)
+                    return None
                 
-        except GeocoderServiceError as e:
-            print(f"Erro no serviço de geocodificação: {e}")
-            return None
+            except GeocoderServiceError as e:
+                _LOGGER.warning("Erro no serviço de geocodificação: %s", e)
+                return None
     
-    return None
+        return None
+    
+    # Consultas simultâneas do mesmo local compartilham uma única requisição
+    if use_cache:
+        return _single_flight(("geocode", cache_key), _lookup)
+    return _lookup()
 
-@rate_limit(1.0)
-def get_timezone_data(latitude, longitude, use_cache=True):
+@functools.lru_cache(maxsize=512)
+def _tz(timezone_str):
     """
-    Obtém informações de fuso horário para coordenadas geográficas.
+    Objeto tzinfo do fuso horário (memoizado por nome). Usa o zoneinfo da biblioteca
+    padrão (em C); o pytz fica como alternativa se o sistema não tiver a base de fusos.
+    """
+    try:
+        return ZoneInfo(timezone_str)
+    except ZoneInfoNotFoundError:
+        return pytz.timezone(timezone_str)
+
+def get_timezone_name(latitude, longitude, use_cache=True):
+    """
+    Obtém o nome do fuso horário (ex.: "America/Sao_Paulo") para coordenadas geográficas.
     
     Args:
         latitude (float): Latitude da localização
@@ -170,15 +448,10 @@ def get_timezone_data(latitude, longitude, use_cache=True):
         use_cache (bool): Se deve usar cache para consultas repetidas
     
     Returns:
-        dict: Informações de fuso horário ou None se não encontrado
+        str: Nome do fuso horário ou None se não encontrado
     """
-    # Validação de entrada
-    if not isinstance(latitude, (int, float)) or not isinstance(longitude, (int, float)):
-        print("Erro: Latitude e longitude devem ser números.")
-        return None
-    
     # Chave de cache
-    cache_key = f"{latitude:.6f},{longitude:.6f}"
+    cache_key = _pos_key(latitude, longitude, _TIMEZONE_KEY_PRECISION)
     
     # Verificar cache
     if use_cache:
@@ -186,38 +459,79 @@ def get_timezone_data(latitude, longitude, use_cache=True):
         if cached_result is not None:
             return cached_result
     
+    # Determinar o fuso horário (tzfpy se instalado; TimezoneFinder como alternativa,
+    # inclusive quando o tzfpy não resolve o ponto)
+    timezone_str = _tzfpy_get_tz(longitude, latitude) if TZFPY_AVAILABLE else None
+    if not timezone_str:
+        timezone_str = _get_tf().timezone_at(lat=latitude, lng=longitude)
+    
+    # Salvar no cache
+    if use_cache and timezone_str:
+        _timezone_cache.set(cache_key, timezone_str)
+    
+    return timezone_str
+
+def describe_timezone_at(timezone_str, at):
+    """
+    Descreve um fuso horário num momento específico (ex.: a data de nascimento).
+    
+    Args:
+        timezone_str (str): Nome do fuso horário
+        at (datetime): Momento de referência; se sem tzinfo, é a hora local do fuso
+    
+    Returns:
+        dict: Informações de fuso horário
+    """
+    tz = _tz(timezone_str)
+    if at.tzinfo is not None:
+        local = at.astimezone(tz)
+    elif hasattr(tz, "localize"):  # alternativa pytz
+        local = tz.localize(at)
+    else:
+        local = at.replace(tzinfo=tz)
+    
+    return {
+        "timezone_name": timezone_str,
+        "utc_offset": local.utcoffset().total_seconds() / 3600,  # Converter para horas
+        "dst_active": local.dst().total_seconds() > 0,
+        "local_time": local.strftime("%Y-%m-%d %H:%M:%S %Z%z")
+    }
+
+def get_timezone_data(latitude, longitude, use_cache=True, at=None):
+    """
+    Obtém informações de fuso horário para coordenadas geográficas.
+    
+    Args:
+        latitude (float): Latitude da localização
+        longitude (float): Longitude da localização
+        use_cache (bool): Se deve usar cache para consultas repetidas
+        at (datetime): Momento para calcular offset UTC e horário de verão; sem ele,
+            apenas o nome do fuso é retornado
+    
+    Returns:
+        dict: Informações de fuso horário ou None se não encontrado
+    """
+    # Validação de entrada
+    if not isinstance(latitude, (int, float)) or not isinstance(longitude, (int, float)):
+        _LOGGER.debug("Latitude e longitude devem ser números.")
+        return None
+    
     try:
-        # Usar TimezoneFinder para determinar o fuso horário
-        tf = TimezoneFinder()
-        timezone_str = tf.timezone_at(lat=latitude, lng=longitude)
+        # Apenas o nome do fuso vai para o cache; offsets dependem do momento pedido
+        timezone_str = get_timezone_name(latitude, longitude, use_cache)
         
         if not timezone_str:
-            print(f"Aviso: Não foi possível determinar o fuso horário para ({latitude}, {longitude})")
+            _LOGGER.debug("Não foi possível determinar o fuso horário para (%s, %s)", latitude, longitude)
             return None
         
-        # Obter informações do fuso horário
-        timezone = pytz.timezone(timezone_str)
-        now = datetime.now(timezone)
-        utc_offset = now.utcoffset().total_seconds() / 3600  # Converter para horas
-        
-        result = {
-            "timezone_name": timezone_str,
-            "utc_offset": utc_offset,
-            "dst_active": now.dst().total_seconds() > 0,
-            "current_time": now.strftime("%Y-%m-%d %H:%M:%S %Z%z")
-        }
-        
-        # Salvar no cache
-        if use_cache:
-            _timezone_cache.set(cache_key, result)
-        
-        return result
+        if at is None:
+            return {"timezone_name": timezone_str}
+        return describe_timezone_at(timezone_str, at)
         
     except Exception as e:
-        print(f"Erro ao obter informações de fuso horário: {e}")
+        _LOGGER.exception("Erro ao obter informações de fuso horário")
         return None
 
-@rate_limit(1.0)
 def get_elevation_data(latitude, longitude, use_cache=True):
     """
     Obtém dados de elevação (altitude) para coordenadas geográficas.
@@ -233,11 +547,11 @@ def get_elevation_data(latitude, longitude, use_cache=True):
     """
     # Validação de entrada
     if not isinstance(latitude, (int, float)) or not isinstance(longitude, (int, float)):
-        print("Erro: Latitude e longitude devem ser números.")
+        _LOGGER.debug("Latitude e longitude devem ser números.")
         return None
     
     # Chave de cache
-    cache_key = f"{latitude:.6f},{longitude:.6f}"
+    cache_key = _pos_key(latitude, longitude, _ELEVATION_KEY_PRECISION)
     
     # Verificar cache
     if use_cache:
@@ -245,68 +559,172 @@ def get_elevation_data(latitude, longitude, use_cache=True):
         if cached_result is not None:
             return cached_result
     
-    try:
-        # Usar API Open-Elevation
-        url = f"https://api.open-elevation.com/api/v1/lookup?locations={latitude},{longitude}"
-        response = requests.get(url, timeout=10)
+    def _lookup():
+        try:
+            # Usar API Open-Elevation
+            url = f"https://api.open-elevation.com/api/v1/lookup?locations={latitude},{longitude}"
+            _RATE_LIMITER.wait("api.open-elevation.com", 1.0)
+            response = _SESSION.get(url, timeout=10)
         
-        if response.status_code == 200:
-            data = response.json()
-            if "results" in data and len(data["results"]) > 0:
-                elevation = data["results"][0].get("elevation")
+            if response.status_code == 200:
+                data = _loads_response(response)
+                if "results" in data and len(data["results"]) > 0:
+                    elevation = data["results"][0].get("elevation")
                 
-                # Salvar no cache
-                if use_cache and elevation is not None:
-                    _elevation_cache.set(cache_key, elevation)
+                    # Salvar no cache
+                    if use_cache and elevation is not None:
+                        _elevation_cache.set(cache_key, elevation)
                 
-                return elevation
+                    return elevation
         
-        print(f"Aviso: Não foi possível obter dados de elevação para ({latitude}, {longitude})")
-        return None
+            _LOGGER.debug("Não foi possível obter dados de elevação para (%s, %s)", latitude, longitude)
+            return None
         
-    except Exception as e:
-        print(f"Erro ao obter dados de elevação: {e}")
-        return None
+        except Exception as e:
+            _LOGGER.exception("Erro ao obter dados de elevação")
+            return None
+    
+    # Consultas simultâneas do mesmo ponto compartilham uma única requisição
+    if use_cache:
+        return _single_flight(("elevation", cache_key), _lookup)
+    return _lookup()
+
+def get_elevations_batch(points, use_cache=True, batch_size=100):
+    """
+    Obtém a elevação de vários pontos com poucas requisições à API Open-Elevation
+    (até `batch_size` pontos por POST). Pontos já em cache não são consultados.
+    
+    Args:
+        points (list): Lista de tuplas (latitude, longitude)
+        use_cache (bool): Se deve usar cache para consultas repetidas
+        batch_size (int): Número máximo de pontos por requisição
+    
+    Returns:
+        list: Elevações em metros (ou None), na mesma ordem de `points`
+    """
+    elevations = [None] * len(points)
+    pending = {}  # chave de cache -> (lat, lng, [índices])
+    
+    for i, (latitude, longitude) in enumerate(points):
+        if not isinstance(latitude, (int, float)) or not isinstance(longitude, (int, float)):
+            continue
+        cache_key = _pos_key(latitude, longitude, _ELEVATION_KEY_PRECISION)
+        if use_cache:
+            cached_result = _elevation_cache.get(cache_key)
+            if cached_result is not None:
+                elevations[i] = cached_result
+                continue
+        pending.setdefault(cache_key, (latitude, longitude, []))[2].append(i)
+    
+    items = list(pending.items())
+    for start in range(0, len(items), batch_size):
+        chunk = items[start:start + batch_size]
+        _RATE_LIMITER.wait("api.open-elevation.com", 1.0)
+        try:
+            response = _SESSION.post(
+                "https://api.open-elevation.com/api/v1/lookup",
+                json={"locations": [{"latitude": lat, "longitude": lng} for _, (lat, lng, _) in chunk]},
+                timeout=30
+            )
+            if response.status_code != 200:
+                _LOGGER.warning("Não foi possível obter dados de elevação em lote (HTTP %s)", response.status_code)
+                continue
+            results = _loads_response(response).get("results", [])
+        except Exception as e:
+            _LOGGER.exception("Erro ao obter dados de elevação em lote")
+            continue
+        
+        for (cache_key, (_, _, indexes)), item in zip(chunk, results):
+            elevation = item.get("elevation")
+            for i in indexes:
+                elevations[i] = elevation
+            # Salvar no cache
+            if use_cache and elevation is not None:
+                _elevation_cache.set(cache_key, elevation)
+    
+    return elevations
+
+def geocode_locations_batch(location_names, use_cache=True):
+    """
+    Geocodifica vários nomes de local. O Nominatim não aceita consultas livres em lote,
+    então nomes repetidos (após normalização) e já em cache são resolvidos uma única vez
+    e os demais seguem o limite de 1 req/s.
+    
+    Args:
+        location_names (list): Nomes dos locais
+        use_cache (bool): Se deve usar cache para consultas repetidas
+    
+    Returns:
+        list: Dados de cada local (ou None), na mesma ordem de `location_names`
+    """
+    resolved = {}
+    results = []
+    for location_name in location_names:
+        key = _norm_key(location_name) if isinstance(location_name, str) else None
+        if not key:
+            results.append(None)
+            continue
+        if key not in resolved:
+            resolved[key] = geocode_location(location_name, use_cache)
+        results.append(resolved[key])
+    return results
 
-def get_astro_location_data(location_name, use_cache=True):
+def get_astro_location_data(location_name, use_cache=True, at=None):
     """
     Obtém dados completos de localização para uso em cálculos astrológicos.
     
     Args:
         location_name (str): Nome do local para buscar
         use_cache (bool): Se deve usar cache para consultas repetidas
+        at (datetime): Momento para incluir offset UTC e horário de verão do fuso
     
     Returns:
         dict: Dados completos da localização ou None se não encontrada
     """
     # Verificar cache
+    cache_key = _norm_key(location_name) if isinstance(location_name, str) else location_name
     if use_cache:
-        cached_result = _astro_data_cache.get(location_name)
+        cached_result = _astro_data_cache.get(cache_key)
         if cached_result is not None:
-            print(f"  (Dados astrológicos obtidos do cache)")
-            return cached_result
+            _LOGGER.debug("Dados astrológicos obtidos do cache: %s", location_name)
+            return _with_timezone_at(_with_location_name(cached_result, location_name), at)
     
     # Obter coordenadas geográficas
     geo_data = geocode_location(location_name, use_cache)
     if not geo_data:
         return None
     
-    # Obter dados de fuso horário
-    timezone_data = get_timezone_data(
+    # Elevação (HTTP) e fuso horário (local) são independentes: a elevação roda em
+    # segundo plano enquanto o fuso é calculado nesta thread
+    elevation_future = _IO_EXECUTOR.submit(
+        get_elevation_data,
         geo_data["latitude"], 
         geo_data["longitude"],
         use_cache
     )
     
-    # Obter dados de elevação
-    elevation = get_elevation_data(
+    # Obter dados de fuso horário
+    timezone_data = get_timezone_data(
         geo_data["latitude"], 
         geo_data["longitude"],
         use_cache
     )
     
+    # Obter dados de elevação
+    elevation = elevation_future.result()
+    
     # Combinar todos os dados
-    result = {
+    result = _combine_location_data(location_name, geo_data, elevation, timezone_data)
+    
+    # Salvar no cache (sem dados dependentes do momento)
+    if use_cache:
+        _astro_data_cache.set(cache_key, result)
+    
+    return _with_timezone_at(result, at)
+
+def _combine_location_data(location_name, geo_data, elevation, timezone_data):
+    """Monta o dicionário retornado por get_astro_location_data"""
+    return {
         "location": {
             "name": location_name,
             "address": geo_data["address"],
@@ -316,12 +734,160 @@ def get_astro_location_data(location_name, use_cache=True):
         },
         "timezone": timezone_data
     }
+
+async def geocode_location_async(location_name, use_cache=True, max_retries=3):
+    """
+    Versão assíncrona de geocode_location, para uso em aplicações async (ex.: FastAPI).
+    Com aiohttp instalado usa o adaptador assíncrono do geopy; sem ele, executa a
+    versão síncrona em uma thread. Compartilha cache e rate limit com a versão síncrona.
     
-    # Salvar no cache
+    Args:
+        location_name (str): Nome do local para geocodificar
+        use_cache (bool): Se deve usar cache para consultas repetidas
+        max_retries (int): Número máximo de tentativas em caso de timeout
+    
+    Returns:
+        dict ou None: Dados da localização ou None se não encontrada
+    """
+    if not AIOHTTP_AVAILABLE:
+        return await asyncio.to_thread(geocode_location, location_name, use_cache, max_retries)
+    
+    if not location_name or not isinstance(location_name, str) or not location_name.strip():
+        _LOGGER.debug("Nome da localização deve ser uma string não vazia.")
+        return None
+    location_name = location_name.strip()
+    
+    cache_key = _norm_key(location_name)
     if use_cache:
-        _astro_data_cache.set(location_name, result)
+        cached_result = _geocoding_cache.get(cache_key)
+        if cached_result is _MISS:
+            return None
+        if cached_result is not None:
+            return cached_result
     
-    return result
+    async with Nominatim(user_agent="astrology_app_geocoder_v1.0", timeout=10,
+                         adapter_factory=AioHTTPAdapter) as geolocator:
+        for attempt in range(max_retries):
+            try:
+                await _RATE_LIMITER.wait_async("nominatim.openstreetmap.org", 1.1)
+                location = await geolocator.geocode(location_name)
+            except GeocoderTimedOut:
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(2)
+                    continue
+                _LOGGER.warning("O serviço de geocodificação excedeu o tempo limite após múltiplas tentativas: %s", location_name)
+                return None
+            except GeocoderServiceError as e:
+                _LOGGER.warning("Erro no serviço de geocodificação: %s", e)
+                return None
+            
+            result = _location_result(location) if location else None
+            if use_cache:
+                _geocoding_cache.set(cache_key, result)
+            return result
+    
+    return None
+
+async def get_elevation_data_async(latitude, longitude, use_cache=True, session=None):
+    """
+    Versão assíncrona de get_elevation_data. Com aiohttp instalado, a consulta à API
+    Open-Elevation não bloqueia o event loop; sem ele, roda a versão síncrona em uma thread.
+    
+    Args:
+        latitude (float): Latitude da localização
+        longitude (float): Longitude da localização
+        use_cache (bool): Se deve usar cache para consultas repetidas
+        session (aiohttp.ClientSession): Sessão a reutilizar; se omitida, uma é criada
+    
+    Returns:
+        float: Elevação em metros ou None se não encontrada
+    """
+    if not AIOHTTP_AVAILABLE:
+        return await asyncio.to_thread(get_elevation_data, latitude, longitude, use_cache)
+    
+    if not isinstance(latitude, (int, float)) or not isinstance(longitude, (int, float)):
+        _LOGGER.debug("Latitude e longitude devem ser números.")
+        return None
+    
+    cache_key = _pos_key(latitude, longitude, _ELEVATION_KEY_PRECISION)
+    if use_cache:
+        cached_result = _elevation_cache.get(cache_key)
+        if cached_result is not None:
+            return cached_result
+    
+    url = f"https://api.open-elevation.com/api/v1/lookup?locations={latitude},{longitude}"
+    owns_session = session is None
+    if owns_session:
+        session = aiohttp.ClientSession(headers={"User-Agent": _SESSION.headers["User-Agent"]})
+    try:
+        await _RATE_LIMITER.wait_async("api.open-elevation.com", 1.0)
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+            if response.status != 200:
+                _LOGGER.debug("Não foi possível obter dados de elevação para (%s, %s)", latitude, longitude)
+                return None
+            body = await response.read()
+        data = orjson.loads(body) if ORJSON_AVAILABLE else json.loads(body)
+        results = data.get("results") or [{}]
+        elevation = results[0].get("elevation")
+        if use_cache and elevation is not None:
+            _elevation_cache.set(cache_key, elevation)
+        return elevation
+    except Exception as e:
+        _LOGGER.exception("Erro ao obter dados de elevação")
+        return None
+    finally:
+        if owns_session:
+            await session.close()
+
+async def get_astro_location_data_async(location_name, use_cache=True, at=None):
+    """
+    Versão assíncrona de get_astro_location_data: várias cidades podem ser resolvidas
+    em paralelo (ex.: com asyncio.gather), respeitando o rate limit de cada serviço.
+    
+    Args:
+        location_name (str): Nome do local para buscar
+        use_cache (bool): Se deve usar cache para consultas repetidas
+        at (datetime): Momento para incluir offset UTC e horário de verão do fuso
+    
+    Returns:
+        dict: Dados completos da localização ou None se não encontrada
+    """
+    cache_key = _norm_key(location_name) if isinstance(location_name, str) else location_name
+    if use_cache:
+        cached_result = _astro_data_cache.get(cache_key)
+        if cached_result is not None:
+            return _with_timezone_at(_with_location_name(cached_result, location_name), at)
+    
+    geo_data = await geocode_location_async(location_name, use_cache)
+    if not geo_data:
+        return None
+    
+    # Elevação (HTTP) e fuso horário em paralelo; o fuso (TimezoneFinder, cache com
+    # SQLite) roda no _IO_EXECUTOR para não bloquear o event loop
+    loop = asyncio.get_running_loop()
+    elevation, timezone_data = await asyncio.gather(
+        get_elevation_data_async(geo_data["latitude"], geo_data["longitude"], use_cache),
+        loop.run_in_executor(
+            _IO_EXECUTOR, get_timezone_data, geo_data["latitude"], geo_data["longitude"], use_cache
+        ),
+    )
+    
+    result = _combine_location_data(location_name, geo_data, elevation, timezone_data)
+    if use_cache:
+        _astro_data_cache.set(cache_key, result)
+    
+    return _with_timezone_at(result, at)
+
+def _with_location_name(location_data, location_name):
+    """Cópia dos dados em cache com o nome como o chamador escreveu (a chave do cache é normalizada)"""
+    return {**location_data, "location": {**location_data["location"], "name": location_name}}
+
+def _with_timezone_at(location_data, at):
+    """Acrescenta offset/horário de verão no momento `at` a uma cópia dos dados de localização"""
+    if at is None or not location_data.get("timezone"):
+        return location_data
+    timezone_data = describe_timezone_at(location_data["timezone"]["timezone_name"], at)
+    return {**location_data, "timezone": timezone_data}
 
 def clear_all_caches():
     """Limpa todos os caches utilizados pelo módulo"""
@@ -329,7 +895,47 @@ def clear_all_caches():
     _timezone_cache.clear()
     _elevation_cache.clear()
     _astro_data_cache.clear()
-    print("Todos os caches foram limpos.")
+    _LOGGER.debug("Todos os caches foram limpos.")
+
+def _parse_zone_tab_coord(text, degree_digits):
+    """Converte uma coordenada ISO 6709 do zone.tab (±DDMM[SS] / ±DDDMM[SS]) em graus decimais"""
+    sign = -1.0 if text[0] == "-" else 1.0
+    digits = text[1:]
+    degrees = int(digits[:degree_digits])
+    minutes = int(digits[degree_digits:degree_digits + 2])
+    seconds = int(digits[degree_digits + 2:] or 0)
+    return sign * (degrees + minutes / 60 + seconds / 3600)
+
+@functools.lru_cache(maxsize=1)
+def _local_cities():
+    """
+    Tabela local cidade -> (latitude, longitude, fuso), carregada na primeira chamada.
+    Usa as cidades de referência do banco de fusos (zone.tab, distribuído com o pytz),
+    indexadas pela chave normalizada do nome. Zonas regionais com três níveis
+    (ex.: America/Indiana/Knox) ficam de fora para evitar nomes ambíguos.
+    """
+    cities = {}
+    try:
+        with pytz.open_resource("zone.tab") as f:
+            lines = f.read().decode("utf-8").splitlines()
+    except (OSError, ValueError) as e:
+        _LOGGER.warning("Tabela local de cidades indisponível: %s", e)
+        return cities
+    
+    for line in lines:
+        if not line or line.startswith("#"):
+            continue
+        fields = line.split("\t")
+        if len(fields) < 3 or fields[2].count("/") != 1:
+            continue
+        coords, tz_str = fields[1], fields[2]
+        # Latitude e longitude vêm juntas; a longitude começa no segundo sinal
+        split_at = max(coords.rfind("+"), coords.rfind("-"))
+        latitude = _parse_zone_tab_coord(coords[:split_at], 2)
+        longitude = _parse_zone_tab_coord(coords[split_at:], 3)
+        city = tz_str.split("/", 1)[1].replace("_", " ")
+        cities[_norm_key(city)] = (round(latitude, 4), round(longitude, 4), tz_str)
+    return cities
 
 def get_coordinates_from_city(city_name):
     """
@@ -341,6 +947,12 @@ def get_coordinates_from_city(city_name):
     Returns:
         tuple: (latitude, longitude, timezone_str) ou None se não encontrado
     """
+    # Cidades de referência conhecidas localmente: sem rede nem rate limit
+    if isinstance(city_name, str):
+        local_hit = _local_cities().get(_norm_key(city_name))
+        if local_hit:
+            return local_hit
+    
     try:
         location_data = get_astro_location_data(city_name)
         if location_data:
@@ -350,5 +962,5 @@ def get_coordinates_from_city(city_name):
             return (latitude, longitude, timezone_str)
         return None
     except Exception as e:
-        print(f"Erro ao obter coordenadas da cidade {city_name}: {e}")
+        _LOGGER.exception("Erro ao obter coordenadas da cidade %s", city_name)
         return None
\ No newline at end of file
@@ -11,8 +11,13 @@ Este módulo contém:
 - Resolução de localização integrada
 """
 
+import copy
+import logging
 import math
+from dataclasses import dataclass
 from datetime import date
+from functools import lru_cache
+from operator import attrgetter
 from typing import Optional, Dict, Any, List, Union, Tuple
 from kerykeion import AstrologicalSubject
 from fastapi import HTTPException # Added for error handling
@@ -22,8 +27,40 @@ from app.models import (
 )
 from app.utils.astro_geolocation import get_coordinates_from_city
 from app.utils.daylight_saving import get_timezone_info
+from app.utils.numba_kernels import NUMPY_AVAILABLE, scan_aspects
+from app.utils.subject_cache import cached_subject
 import os # Added for os.getenv
 
+_LOGGER = logging.getLogger(__name__)
+
+@lru_cache(maxsize=64)
+def _resolve_house_code(house_system: Any) -> str:
+    """Código do sistema de casas para o Kerykeion, aceitando enum ou string"""
+    return HOUSE_SYSTEM_MAP.get(getattr(house_system, 'value', house_system), "P")
+
+
+@lru_cache(maxsize=16)
+def _is_sidereal(zodiac_type: Optional[str]) -> bool:
+    return str(zodiac_type).lower() == "sidereal"
+
+
+@lru_cache(maxsize=2048)
+def _cached_city_lookup(city_key: str) -> Tuple[float, float, str]:
+    coords = get_coordinates_from_city(city_key)
+    if coords is None:
+        # Exceções não entram no lru_cache: falhas (às vezes transitórias) são refeitas
+        raise LookupError(city_key)
+    return coords
+
+
+def _lookup_city(city: str) -> Optional[Tuple[float, float, str]]:
+    """Coordenadas da cidade, memorizadas por nome normalizado (espaços e maiúsculas)"""
+    try:
+        return _cached_city_lookup(" ".join(city.split()).lower())
+    except LookupError:
+        return None
+
+
 def resolve_location(data: Union[NatalChartRequest, TransitRequest, Dict]) -> Tuple[float, float, str, Dict]:
     """
     Resolve os dados de localização a partir dos campos fornecidos.
@@ -60,8 +97,8 @@ def resolve_location(data: Union[NatalChartRequest, TransitRequest, Dict]) -> Tu
     
     # Se city foi fornecida, usar geolocalização
     if city:
-        print(f"Resolvendo localização para cidade: {city}")
-        coords = get_coordinates_from_city(city)
+        _LOGGER.debug("Resolvendo localização para cidade: %s", city)
+        coords = _lookup_city(city)
         if coords:
             resolved_lat, resolved_lng, resolved_tz = coords
             location_info = {
@@ -141,11 +178,8 @@ def create_subject(data: Union[NatalChartRequest, TransitRequest, Dict], default
     # Resolver localização
     latitude, longitude, tz_str, location_info = resolve_location(data)
     
-    # Converter enum para string se necessário
-    if hasattr(house_system, 'value'):
-        house_system = house_system.value # Now house_system is a string like "placidus"
-
-    house_system_code = HOUSE_SYSTEM_MAP.get(house_system, "P") # Get code like "P"
+    # Enum ou string -> código do Kerykeion (ex.: "P")
+    house_system_code = _resolve_house_code(house_system)
 
     # Extract zodiac_type and sidereal_mode from data
     if isinstance(data, dict):
@@ -161,24 +195,23 @@ def create_subject(data: Union[NatalChartRequest, TransitRequest, Dict], default
     # if we pass parameters directly, and geonames_username/online are not used.
 
     try:
-        print(f"Attempting K4 AstrologicalSubject constructor for: {name or default_name}")
+        _LOGGER.debug("Attempting K4 AstrologicalSubject constructor for: %s", name or default_name)
 
-        k_subject = AstrologicalSubject(
+        k_subject = cached_subject(
             name or default_name,
             year, month, day, hour, minute,
-            lng=longitude,
-            lat=latitude,
-            tz_str=tz_str,
-            houses_system_identifier=house_system_code,
-            zodiac_type=zodiac_type,
-            sidereal_mode=sidereal_mode if zodiac_type.lower() == "sidereal" else None,
-            perspective_type=perspective_type,
+            latitude, longitude, tz_str,
+            house_system_code,
+            zodiac_type,
+            sidereal_mode if _is_sidereal(zodiac_type) else None,
+            perspective_type,
         )
 
         if not k_subject:
             raise ValueError("Failed to create AstrologicalSubject instance (K4 style).")
 
-        return k_subject, location_info
+        # Cópia profunda: o subject (e seus pontos) em cache não é exposto a alterações dos chamadores
+        return copy.deepcopy(k_subject), location_info
 
     except Exception as e:
         # Include more details in the error for debugging
@@ -187,10 +220,18 @@ def create_subject(data: Union[NatalChartRequest, TransitRequest, Dict], default
             "lat": latitude, "lng": longitude, "tz_str": tz_str, "house_system_code": house_system_code,
             "zodiac_type": zodiac_type, "sidereal_mode": sidereal_mode
         }
-        print(f"Error creating AstrologicalSubject (K4 style): {type(e).__name__} - {e}. Params: {error_params}")
+        _LOGGER.exception("Error creating AstrologicalSubject (K4 style). Params: %s", error_params)
         raise HTTPException(status_code=500, detail=f"Erro interno do servidor ao criar objeto astrológico (Kerykeion v4): {type(e).__name__} - {e}")
 
 
+# Nome da casa no Kerykeion -> número (1-12)
+_HOUSE_NAME_TO_NUM: Dict[str, int] = {
+    'First_House': 1, 'Second_House': 2, 'Third_House': 3, 'Fourth_House': 4,
+    'Fifth_House': 5, 'Sixth_House': 6, 'Seventh_House': 7, 'Eighth_House': 8,
+    'Ninth_House': 9, 'Tenth_House': 10, 'Eleventh_House': 11, 'Twelfth_House': 12
+}
+
+
 def get_house_from_kerykeion_attribute(planet_obj) -> int:
     """
     Extrai o número da casa do atributo 'house' do Kerykeion.
@@ -201,18 +242,12 @@ def get_house_from_kerykeion_attribute(planet_obj) -> int:
     Returns:
         Número da casa (1-12), retorna 1 se não puder determinar
     """
-    try:
-        if hasattr(planet_obj, 'house'):
-            house_str = str(planet_obj.house)
-            house_mapping = {
-                'First_House': 1, 'Second_House': 2, 'Third_House': 3, 'Fourth_House': 4,
-                'Fifth_House': 5, 'Sixth_House': 6, 'Seventh_House': 7, 'Eighth_House': 8,
-                'Ninth_House': 9, 'Tenth_House': 10, 'Eleventh_House': 11, 'Twelfth_House': 12
-            }
-            return house_mapping.get(house_str, 1)
-        return 1
-    except Exception:
+    house = getattr(planet_obj, 'house', None)
+    if house is None:
         return 1
+    # Kerykeion 4 usa strings ("First_House"); enums expõem o mesmo nome em .name
+    name = getattr(house, 'name', None) or str(house)
+    return _HOUSE_NAME_TO_NUM.get(name, 1)
 
 
 def get_planet_data(subject: Any, planet_name_kerykeion: str, api_planet_name: str) -> Optional[PlanetPosition]: # Changed subject type hint to Any
@@ -230,7 +265,8 @@ def get_planet_data(subject: Any, planet_name_kerykeion: str, api_planet_name: s
     try:
         p = getattr(subject, planet_name_kerykeion.lower())
         if p and hasattr(p, 'name') and p.name:
-            return PlanetPosition(
+            # Campos vêm do Kerykeion já tipados: dispensa a validação do Pydantic
+            return PlanetPosition.model_construct(
                 name=api_planet_name,
                 sign=p.sign,
                 sign_num=p.sign_num,
@@ -249,63 +285,160 @@ def get_planet_data(subject: Any, planet_name_kerykeion: str, api_planet_name: s
     return None
 
 
+def extract_all_planets(subject: Any, planet_map: Optional[Dict[str, str]] = None) -> Dict[str, PlanetPosition]:
+    """
+    Extrai de uma vez todos os planetas de `planet_map` (padrão: PLANETS_MAP).
+    Equivale a chamar get_planet_data para cada item, em uma única passada pelo subject.
+
+    Args:
+        subject: Objeto AstrologicalSubject contendo os dados do mapa
+        planet_map: Nome no Kerykeion -> nome na API
+
+    Returns:
+        Dicionário nome no Kerykeion -> PlanetPosition, só com os planetas encontrados
+    """
+    planets: Dict[str, PlanetPosition] = {}
+    for kerykeion_name, api_name in (planet_map or PLANETS_MAP).items():
+        p = getattr(subject, kerykeion_name, None)
+        if not p or not getattr(p, 'name', None):
+            continue
+        try:
+            house = getattr(p, 'house', None)
+            planets[kerykeion_name] = PlanetPosition.model_construct(
+                name=api_name,
+                sign=p.sign,
+                sign_num=p.sign_num,
+                position=round(p.position, 4),
+                abs_pos=round(p.abs_pos, 4),
+                house_name=str(house),
+                house_number=1 if house is None else _HOUSE_NAME_TO_NUM.get(getattr(house, 'name', None) or str(house), 1),
+                speed=round(p.speed, 4) if hasattr(p, 'speed') else 0.0,
+                retrograde=getattr(p, 'retrograde', False),
+                quality=getattr(p, 'quality', None),
+                element=getattr(p, 'element', None),
+                emoji=getattr(p, 'sign_emoji', None)
+            )
+        except AttributeError:
+            continue
+    return planets
+
+
+# Aspectos considerados: (ângulo, nome, orbe base), na ordem em que são testados
+_ASPECT_TABLE: Tuple[Tuple[float, str, float], ...] = (
+    (0, "conjunction", 8.0), (60, "sextile", 6.0), (90, "square", 7.0),
+    (120, "trine", 8.0), (180, "opposition", 8.0), (150, "quincunx", 3.0),
+    (30, "semisextile", 2.0), (45, "semisquare", 2.0), (135, "sesquiquadrate", 2.0),
+    (72, "quintile", 2.0), (144, "biquintile", 2.0)
+)
+
+# Aspectos maiores (sempre retornados; dos menores, só os 10 mais fortes)
+_MAJOR_ASPECTS = frozenset(("conjunction", "opposition", "trine", "square", "sextile"))
+
+
 def calculate_aspects(
     planets1: Dict[str, Any], 
     planets2: Dict[str, Any], 
     aspect_type: str = "natal",
-    orb_multiplier: float = 1.0
+    orb_multiplier: float = 1.0,
+    symmetric: Optional[bool] = None
 ) -> List[Dict[str, Any]]:
     """
     Calcula aspectos entre dois conjuntos de planetas (função centralizada).
+
+    `symmetric` indica que os dois conjuntos são o mesmo mapa (cada par é avaliado
+    uma vez); se omitido, é deduzido comparando os dicionários uma única vez.
     """
+    if symmetric is None:
+        symmetric = planets1 is planets2 or planets1 == planets2
     aspects = []
-    aspect_definitions = {
-        0: ("conjunction", 8), 60: ("sextile", 6), 90: ("square", 7),
-        120: ("trine", 8), 180: ("opposition", 8), 150: ("quincunx", 3),
-        30: ("semisextile", 2), 45: ("semisquare", 2), 135: ("sesquiquadrate", 2),
-        72: ("quintile", 2), 144: ("biquintile", 2)
-    }
-    adjusted_aspects = {
-        angle: (name, orb * orb_multiplier) 
-        for angle, (name, orb) in aspect_definitions.items()
-    }
-    planet_keys1 = list(planets1.keys())
-    planet_keys2 = list(planets2.keys()) if planets1 != planets2 else planet_keys1
+    # Orbes ajustados uma única vez por chamada (a tabela base é do módulo)
+    if orb_multiplier == 1.0:
+        aspect_table = _ASPECT_TABLE
+    else:
+        aspect_table = tuple((angle, name, orb * orb_multiplier) for angle, name, orb in _ASPECT_TABLE)
+    if NUMPY_AVAILABLE:
+        hits = _aspect_hits_array(planets1, planets2, aspect_table, symmetric)
+    else:
+        hits = _aspect_hits_python(planets1, planets2, aspect_table, symmetric)
+    
+    for planet1_key, planet1, planet2_key, planet2, aspect_name, orb_tolerance, orb, angular_diff in hits:
+        aspects.append(_AspectRecord(
+            _get_planet_name(planet1, planet1_key), _get_planet_name(planet2, planet2_key),
+            aspect_name, round(orb, 2), round(angular_diff, 2),
+            _calculate_aspect_strength(orb, orb_tolerance)
+        ))
+    
+    aspects.sort(key=attrgetter('strength'), reverse=True)
+    major_aspects, minor_aspects = [], []
+    for a in aspects:
+        (major_aspects if a.type in _MAJOR_ASPECTS else minor_aspects).append(a)
+    # Textos e dicionários só para os aspectos efetivamente retornados
+    return [a.to_dict(aspect_type) for a in major_aspects + minor_aspects[:10]]
+
+
+@dataclass(slots=True, frozen=True)
+class _AspectRecord:
+    """Registro leve de aspecto usado durante a ordenação, antes da conversão para dicionário."""
+    p1: str
+    p2: str
+    type: str
+    orb: float
+    exact_angle: float
+    strength: float
+
+    def to_dict(self, aspect_type: str) -> Dict[str, Any]:
+        aspect_data = {
+            "p1": self.p1, "p2": self.p2, "type": self.type,
+            "orb": self.orb, "exact_angle": self.exact_angle,
+            "strength": self.strength, "aspect_type": aspect_type,
+            "interpretation": _get_aspect_interpretation(self.type, self.p1, self.p2)
+        }
+        if aspect_type == "natal":
+            aspect_data["category"] = _get_natal_aspect_category(self.type)
+        elif aspect_type == "transit":
+            aspect_data["duration"] = _estimate_transit_duration(self.type, self.p1, self.p2)
+        return aspect_data
+
+
+def _aspect_hits_python(planets1: Dict[str, Any], planets2: Dict[str, Any], aspect_table: Tuple[Tuple[float, str, float], ...], symmetric: bool):
+    """Varredura dos pares de planetas em Python puro (usada quando o NumPy não está disponível)"""
+    # Posições lidas uma vez por planeta
+    items1 = [(key, planet, _get_planet_position(planet)) for key, planet in planets1.items()]
+    items1 = [item for item in items1 if item[2] is not None]
+    if symmetric:
+        items2 = items1
+    else:
+        items2 = [(key, planet, _get_planet_position(planet)) for key, planet in planets2.items()]
+        items2 = [item for item in items2 if item[2] is not None]
     
-    for i, planet1_key in enumerate(planet_keys1):
-        planet1 = planets1[planet1_key]
-        start_idx = i + 1 if planets1 == planets2 else 0
-        for j, planet2_key in enumerate(planet_keys2[start_idx:], start=start_idx):
-            planet2 = planets2[planet2_key]
-            if planets1 == planets2 and planet1_key == planet2_key:
-                continue
-            pos1 = _get_planet_position(planet1)
-            pos2 = _get_planet_position(planet2)
-            if pos1 is None or pos2 is None:
-                continue
+    for i, (planet1_key, planet1, pos1) in enumerate(items1):
+        for planet2_key, planet2, pos2 in items2[i + 1:] if symmetric else items2:
             angular_diff = _calculate_angular_difference(pos1, pos2)
-            for aspect_angle, (aspect_name, orb_tolerance) in adjusted_aspects.items():
+            for aspect_angle, aspect_name, orb_tolerance in aspect_table:
                 orb = abs(angular_diff - aspect_angle)
                 if orb <= orb_tolerance:
-                    strength = _calculate_aspect_strength(orb, orb_tolerance)
-                    planet1_name = _get_planet_name(planet1, planet1_key)
-                    planet2_name = _get_planet_name(planet2, planet2_key)
-                    aspect_data = {
-                        "p1": planet1_name, "p2": planet2_name, "type": aspect_name,
-                        "orb": round(orb, 2), "exact_angle": round(angular_diff, 2),
-                        "strength": strength, "aspect_type": aspect_type,
-                        "interpretation": _get_aspect_interpretation(aspect_name, planet1_name, planet2_name)
-                    }
-                    if aspect_type == "natal":
-                        aspect_data["category"] = _get_natal_aspect_category(aspect_name)
-                    elif aspect_type == "transit":
-                        aspect_data["duration"] = _estimate_transit_duration(aspect_name, planet1_name, planet2_name)
-                    aspects.append(aspect_data)
+                    yield planet1_key, planet1, planet2_key, planet2, aspect_name, orb_tolerance, orb, angular_diff
+
+
+def _aspect_hits_array(planets1: Dict[str, Any], planets2: Dict[str, Any], aspect_table: Tuple[Tuple[float, str, float], ...], symmetric: bool):
+    """Varredura dos pares de planetas pelos kernels NumPy/Numba; as posições são extraídas uma única vez"""
+    items1 = [(key, planet, _get_planet_position(planet)) for key, planet in planets1.items()]
+    items1 = [item for item in items1 if item[2] is not None]
+    if symmetric:
+        items2 = items1
+    else:
+        items2 = [(key, planet, _get_planet_position(planet)) for key, planet in planets2.items()]
+        items2 = [item for item in items2 if item[2] is not None]
+    
+    angles, names, orbs = zip(*aspect_table)
+    pos1 = [item[2] for item in items1]
+    pos2 = pos1 if symmetric else [item[2] for item in items2]
+    hits = scan_aspects(pos1, pos2, angles, orbs, symmetric)
     
-    aspects.sort(key=lambda x: x['strength'], reverse=True)
-    major_aspects = [a for a in aspects if a['type'] in ['conjunction', 'opposition', 'trine', 'square', 'sextile']]
-    minor_aspects = [a for a in aspects if a['type'] not in ['conjunction', 'opposition', 'trine', 'square', 'sextile']]
-    return major_aspects + minor_aspects[:10]
+    for i, j, k, orb, angular_diff in hits:
+        planet1_key, planet1, _ = items1[i]
+        planet2_key, planet2, _ = items2[j]
+        yield planet1_key, planet1, planet2_key, planet2, names[k], orbs[k], orb, angular_diff
 
 
 def _get_planet_position(planet_data: Union[Dict, Any]) -> Optional[float]:
@@ -362,22 +495,31 @@ def _get_natal_aspect_category(aspect_type: str) -> str:
     return categories.get(aspect_type, "neutro")
 
 
+# Velocidade média (graus/dia) e orbe usados na estimativa de duração dos trânsitos
+_PLANET_SPEEDS = {
+    "Sun": 1.0, "Moon": 13.0, "Mercury": 1.4, "Venus": 1.2, "Mars": 0.5,
+    "Jupiter": 0.08, "Saturn": 0.03, "Uranus": 0.01, "Neptune": 0.006, "Pluto": 0.004
+}
+_TRANSIT_ORB = {"conjunction": 8, "opposition": 8, "trine": 8, "square": 7, "sextile": 6}
+# (limite em dias, texto, divisor): primeira faixa com duração abaixo do limite
+_DURATION_BUCKETS = (
+    (1, "algumas horas", None),
+    (7, "cerca de {} dias", 1),
+    (30, "cerca de {} semanas", 7),
+    (365, "cerca de {} meses", 30),
+    (float("inf"), "cerca de {} anos", 365),
+)
+
+
 def _estimate_transit_duration(aspect_type: str, planet1: str, planet2: str) -> str:
-    planet_speeds = {
-        "Sun": 1.0, "Moon": 13.0, "Mercury": 1.4, "Venus": 1.2, "Mars": 0.5,
-        "Jupiter": 0.08, "Saturn": 0.03, "Uranus": 0.01, "Neptune": 0.006, "Pluto": 0.004
-    }
-    aspect_orbs = {"conjunction": 8, "opposition": 8, "trine": 8, "square": 7, "sextile": 6}
-    speed1 = planet_speeds.get(planet1, 0.5)
-    speed2 = planet_speeds.get(planet2, 0.5)
+    speed1 = _PLANET_SPEEDS.get(planet1, 0.5)
+    speed2 = _PLANET_SPEEDS.get(planet2, 0.5)
     faster_speed = max(speed1, speed2)
-    orb = aspect_orbs.get(aspect_type, 5)
+    orb = _TRANSIT_ORB.get(aspect_type, 5)
     duration_days = (orb * 2) / faster_speed
-    if duration_days < 1: return "algumas horas"
-    elif duration_days < 7: return f"cerca de {int(duration_days)} dias"
-    elif duration_days < 30: return f"cerca de {int(duration_days/7)} semanas"
-    elif duration_days < 365: return f"cerca de {int(duration_days/30)} meses"
-    else: return f"cerca de {int(duration_days/365)} anos"
+    for threshold, text, divisor in _DURATION_BUCKETS:
+        if duration_days < threshold:
+            return text.format(int(duration_days / divisor)) if divisor else text
 
 
 def degrees_to_dms(degrees: float) -> str:
@@ -390,19 +532,21 @@ def degrees_to_dms(degrees: float) -> str:
 
 
 def normalize_angle(angle: float) -> float:
-    while angle < 0: angle += 360
-    while angle >= 360: angle -= 360
-    return angle
+    angle %= 360.0
+    # Negativos minúsculos arredondam para 360.0 no módulo
+    return 0.0 if angle == 360.0 else angle
+
+
+_SIGNS: Tuple[str, ...] = (
+    "Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo",
+    "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces"
+)
 
 
 def get_sign_from_position(position: float) -> Tuple[str, int]:
-    signs = [
-        "Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo",
-        "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces"
-    ]
-    sign_num = int(position // 30)
-    sign_name = signs[sign_num]
-    return sign_name, sign_num + 1
+    # Posição já normalizada em [0, 360): truncar e dividir inteiros basta
+    sign_num = int(position) // 30
+    return _SIGNS[sign_num], sign_num + 1
 
 
 def calculate_midpoint(pos1: float, pos2: float) -> float:
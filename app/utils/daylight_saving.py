@@ -1,8 +1,46 @@
 # daylight_saving.py
 
-from datetime import datetime, date
+from array import array
+from datetime import datetime, date, timedelta
+from functools import lru_cache
+from types import MappingProxyType
 from zoneinfo import ZoneInfo
 
+
+@lru_cache(maxsize=512)
+def _zone(tz_name: str) -> ZoneInfo:
+    """ZoneInfo reutilizado entre datas diferentes do mesmo fuso"""
+    return ZoneInfo(tz_name)
+
+
+def _noon(check_date: date, tz_name: str) -> datetime:
+    """Meio-dia local da data no fuso indicado"""
+    return datetime(
+        year=check_date.year,
+        month=check_date.month,
+        day=check_date.day,
+        hour=12,
+        tzinfo=_zone(tz_name)
+    )
+
+
+@lru_cache(maxsize=256)
+def _dst_table(year: int, tz_name: str):
+    """
+    Tabela do ano inteiro para o fuso, indexada pelo dia do ano (0 = 1º de janeiro),
+    com o estado ao meio-dia local: (horário de verão ativo, offset UTC em horas).
+    """
+    first_day = date(year, 1, 1)
+    n_days = (date(year + 1, 1, 1) - first_day).days
+    is_dst = bytearray(n_days)
+    utc_offsets = array('d', bytes(8 * n_days))
+    for day_index in range(n_days):
+        dt = _noon(first_day + timedelta(days=day_index), tz_name)
+        is_dst[day_index] = bool(dt.dst())
+        utc_offsets[day_index] = dt.utcoffset().total_seconds() / 3600
+    return bytes(is_dst), utc_offsets
+
+
 def is_daylight_saving_active(check_date: date, tz_name: str = "America/Sao_Paulo") -> bool:
     """
     Retorna True se, na data dada, o horário de verão estava ativo no fuso indicado.
@@ -16,16 +54,9 @@ def is_daylight_saving_active(check_date: date, tz_name: str = "America/Sao_Paul
     Retorna:
         bool: True se estiver em horário de verão, False caso contrário.
     """
-    # Usar o horário das 12:00 para evitar ambiguidades na troca de horário
-    dt = datetime(
-        year=check_date.year,
-        month=check_date.month,
-        day=check_date.day,
-        hour=12,
-        tzinfo=ZoneInfo(tz_name)
-    )
-    # dt.dst() retorna um timedelta > 0 se DST estiver ativo
-    return bool(dt.dst())
+    # Horário das 12:00 (ver _dst_table) para evitar ambiguidades na troca de horário
+    is_dst, _ = _dst_table(check_date.year, tz_name)
+    return bool(is_dst[check_date.timetuple().tm_yday - 1])
 
 
 def get_timezone_offset_with_dst(check_date: date, tz_name: str) -> float:
@@ -39,14 +70,8 @@ def get_timezone_offset_with_dst(check_date: date, tz_name: str) -> float:
     Retorna:
         float: offset UTC em horas (pode ser negativo)
     """
-    dt = datetime(
-        year=check_date.year,
-        month=check_date.month,
-        day=check_date.day,
-        hour=12,
-        tzinfo=ZoneInfo(tz_name)
-    )
-    return dt.utcoffset().total_seconds() / 3600
+    _, utc_offsets = _dst_table(check_date.year, tz_name)
+    return utc_offsets[check_date.timetuple().tm_yday - 1]
 
 
 def get_timezone_info(check_date: date, tz_name: str) -> dict:
@@ -58,21 +83,22 @@ def get_timezone_info(check_date: date, tz_name: str) -> dict:
         tz_name (str): nome do fuso horário.
         
     Retorna:
-        dict: informações do timezone
+        dict: informações do timezone (cópia própria do chamador)
     """
-    dt = datetime(
-        year=check_date.year,
-        month=check_date.month,
-        day=check_date.day,
-        hour=12,
-        tzinfo=ZoneInfo(tz_name)
-    )
+    return dict(_timezone_info(check_date, tz_name))
+
+
+@lru_cache(maxsize=4096)
+def _timezone_info(check_date: date, tz_name: str) -> MappingProxyType:
+    """Versão em cache de get_timezone_info, somente leitura para não ser alterada pelos chamadores"""
+    dt = _noon(check_date, tz_name)
     
     utc_offset = dt.utcoffset().total_seconds() / 3600
-    dst_offset = dt.dst().total_seconds() / 3600 if dt.dst() else 0
-    is_dst = bool(dt.dst())
+    dst = dt.dst()
+    dst_offset = dst.total_seconds() / 3600 if dst else 0
+    is_dst = bool(dst)
     
-    return {
+    return MappingProxyType({
         "timezone_name": tz_name,
         "utc_offset": utc_offset,
         "dst_offset": dst_offset,
@@ -80,7 +106,7 @@ def get_timezone_info(check_date: date, tz_name: str) -> dict:
         "standard_offset": utc_offset - dst_offset,
         "date_checked": check_date.isoformat(),
         "datetime_with_tz": dt.isoformat()
-    }
+    })
 
 
 if __name__ == "__main__":
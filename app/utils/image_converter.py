@@ -1,23 +1,51 @@
-import cairosvg
+import asyncio
+import functools
 import io
-from typing import Optional
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union
 from fastapi import HTTPException
 from app.config.image_settings import image_settings # Added import
-# Pillow (PIL) is imported conditionally within the optimize_png method
+# Pillow (PIL) is optional: without it PNG optimization is skipped
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    Image = None
+    PIL_AVAILABLE = False
+
+# resvg (Rust) is optional: renders straight to a compact PNG in a single pass
+try:
+    import resvg_py
+    RESVG_AVAILABLE = True
+except ImportError:
+    resvg_py = None
+    RESVG_AVAILABLE = False
+
+# cairosvg needs the system Cairo library; OSError when it is missing
+try:
+    import cairosvg
+    CAIROSVG_AVAILABLE = True
+except (ImportError, OSError):
+    cairosvg = None
+    CAIROSVG_AVAILABLE = False
+
+# Bounded pool for PNG rendering: the C renderers release the GIL, so conversions run in parallel
+_PNG_EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix="svg2png")
 
 class ImageConverter:
     @staticmethod
     def svg_to_png(
-        svg_content: str,
+        svg_content: Union[str, bytes],
         quality: int = image_settings.DEFAULT_PNG_QUALITY, # DPI for cairosvg
         width: Optional[int] = None,
         height: Optional[int] = None
     ) -> bytes:
         """
-        Converts SVG to PNG using cairosvg.
+        Converts SVG to PNG using resvg when installed, otherwise cairosvg.
 
         Args:
-            svg_content: SVG content as a string.
+            svg_content: SVG content as bytes (UTF-8) or string.
             quality: DPI for the output PNG (default 300).
             width: Optional output width in pixels.
             height: Optional output height in pixels.
@@ -25,10 +53,17 @@ class ImageConverter:
         Returns:
             PNG content as bytes.
         """
+        if RESVG_AVAILABLE:
+            return ImageConverter._svg_to_png_resvg(svg_content, quality, width, height)
+        if not CAIROSVG_AVAILABLE:
+            raise HTTPException(
+                status_code=500,
+                detail="Nenhum renderizador SVG->PNG disponível (instale resvg-py ou cairosvg)."
+            )
         try:
             # cairosvg uses 'dpi' parameter
             png_bytes = cairosvg.svg2png(
-                bytestring=svg_content.encode('utf-8'),
+                bytestring=svg_content.encode('utf-8') if isinstance(svg_content, str) else svg_content,
                 write_to=None, # Returns bytes directly
                 output_width=width,
                 output_height=height,
@@ -45,25 +80,48 @@ class ImageConverter:
                 detail=f"Erro na conversão SVG->PNG com CairoSVG: {str(e)}"
             )
 
+    @staticmethod
+    def _svg_to_png_resvg(
+        svg_content: Union[str, bytes],
+        quality: int,
+        width: Optional[int],
+        height: Optional[int]
+    ) -> bytes:
+        """Converts SVG to PNG with resvg; its output is already compact, no Pillow pass needed."""
+        try:
+            png_bytes = resvg_py.svg_to_bytes(
+                svg_string=svg_content.decode('utf-8') if isinstance(svg_content, bytes) else svg_content,
+                width=width,
+                height=height,
+                dpi=quality
+            )
+            if not png_bytes:
+                raise ValueError("resvg returned empty content.")
+            return bytes(png_bytes)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Erro na conversão SVG->PNG com resvg: {str(e)}"
+            )
+
     @staticmethod
     def optimize_png(png_content: bytes, compression_level: int = image_settings.PNG_COMPRESSION_LEVEL) -> bytes:
         """Otimiza PNG para reduzir tamanho usando Pillow (PIL)."""
+        # Pillow not installed, or PNG already small: return original PNG content
+        if not PIL_AVAILABLE or len(png_content) < image_settings.MIN_OPTIMIZE_BYTES:
+            return png_content
         try:
-            from PIL import Image
-
             img = Image.open(io.BytesIO(png_content))
             output_buffer = io.BytesIO()
+            # optimize=True would force zlib level 9 and ignore compress_level
             img.save(
                 output_buffer,
                 format='PNG',
-                optimize=True,
                 compress_level=compression_level # Pillow uses 0 (no compression) to 9 (max compression)
             )
-            return output_buffer.getvalue()
-        except ImportError:
-            # Pillow not installed, return original PNG content
-            # print("Pillow (PIL) not installed. PNG optimization skipped.")
-            return png_content
+            optimized = output_buffer.getvalue()
+            # Keep the original when re-encoding did not make it smaller
+            return optimized if len(optimized) < len(png_content) else png_content
         except Exception as e:
             # Error during optimization, return original PNG content
             # print(f"Error optimizing PNG with Pillow: {e}")
@@ -71,7 +129,7 @@ class ImageConverter:
 
 # Função de conveniência
 def convert_svg_to_png(
-    svg_content: str,
+    svg_content: Union[str, bytes],
     quality: int = image_settings.DEFAULT_PNG_QUALITY, # DPI
     width: Optional[int] = None,
     height: Optional[int] = None,
@@ -84,7 +142,27 @@ def convert_svg_to_png(
 
     png_bytes = ImageConverter.svg_to_png(svg_content, quality=quality, width=width, height=height)
 
-    if optimize:
+    # resvg already emits an optimized PNG: re-encoding it with Pillow would only cost time
+    if optimize and not RESVG_AVAILABLE:
         png_bytes = ImageConverter.optimize_png(png_bytes, compression_level=compression_level)
 
     return png_bytes
+
+
+async def convert_svg_to_png_async(
+    svg_content: Union[str, bytes],
+    quality: int = image_settings.DEFAULT_PNG_QUALITY, # DPI
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    optimize: bool = image_settings.ENABLE_PNG_OPTIMIZATION,
+    compression_level: int = image_settings.PNG_COMPRESSION_LEVEL
+) -> bytes:
+    """Same as convert_svg_to_png, run on a worker thread so async routes don't block the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _PNG_EXECUTOR,
+        functools.partial(
+            convert_svg_to_png, svg_content,
+            quality=quality, width=width, height=height,
+            optimize=optimize, compression_level=compression_level
+        )
+    )
@@ -0,0 +1,172 @@
+"""
+Kernels numéricos para os laços mais pesados dos cálculos astrológicos.
+
+Com Numba, os kernels são compilados; só com NumPy (ou com ASTRO_DISABLE_NUMBA=1),
+usa-se a versão vetorizada.
+Ambos são opcionais: sem NumPy, NUMPY_AVAILABLE fica False e os chamadores usam
+a implementação em Python puro.
+"""
+import os
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# ASTRO_DISABLE_NUMBA=1 evita importar o Numba (centenas de ms de importação e
+# compilação): útil em processos curtos, como as tarefas de linha de comando
+if os.getenv("ASTRO_DISABLE_NUMBA", "").lower() in ("1", "true", "yes"):
+    njit = None
+    prange = range
+    NUMBA_AVAILABLE = False
+else:
+    try:
+        from numba import njit, prange
+        NUMBA_AVAILABLE = True
+    except ImportError:
+        njit = None
+        prange = range
+        NUMBA_AVAILABLE = False
+
+# A partir deste número de pontos (asteroides, estrelas fixas...) a varredura é
+# dividida entre os núcleos; abaixo disso o custo de despachar as threads domina
+PARALLEL_MIN_POINTS = 32
+
+
+def _scan_aspects(pos1, pos2, angles, orbs, symmetric):
+    """
+    Varre todos os pares (i, j) de posições eclípticas e retorna os aspectos dentro do orbe.
+
+    Args:
+        pos1, pos2: Posições em graus (float64[:]), sem valores ausentes
+        angles: Ângulo de cada aspecto (float64[:])
+        orbs: Orbe máximo de cada aspecto, já multiplicado (float64[:])
+        symmetric: Se pos1 e pos2 são o mesmo conjunto (só pares com j > i)
+
+    Returns:
+        Tupla de arrays paralelos (i, j, índice do aspecto, orbe, distância angular)
+    """
+    n1 = pos1.shape[0]
+    n2 = pos2.shape[0]
+    n_aspects = angles.shape[0]
+    capacity = n1 * n2 * n_aspects
+    hit_i = np.empty(capacity, dtype=np.int64)
+    hit_j = np.empty(capacity, dtype=np.int64)
+    hit_k = np.empty(capacity, dtype=np.int64)
+    hit_orb = np.empty(capacity, dtype=np.float64)
+    hit_diff = np.empty(capacity, dtype=np.float64)
+    count = 0
+    for i in range(n1):
+        start = i + 1 if symmetric else 0
+        for j in range(start, n2):
+            d = abs(pos1[i] - pos2[j])
+            if d > 180.0:
+                d = 360.0 - d
+            for k in range(n_aspects):
+                orb = abs(d - angles[k])
+                if orb <= orbs[k]:
+                    hit_i[count] = i
+                    hit_j[count] = j
+                    hit_k[count] = k
+                    hit_orb[count] = orb
+                    hit_diff[count] = d
+                    count += 1
+    return hit_i[:count], hit_j[:count], hit_k[:count], hit_orb[:count], hit_diff[:count]
+
+
+def _scan_aspects_parallel(pos1, pos2, angles, orbs, symmetric):
+    """
+    Mesmo resultado de `_scan_aspects`, com o laço externo distribuído por `prange`.
+
+    Os acertos de cada linha i são contados numa primeira passada; a soma
+    acumulada dá a posição de escrita de cada linha, de modo que a segunda
+    passada preenche os arrays sem contador compartilhado e na mesma ordem (i, j, k).
+    """
+    n1 = pos1.shape[0]
+    n2 = pos2.shape[0]
+    n_aspects = angles.shape[0]
+    counts = np.zeros(n1, dtype=np.int64)
+    for i in prange(n1):
+        start = i + 1 if symmetric else 0
+        row_count = 0
+        for j in range(start, n2):
+            d = abs(pos1[i] - pos2[j])
+            if d > 180.0:
+                d = 360.0 - d
+            for k in range(n_aspects):
+                if abs(d - angles[k]) <= orbs[k]:
+                    row_count += 1
+        counts[i] = row_count
+
+    offsets = np.zeros(n1 + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(counts)
+    total = offsets[n1]
+    hit_i = np.empty(total, dtype=np.int64)
+    hit_j = np.empty(total, dtype=np.int64)
+    hit_k = np.empty(total, dtype=np.int64)
+    hit_orb = np.empty(total, dtype=np.float64)
+    hit_diff = np.empty(total, dtype=np.float64)
+    for i in prange(n1):
+        start = i + 1 if symmetric else 0
+        slot = offsets[i]
+        for j in range(start, n2):
+            d = abs(pos1[i] - pos2[j])
+            if d > 180.0:
+                d = 360.0 - d
+            for k in range(n_aspects):
+                orb = abs(d - angles[k])
+                if orb <= orbs[k]:
+                    hit_i[slot] = i
+                    hit_j[slot] = j
+                    hit_k[slot] = k
+                    hit_orb[slot] = orb
+                    hit_diff[slot] = d
+                    slot += 1
+    return hit_i, hit_j, hit_k, hit_orb, hit_diff
+
+
+def _scan_aspects_vectorized(pos1, pos2, angles, orbs, symmetric):
+    """
+    Mesmo resultado de `_scan_aspects`, calculado por broadcasting do NumPy: matriz
+    (N1, N2) de distâncias angulares comparada de uma vez com todos os aspectos.
+    """
+    diff = np.abs(pos1[:, None] - pos2[None, :])
+    np.minimum(diff, 360.0 - diff, out=diff)
+    orb = np.abs(diff[:, :, None] - angles[None, None, :])
+    mask = orb <= orbs[None, None, :]
+    if symmetric:
+        mask &= np.triu(np.ones(diff.shape, dtype=bool), k=1)[:, :, None]
+    # nonzero percorre em ordem (i, j, k), a mesma dos laços
+    hit_i, hit_j, hit_k = np.nonzero(mask)
+    return hit_i, hit_j, hit_k, orb[hit_i, hit_j, hit_k], diff[hit_i, hit_j]
+
+
+if NUMBA_AVAILABLE:
+    _scan_aspects_jit = njit(cache=True, fastmath=True)(_scan_aspects)
+    # Compila na importação para que a primeira requisição não pague o JIT
+    _warm = np.zeros(2, dtype=np.float64)
+    _scan_aspects_parallel_jit = njit(parallel=True, cache=True, fastmath=True)(_scan_aspects_parallel)
+    _scan_aspects_jit(_warm, _warm, _warm, _warm, True)
+    _scan_aspects_parallel_jit(_warm, _warm, _warm, _warm, True)
+    del _warm
+
+
+def scan_aspects(pos1, pos2, angles, orbs, symmetric):
+    """
+    Executa o kernel compilado (paralelo a partir de PARALLEL_MIN_POINTS pontos; sem
+    Numba, o vetorizado) sobre listas de floats. Requer NUMPY_AVAILABLE.
+
+    Returns:
+        Lista de tuplas (i, j, índice do aspecto, orbe, distância angular), com tipos Python
+    """
+    if not NUMBA_AVAILABLE:
+        kernel = _scan_aspects_vectorized
+    elif max(len(pos1), len(pos2)) >= PARALLEL_MIN_POINTS:
+        kernel = _scan_aspects_parallel_jit
+    else:
+        kernel = _scan_aspects_jit
+    as_array = lambda values: np.asarray(values, dtype=np.float64)
+    hits = kernel(as_array(pos1), as_array(pos2), as_array(angles), as_array(orbs), symmetric)
+    return list(zip(*(column.tolist() for column in hits)))
@@ -0,0 +1,48 @@
+"""
+Cache de construção de AstrologicalSubject.
+
+Cada AstrologicalSubject lê as efemérides do Swiss Ephemeris; entradas idênticas
+(data, hora, coordenadas, fuso e opções de cálculo) reutilizam o mesmo objeto.
+Os chamadores que alteram o subject devem trabalhar sobre uma cópia.
+
+Não adianta fixar o caminho das efemérides (swe.set_ephe_path) uma vez no processo:
+o Kerykeion o redefine a cada AstrologicalSubject, o que fecha os arquivos abertos.
+Reabri-los custa dezenas de microssegundos, frente a ~2 ms do subject inteiro; o
+ganho real está em não reconstruir o subject, que é o papel deste cache.
+"""
+from functools import lru_cache
+from typing import Optional
+
+from kerykeion import AstrologicalSubject
+
+
+@lru_cache(maxsize=1024)
+def cached_subject(
+    name: str,
+    year: int, month: int, day: int, hour: int, minute: int,
+    lat: float, lng: float, tz_str: str,
+    houses_system_identifier: str = "P",
+    zodiac_type: str = "Tropic",
+    sidereal_mode: Optional[str] = None,
+    perspective_type: str = "Apparent Geocentric",
+) -> AstrologicalSubject:
+    """
+    Cria (ou reaproveita) o AstrologicalSubject para os argumentos dados.
+    Todos os argumentos precisam ser imutáveis (chave do lru_cache).
+    """
+    return AstrologicalSubject(
+        name,
+        year, month, day, hour, minute,
+        lng=lng,
+        lat=lat,
+        tz_str=tz_str,
+        houses_system_identifier=houses_system_identifier,
+        zodiac_type=zodiac_type,
+        sidereal_mode=sidereal_mode,
+        perspective_type=perspective_type,
+    )
+
+
+def subject_cache_info():
+    """Estatísticas do cache de subjects (hits, misses, maxsize, currsize)"""
+    return cached_subject.cache_info()
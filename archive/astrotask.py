@@ -8,11 +8,18 @@ import argparse
 import json
 import sys
 import os
-import traceback
 from datetime import datetime, timedelta
+from operator import attrgetter
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 import logging
+# orjson é opcional: serialização do resultado em C, mais rápida que o módulo json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
 
 # Configurar logging
 logging.basicConfig(
@@ -27,20 +34,66 @@ logger = logging.getLogger(__name__)
 # Adicionar o diretório do projeto ao path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-try:
-    from kerykeion import AstrologicalSubject
-    from app.models import NatalChartRequest, TransitRequest, HouseSystem
-    from app.utils.astro_helpers import create_subject, get_planet_data, PLANETS_MAP
-    from app.utils.svg_combined_chart import create_combined_chart_svg
-    logger.info("✅ Dependências carregadas com sucesso")
-except ImportError as e:
-    logger.error(f"❌ Erro ao importar dependências: {e}")
-    sys.exit(1)
+# Cada tarefa é um processo curto: para 12 planetas, a varredura vetorizada do NumPy
+# sai mais barata que importar e compilar os kernels do Numba
+os.environ.setdefault('ASTRO_DISABLE_NUMBA', '1')
+
+# Aspectos principais dos trânsitos: (ângulo, nome, tolerância)
+TRANSIT_ASPECTS = (
+    (0, "conjunction", 8),
+    (60, "sextile", 6),
+    (90, "square", 7),
+    (120, "trine", 8),
+    (180, "opposition", 8)
+)
+_HOUSE_KEYS = tuple(f"house_{i}" for i in range(1, 13))
+
+def _load_dependencies():
+    """
+    Importa o app (e, com ele, Kerykeion/Swiss Ephemeris) e monta as tabelas que
+    dependem dele. Chamada só quando uma tarefa vai de fato rodar: --help, erros de
+    argumento e tarefas não implementadas não pagam o custo dessas importações.
+    """
+    global NatalChartRequest, TransitRequest, HouseSystem, create_subject, get_planet_data
+    global NUMPY_AVAILABLE, np, scan_aspects
+    global _TRANSIT_ANGLES, _TRANSIT_ORBS, _PLANETS_ITEMS, _HOUSE_GET
+    try:
+        from app.models import NatalChartRequest, TransitRequest, HouseSystem
+        from app.utils.astro_helpers import create_subject, get_planet_data, PLANETS_MAP, HOUSE_NUMBER_TO_NAME_BASE
+        from app.utils.numba_kernels import NUMPY_AVAILABLE, np, scan_aspects
+        logger.info("✅ Dependências carregadas com sucesso")
+    except ImportError as e:
+        logger.error("❌ Erro ao importar dependências: %s", e)
+        sys.exit(1)
+    
+    # Ângulos e orbes em arrays para o kernel de varredura, criados uma única vez
+    if NUMPY_AVAILABLE:
+        _TRANSIT_ANGLES = np.array([angle for angle, _, _ in TRANSIT_ASPECTS], dtype=np.float64)
+        _TRANSIT_ORBS = np.array([orb for _, _, orb in TRANSIT_ASPECTS], dtype=np.float64)
+    
+    # Pares (nome Kerykeion, nome da API) e leitura das 12 cúspides
+    # (first_house ... twelfth_house) numa única chamada
+    _PLANETS_ITEMS = tuple(PLANETS_MAP.items())
+    _HOUSE_GET = attrgetter(*(f"{HOUSE_NUMBER_TO_NAME_BASE[i]}_house" for i in range(1, 13)))
+
+def _json_default(obj: Any) -> Any:
+    """Converte arrays e escalares NumPy para o módulo json (o orjson os serializa nativamente)"""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _dumps(result: Dict[str, Any]) -> str:
+    """Serializa o resultado em JSON (UTF-8 sem escapes) para o stdout"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(result, ensure_ascii=False, default=_json_default)
 
 class AstroTaskExecutor:
     """Executor de tarefas astrológicas para Kestra"""
     
-    def __init__(self):
+    def __init__(self, started_at: Optional[str] = None):
+        # Carimbo de tempo único da tarefa, reutilizado nos metadados de cada resultado
+        self.started_at = started_at or datetime.now().isoformat()
         self.output_dir = Path(os.getenv('OUTPUT_DIR', '/app/output'))
         self.cache_dir = Path(os.getenv('CACHE_DIR', '/app/cache'))
         self.temp_dir = Path(os.getenv('TEMP_DIR', '/app/temp'))
@@ -51,7 +104,7 @@ class AstroTaskExecutor:
     
     def execute_natal_chart(self, **kwargs) -> Dict[str, Any]:
         """Gera mapa natal completo"""
-        logger.info(f"🌟 Calculando mapa natal para {kwargs.get('name', 'Usuário')}")
+        logger.info("🌟 Calculando mapa natal para %s", kwargs.get('name', 'Usuário'))
         
         try:
             # Criar request object
@@ -69,11 +122,11 @@ class AstroTaskExecutor:
             )
             
             # Criar subject usando helper
-            subject = create_subject(request, request.name)
+            subject, _ = create_subject(request, request.name)
             
             # Extrair dados dos planetas
             planets_data = {}
-            for k_name, api_name in PLANETS_MAP.items():
+            for k_name, api_name in _PLANETS_ITEMS:
                 planet_data = get_planet_data(subject, k_name, api_name)
                 if planet_data:
                     planets_data[k_name] = {
@@ -102,25 +155,24 @@ class AstroTaskExecutor:
                 },
                 "planets": planets_data,
                 "houses": {
-                    f"house_{i}": getattr(subject, f"house{i}", {}).get('position', 0)
-                    for i in range(1, 13)
+                    key: house.position
+                    for key, house in zip(_HOUSE_KEYS, _HOUSE_GET(subject))
                 },
                 "metadata": {
-                    "calculated_at": datetime.now().isoformat(),
+                    "calculated_at": self.started_at,
                     "total_planets": len(planets_data),
                     "kerykeion_version": "4.26.2"
                 }
             }
             
-            logger.info(f"✅ Mapa natal calculado - {len(planets_data)} planetas")
+            logger.info("✅ Mapa natal calculado - %d planetas", len(planets_data))
             return result
             
         except Exception as e:
-            logger.error(f"❌ Erro ao calcular mapa natal: {e}")
-            logger.error(traceback.format_exc())
+            logger.exception("❌ Erro ao calcular mapa natal: %s", e)
             raise
 
-def execute_daily_transits(self, **kwargs) -> Dict[str, Any]:
+    def execute_daily_transits(self, **kwargs) -> Dict[str, Any]:
         """Calcula trânsitos diários"""
         date_str = kwargs.get('date')
         if date_str:
@@ -131,7 +183,7 @@ def execute_daily_transits(self, **kwargs) -> Dict[str, Any]:
         else:
             date_obj = datetime.now()
         
-        logger.info(f"📅 Calculando trânsitos para {date_obj.strftime('%d/%m/%Y')}")
+        logger.info("📅 Calculando trânsitos para %02d/%02d/%04d", date_obj.day, date_obj.month, date_obj.year)
         
         try:
             # Criar request para trânsitos
@@ -147,11 +199,11 @@ def execute_daily_transits(self, **kwargs) -> Dict[str, Any]:
             )
             
             # Criar subject para trânsitos
-            subject = create_subject(transit_request, f"Trânsitos {date_str}")
+            subject, _ = create_subject(transit_request, f"Trânsitos {date_str}")
             
             # Extrair posições planetárias
             transit_positions = {}
-            for k_name, api_name in PLANETS_MAP.items():
+            for k_name, api_name in _PLANETS_ITEMS:
                 planet_data = get_planet_data(subject, k_name, api_name)
                 if planet_data:
                     transit_positions[k_name] = {
@@ -174,7 +226,7 @@ def execute_daily_transits(self, **kwargs) -> Dict[str, Any]:
                     "retrograde_planets": [p for p, data in transit_positions.items() if data.get('retrograde', False)]
                 },
                 "metadata": {
-                    "calculated_at": datetime.now().isoformat(),
+                    "calculated_at": self.started_at,
                     "reference_location": {
                         "latitude": transit_request.latitude,
                         "longitude": transit_request.longitude,
@@ -183,53 +235,66 @@ def execute_daily_transits(self, **kwargs) -> Dict[str, Any]:
                 }
             }
             
-            logger.info(f"✅ Trânsitos calculados - {len(aspects)} aspectos encontrados")
+            logger.info("✅ Trânsitos calculados - %d aspectos encontrados", len(aspects))
             return result
             
         except Exception as e:
-            logger.error(f"❌ Erro ao calcular trânsitos: {e}")
-            logger.error(traceback.format_exc())
+            logger.exception("❌ Erro ao calcular trânsitos: %s", e)
             raise
 
     def _calculate_transit_aspects(self, transit_positions: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Calcula aspectos entre planetas em trânsito"""
-        aspects = []
-        planets = list(transit_positions.keys())
+        if len(transit_positions) < 2:
+            return []
         
-        # Aspectos principais e suas tolerâncias
-        aspect_definitions = {
-            0: ("conjunction", 8),
-            60: ("sextile", 6),
-            90: ("square", 7),
-            120: ("trine", 8),
-            180: ("opposition", 8)
-        }
+        # Nomes e posições extraídos uma única vez, indexados pela ordem dos planetas
+        names = [data['name'] for data in transit_positions.values()]
+        positions = [data['position'] for data in transit_positions.values()]
         
-        for i, planet1 in enumerate(planets):
-            for planet2 in planets[i+1:]:
-                pos1 = transit_positions[planet1]['position']
-                pos2 = transit_positions[planet2]['position']
-                
-                # Calcular diferença angular
-                diff = abs(pos1 - pos2)
-                if diff > 180:
-                    diff = 360 - diff
-                
-                # Verificar aspectos
-                for aspect_angle, (aspect_name, orb_tolerance) in aspect_definitions.items():
-                    orb = abs(diff - aspect_angle)
-                    if orb <= orb_tolerance:
-                        aspects.append({
-                            "p1": transit_positions[planet1]['name'],
-                            "p2": transit_positions[planet2]['name'],
-                            "type": aspect_name,
-                            "orb": round(orb, 2),
-                            "exact_angle": round(diff, 2),
-                            "strength": round((orb_tolerance - orb) / orb_tolerance * 100, 1)
-                        })
+        # Acertos como tuplas (i, j, índice do aspecto, orbe, distância angular); os
+        # dicionários só são montados no fim, já na ordem final
+        if NUMPY_AVAILABLE:
+            # Varredura dos pares no kernel compilado (Numba) ou vetorizado (NumPy, sem
+            # desvios por par)
+            hits = scan_aspects(positions, positions, _TRANSIT_ANGLES, _TRANSIT_ORBS, True)
+        else:
+            hits = []
+            n_planets = len(positions)
+            for i in range(n_planets):
+                pos1 = positions[i]
+                for j in range(i + 1, n_planets):
+                    # Calcular diferença angular
+                    diff = abs(pos1 - positions[j])
+                    if diff > 180:
+                        diff = 360 - diff
+                    
+                    # Verificar aspectos
+                    for k, (aspect_angle, _, orb_tolerance) in enumerate(TRANSIT_ASPECTS):
+                        orb = abs(diff - aspect_angle)
+                        if orb <= orb_tolerance:
+                            hits.append((i, j, k, orb, diff))
+        
+        strengths = [
+            round((TRANSIT_ASPECTS[k][2] - orb) / TRANSIT_ASPECTS[k][2] * 100, 1)
+            for _, _, k, orb, _ in hits
+        ]
+        # Ordenar por força do aspecto (estável: empates mantêm a ordem da varredura)
+        if NUMPY_AVAILABLE:
+            order = np.argsort(-np.asarray(strengths, dtype=np.float64), kind='stable').tolist()
+        else:
+            order = sorted(range(len(hits)), key=strengths.__getitem__, reverse=True)
         
-        # Ordenar por força do aspecto
-        aspects.sort(key=lambda x: x['strength'], reverse=True)
+        aspects = []
+        for idx in order:
+            i, j, k, orb, diff = hits[idx]
+            aspects.append({
+                "p1": names[i],
+                "p2": names[j],
+                "type": TRANSIT_ASPECTS[k][1],
+                "orb": round(orb, 2),
+                "exact_angle": round(diff, 2),
+                "strength": strengths[idx]
+            })
         return aspects
 
 def main():
@@ -269,9 +334,13 @@ python astrotask.py --task daily_transits --date "2025-06-13"
     parser.add_argument('--date', help='Data para cálculos (YYYY-MM-DD)')
     
     args = parser.parse_args()
+    started_at = datetime.now().isoformat()
     
     try:
-        executor = AstroTaskExecutor()
+        if args.task not in ('natal_chart', 'daily_transits'):
+            raise ValueError(f"Tarefa não implementada: {args.task}")
+        _load_dependencies()
+        executor = AstroTaskExecutor(started_at)
         
         # Preparar argumentos
         kwargs = {}
@@ -280,31 +349,29 @@ python astrotask.py --task daily_transits --date "2025-06-13"
                 kwargs[key.replace('_', '-')] = value
         
         # Executar tarefa
-        logger.info(f"🚀 Executando tarefa: {args.task}")
+        logger.info("🚀 Executando tarefa: %s", args.task)
         
         if args.task == 'natal_chart':
             result = executor.execute_natal_chart(**kwargs)
-        elif args.task == 'daily_transits':
-            result = executor.execute_daily_transits(**kwargs)
         else:
-            raise ValueError(f"Tarefa não implementada: {args.task}")
+            result = executor.execute_daily_transits(**kwargs)
         
         # Imprimir resultado no stdout (para Kestra capturar)
-        print(json.dumps(result, ensure_ascii=False))
+        print(_dumps(result))
         
-        logger.info(f"✅ Tarefa {args.task} executada com sucesso")
+        logger.info("✅ Tarefa %s executada com sucesso", args.task)
         
     except Exception as e:
-        logger.error(f"❌ Erro na execução: {e}")
+        logger.error("❌ Erro na execução: %s", e)
         
         # Retornar erro em formato JSON para Kestra
         error_result = {
             "error": True,
             "message": str(e),
             "task": args.task,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": started_at
         }
-        print(json.dumps(error_result, ensure_ascii=False))
+        print(_dumps(error_result))
         sys.exit(1)
 
 if __name__ == "__main__":
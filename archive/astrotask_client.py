@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Astrotask (cliente) - Executa as tarefas astrológicas do Kestra na API já em execução
+
+Alternativa leve ao astrotask.py: usa apenas a biblioteca padrão, sem importar
+Kerykeion/Swiss Ephemeris a cada execução. O servidor FastAPI mantém essas
+dependências carregadas; este script calcula o mapa pelo endpoint /natal_chart
+e converte a resposta para o mesmo JSON de saída do astrotask.py:
+
+- natal_chart: {"user_info", "planets", "houses", "metadata"}
+- daily_transits: {"date", "transit_positions", "aspects", "summary", "metadata"},
+  com as posições do meio-dia local em --latitude/--longitude/--tz-str (padrão:
+  Brasília) e os aspectos calculados aqui com a mesma tabela TRANSIT_ASPECTS
+
+Diferença conhecida: as cúspides das casas vêm da API arredondadas em 4 casas decimais.
+"""
+
+import argparse
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+from datetime import datetime
+from typing import Dict, Any, List
+
+API_URL = os.getenv('ASTROTASK_API_URL', 'http://localhost:8000')
+API_KEY = os.getenv('API_KEY_KERYKEION', '')
+TIMEOUT = float(os.getenv('ASTROTASK_TIMEOUT', '30'))
+
+# Mesmos valores do astrotask.py / app.utils.astro_helpers (não importados: só biblioteca padrão)
+TRANSIT_ASPECTS = (
+    (0, "conjunction", 8),
+    (60, "sextile", 6),
+    (90, "square", 7),
+    (120, "trine", 8),
+    (180, "opposition", 8)
+)
+_MAJOR_ASPECTS = ('conjunction', 'opposition', 'trine', 'square')
+_PLANET_KEYS = (
+    "sun", "moon", "mercury", "venus", "mars", "jupiter", "saturn",
+    "uranus", "neptune", "pluto", "mean_node", "true_node"
+)
+_NATAL_PLANET_FIELDS = ("name", "sign", "sign_num", "position", "abs_pos", "house_number", "speed", "retrograde")
+_TRANSIT_PLANET_FIELDS = ("name", "sign", "position", "retrograde")
+_KERYKEION_VERSION = "4.26.2"
+# Brasília, como no astrotask.py
+_DEFAULT_TRANSIT_LOCATION = (-15.7939, -47.8828, 'America/Sao_Paulo')
+_TASKS = ('natal_chart', 'daily_transits', 'weekly_transits', 'moon_phase', 'combined_svg')
+
+def _planets(chart: Dict[str, Any], fields) -> Dict[str, Dict[str, Any]]:
+    """Planetas do astrotask.py (PLANETS_MAP) com os campos pedidos, na ordem do mapa"""
+    planets = chart["planets"]
+    return {
+        key: {field: planets[key][field] for field in fields}
+        for key in _PLANET_KEYS if key in planets
+    }
+
+def natal_chart(args: argparse.Namespace, started_at: str) -> Dict[str, Any]:
+    """Mapa natal no formato de AstroTaskExecutor.execute_natal_chart"""
+    payload = {
+        "name": args.name or 'Desconhecido',
+        "year": args.year,
+        "month": args.month,
+        "day": args.day,
+        "hour": args.hour,
+        "minute": args.minute,
+        "latitude": args.latitude,
+        "longitude": args.longitude,
+        "tz_str": args.tz_str,
+        "house_system": args.house_system
+    }
+    chart = call_api("/api/v1/natal_chart", payload)
+    planets = _planets(chart, _NATAL_PLANET_FIELDS)
+    return {
+        "user_info": {
+            "name": payload["name"],
+            "birth_date": f"{args.year}-{args.month:02d}-{args.day:02d}",
+            "birth_time": f"{args.hour:02d}:{args.minute:02d}",
+            "location": {
+                "latitude": args.latitude,
+                "longitude": args.longitude,
+                "timezone": args.tz_str
+            },
+            "house_system": args.house_system
+        },
+        "planets": planets,
+        "houses": {f"house_{i}": chart["houses"][str(i)]["position"] for i in range(1, 13)},
+        "metadata": {
+            "calculated_at": started_at,
+            "total_planets": len(planets),
+            "kerykeion_version": _KERYKEION_VERSION
+        }
+    }
+
+def daily_transits(args: argparse.Namespace, started_at: str) -> Dict[str, Any]:
+    """Trânsitos do dia no formato de AstroTaskExecutor.execute_daily_transits"""
+    date_obj = datetime.fromisoformat(args.date) if args.date else datetime.now()
+    default_lat, default_lng, default_tz = _DEFAULT_TRANSIT_LOCATION
+    latitude = default_lat if args.latitude is None else args.latitude
+    longitude = default_lng if args.longitude is None else args.longitude
+    tz_str = args.tz_str or default_tz
+
+    chart = call_api("/api/v1/natal_chart", {
+        "name": f"Trânsitos {args.date}",
+        "year": date_obj.year,
+        "month": date_obj.month,
+        "day": date_obj.day,
+        "hour": 12,  # Meio-dia como padrão
+        "minute": 0,
+        "latitude": latitude,
+        "longitude": longitude,
+        "tz_str": tz_str
+    })
+    transit_positions = _planets(chart, _TRANSIT_PLANET_FIELDS)
+    aspects = _transit_aspects(transit_positions)
+    return {
+        "date": date_obj.strftime('%Y-%m-%d'),
+        "transit_positions": transit_positions,
+        "aspects": aspects,
+        "summary": {
+            "total_aspects": len(aspects),
+            "major_aspects": sum(1 for a in aspects if a['type'] in _MAJOR_ASPECTS),
+            "retrograde_planets": [p for p, data in transit_positions.items() if data.get('retrograde', False)]
+        },
+        "metadata": {
+            "calculated_at": started_at,
+            "reference_location": {
+                "latitude": latitude,
+                "longitude": longitude,
+                "timezone": tz_str
+            }
+        }
+    }
+
+def _transit_aspects(transit_positions: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Aspectos entre os planetas em trânsito, como AstroTaskExecutor._calculate_transit_aspects"""
+    planets = list(transit_positions.values())
+    aspects = []
+    for i, planet1 in enumerate(planets):
+        for planet2 in planets[i + 1:]:
+            diff = abs(planet1['position'] - planet2['position'])
+            if diff > 180:
+                diff = 360 - diff
+            for aspect_angle, aspect_name, orb_tolerance in TRANSIT_ASPECTS:
+                orb = abs(diff - aspect_angle)
+                if orb <= orb_tolerance:
+                    aspects.append({
+                        "p1": planet1['name'],
+                        "p2": planet2['name'],
+                        "type": aspect_name,
+                        "orb": round(orb, 2),
+                        "exact_angle": round(diff, 2),
+                        "strength": round((orb_tolerance - orb) / orb_tolerance * 100, 1)
+                    })
+    # Mais fortes primeiro (estável: empates mantêm a ordem da varredura)
+    aspects.sort(key=lambda a: a['strength'], reverse=True)
+    return aspects
+
+TASKS = {
+    'natal_chart': natal_chart,
+    'daily_transits': daily_transits
+}
+
+def call_api(path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Envia o POST para a API e retorna o JSON da resposta"""
+    request = urllib.request.Request(
+        API_URL.rstrip('/') + path,
+        data=json.dumps(payload).encode('utf-8'),
+        headers={"Content-Type": "application/json", "X-API-KEY": API_KEY},
+        method="POST"
+    )
+    with urllib.request.urlopen(request, timeout=TIMEOUT) as response:
+        return json.loads(response.read())
+
+def main():
+    """Função principal - entrada do script"""
+    parser = argparse.ArgumentParser(
+        description='Astrotask (cliente) - Executa tarefas astrológicas na API AstroManus'
+    )
+    parser.add_argument('--task', required=True, choices=_TASKS, help='Tarefa a ser executada')
+    parser.add_argument('--name', help='Nome da pessoa')
+    parser.add_argument('--year', type=int, help='Ano de nascimento')
+    parser.add_argument('--month', type=int, help='Mês de nascimento')
+    parser.add_argument('--day', type=int, help='Dia de nascimento')
+    parser.add_argument('--hour', type=int, help='Hora de nascimento')
+    parser.add_argument('--minute', type=int, help='Minuto de nascimento')
+    parser.add_argument('--latitude', type=float, help='Latitude')
+    parser.add_argument('--longitude', type=float, help='Longitude')
+    parser.add_argument('--tz-str', help='Timezone string (ex: America/Sao_Paulo)')
+    parser.add_argument('--house-system', default='placidus', help='Sistema de casas')
+    parser.add_argument('--date', help='Data para cálculos (YYYY-MM-DD)')
+    args = parser.parse_args()
+    started_at = datetime.now().isoformat()
+
+    try:
+        if args.task not in TASKS:
+            raise ValueError(f"Tarefa não implementada: {args.task}")
+        result = TASKS[args.task](args, started_at)
+        # Imprimir resultado no stdout (para Kestra capturar)
+        print(json.dumps(result, ensure_ascii=False))
+
+    except Exception as e:
+        if isinstance(e, urllib.error.HTTPError):
+            message = f"HTTP {e.code}: {e.read().decode('utf-8', 'replace')}"
+        else:
+            message = str(e)
+        # Retornar erro em formato JSON para Kestra
+        error_result = {
+            "error": True,
+            "message": message,
+            "task": args.task,
+            "timestamp": started_at
+        }
+        print(json.dumps(error_result, ensure_ascii=False))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,8 @@ Demonstra todas as funcionalidades da plataforma
 """
 
 from kerykeion import AstrologicalSubject
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 import sys
 import os
@@ -13,12 +15,19 @@ from datetime import datetime, timedelta
 import json
 
 # Adicionar o diretório raiz ao path para importar módulos do app
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_SANITIZE_RE = re.compile(r'[^\w\-_]')
+# Para nomes ASCII, a mesma substituição via str.translate (sem passar pelo motor de regex)
+_SANITIZE_ASCII = str.maketrans({
+    chr(c): '_' for c in range(128) if not (chr(c).isalnum() or chr(c) in '-_')
+})
 
 def sanitize_filename(filename):
     """Remove caracteres especiais e espaços dos nomes de arquivos"""
-    sanitized = re.sub(r'[^\w\-_]', '_', filename)
-    return sanitized
+    if filename.isascii():
+        return filename.translate(_SANITIZE_ASCII)
+    return _SANITIZE_RE.sub('_', filename)
 
 def generate_combined_chart(natal_subject, transit_subject, output_dir):
     """
@@ -52,6 +61,76 @@ def generate_combined_chart(natal_subject, transit_subject, output_dir):
         print("   Certifique-se de que a API está configurada corretamente")
         return None
 
+# Demonstrações: (cabeçalho, rótulo do resultado, mapa natal, trânsitos)
+_DEMONSTRACOES = (
+    # === DEMONSTRAÇÃO 1: Personalidades Famosas ===
+    (
+        "📚 1. Criando mapas de personalidades famosas",
+        "Mapa Einstein",
+        # Albert Einstein
+        dict(name='Albert_Einstein', year=1879, month=3, day=14, hour=11, minute=30,
+             city='Ulm', lng=9.9937, lat=48.4011, tz_str='Europe/Berlin'),  # Ulm, Alemanha
+        # Trânsitos no dia da publicação da Teoria da Relatividade Especial (1905)
+        dict(name='Transitos_Relatividade_1905', year=1905, month=6, day=30, hour=12, minute=0,
+             city='Bern', lng=7.4474, lat=46.9480, tz_str='Europe/Zurich'),  # Bern, Suíça
+    ),
+    # === DEMONSTRAÇÃO 2: Eventos Históricos ===
+    (
+        "🏛️ 2. Criando mapas de eventos históricos",
+        "Mapa Independência",
+        # Independência do Brasil
+        dict(name='Independencia_Brasil', year=1822, month=9, day=7, hour=16, minute=30,
+             city='São Paulo', lng=-46.6333, lat=-23.5505, tz_str='America/Sao_Paulo'),
+        # Trânsitos no Bicentenário
+        dict(name='Bicentenario_2022', year=2022, month=9, day=7, hour=16, minute=30,
+             city='São Paulo', lng=-46.6333, lat=-23.5505, tz_str='America/Sao_Paulo'),
+    ),
+    # === DEMONSTRAÇÃO 3: Análise de Compatibilidade ===
+    (
+        "💕 3. Criando análise de compatibilidade",
+        "Mapa Compatibilidade",
+        # Pessoa A
+        dict(name='Pessoa_A_Compatibilidade', year=1985, month=7, day=15, hour=9, minute=45,
+             city='Rio de Janeiro', lng=-43.1729, lat=-22.9068, tz_str='America/Sao_Paulo'),
+        # Pessoa B
+        dict(name='Pessoa_B_Compatibilidade', year=1987, month=11, day=23, hour=18, minute=20,
+             city='São Paulo', lng=-46.6333, lat=-23.5505, tz_str='America/Sao_Paulo'),
+    ),
+    # === DEMONSTRAÇÃO 4: Análise de Retorno Solar ===
+    (
+        "🎂 4. Criando análise de retorno solar",
+        "Mapa Retorno Solar",
+        # Pessoa para retorno solar (nascimento no Natal)
+        dict(name='Retorno_Solar_2025', year=1990, month=12, day=25, hour=6, minute=0,
+             city='Brasília', lng=-47.8825, lat=-15.7942, tz_str='America/Sao_Paulo'),
+        # Retorno solar 2025 (hora exata do retorno)
+        dict(name='Retorno_2025', year=2025, month=12, day=25, hour=14, minute=23,
+             city='Brasília', lng=-47.8825, lat=-15.7942, tz_str='America/Sao_Paulo'),
+    ),
+    # === DEMONSTRAÇÃO 5: Análise de Lua Nova ===
+    (
+        "🌑 5. Criando análise de Lua Nova",
+        "Mapa Lua Nova",
+        # Pessoa para análise lunar (solstício de inverno)
+        dict(name='Analise_Lunar', year=1995, month=6, day=21, hour=12, minute=0,
+             city='Salvador', lng=-38.5108, lat=-12.9714, tz_str='America/Bahia'),
+        # Lua Nova em Gêmeos 2025
+        dict(name='Lua_Nova_Gemeos_2025', year=2025, month=6, day=6, hour=8, minute=38,
+             city='Salvador', lng=-38.5108, lat=-12.9714, tz_str='America/Bahia'),
+    ),
+)
+
+def _render_one(demonstracao, output_dir):
+    """
+    Cria o par natal/trânsitos de uma demonstração e gera o SVG combinado.
+    Executada em processo separado: cada demonstração é independente das demais.
+    
+    Returns:
+        Caminho do arquivo SVG gerado (ou None)
+    """
+    _, _, natal, transito = demonstracao
+    return generate_combined_chart(AstrologicalSubject(**natal), AstrologicalSubject(**transito), output_dir)
+
 def criar_mapas_demonstracao():
     """Cria mapas de demonstração com diferentes configurações"""
     
@@ -61,180 +140,15 @@ def criar_mapas_demonstracao():
     # Diretório para salvar os SVGs
     output_dir = Path("/home/ubuntu/mapas_demonstracao")
     
-    # === DEMONSTRAÇÃO 1: Personalidades Famosas ===
-    print("\n📚 1. Criando mapas de personalidades famosas")
-    
-    # Albert Einstein
-    einstein = AstrologicalSubject(
-        name='Albert_Einstein',
-        year=1879,
-        month=3,
-        day=14,
-        hour=11,
-        minute=30,
-        city='Ulm',
-        lng=9.9937,  # Ulm, Alemanha
-        lat=48.4011,
-        tz_str='Europe/Berlin'
-    )
-    
-    # Trânsitos no dia da Teoria da Relatividade (1905)
-    transit_relatividade = AstrologicalSubject(
-        name='Transitos_Relatividade_1905',
-        year=1905,
-        month=6,
-        day=30,  # Publicação da Teoria da Relatividade Especial
-        hour=12,
-        minute=0,
-        city='Bern',
-        lng=7.4474,  # Bern, Suíça
-        lat=46.9480,
-        tz_str='Europe/Zurich'
-    )
-    
-    svg_path1 = generate_combined_chart(einstein, transit_relatividade, output_dir)
-    if svg_path1:
-        print(f"✅ Mapa Einstein gerado: {svg_path1}")
-    
-    # === DEMONSTRAÇÃO 2: Eventos Históricos ===
-    print("\n🏛️ 2. Criando mapas de eventos históricos")
-    
-    # Independência do Brasil
-    independencia = AstrologicalSubject(
-        name='Independencia_Brasil',
-        year=1822,
-        month=9,
-        day=7,
-        hour=16,
-        minute=30,
-        city='São Paulo',
-        lng=-46.6333,
-        lat=-23.5505,
-        tz_str='America/Sao_Paulo'
-    )
-    
-    # Trânsitos no Bicentenário
-    bicentenario = AstrologicalSubject(
-        name='Bicentenario_2022',
-        year=2022,
-        month=9,
-        day=7,
-        hour=16,
-        minute=30,
-        city='São Paulo',
-        lng=-46.6333,
-        lat=-23.5505,
-        tz_str='America/Sao_Paulo'
-    )
-    
-    svg_path2 = generate_combined_chart(independencia, bicentenario, output_dir)
-    if svg_path2:
-        print(f"✅ Mapa Independência gerado: {svg_path2}")
-    
-    # === DEMONSTRAÇÃO 3: Análise de Compatibilidade ===
-    print("\n💕 3. Criando análise de compatibilidade")
-    
-    # Pessoa A
-    pessoa_a = AstrologicalSubject(
-        name='Pessoa_A_Compatibilidade',
-        year=1985,
-        month=7,
-        day=15,
-        hour=9,
-        minute=45,
-        city='Rio de Janeiro',
-        lng=-43.1729,
-        lat=-22.9068,
-        tz_str='America/Sao_Paulo'
-    )
-    
-    # Pessoa B
-    pessoa_b = AstrologicalSubject(
-        name='Pessoa_B_Compatibilidade',
-        year=1987,
-        month=11,
-        day=23,
-        hour=18,
-        minute=20,
-        city='São Paulo',
-        lng=-46.6333,
-        lat=-23.5505,
-        tz_str='America/Sao_Paulo'
-    )
-    
-    svg_path3 = generate_combined_chart(pessoa_a, pessoa_b, output_dir)
-    if svg_path3:
-        print(f"✅ Mapa Compatibilidade gerado: {svg_path3}")
-    
-    # === DEMONSTRAÇÃO 4: Análise de Retorno Solar ===
-    print("\n🎂 4. Criando análise de retorno solar")
-    
-    # Pessoa para retorno solar
-    aniversariante = AstrologicalSubject(
-        name='Retorno_Solar_2025',
-        year=1990,
-        month=12,
-        day=25,  # Nascimento no Natal
-        hour=6,
-        minute=0,
-        city='Brasília',
-        lng=-47.8825,
-        lat=-15.7942,
-        tz_str='America/Sao_Paulo'
-    )
-    
-    # Retorno solar 2025
-    retorno_2025 = AstrologicalSubject(
-        name='Retorno_2025',
-        year=2025,
-        month=12,
-        day=25,
-        hour=14,  # Hora exata do retorno solar
-        minute=23,
-        city='Brasília',
-        lng=-47.8825,
-        lat=-15.7942,
-        tz_str='America/Sao_Paulo'
-    )
-    
-    svg_path4 = generate_combined_chart(aniversariante, retorno_2025, output_dir)
-    if svg_path4:
-        print(f"✅ Mapa Retorno Solar gerado: {svg_path4}")
-    
-    # === DEMONSTRAÇÃO 5: Análise de Lua Nova ===
-    print("\n🌑 5. Criando análise de Lua Nova")
-    
-    # Pessoa para análise lunar
-    pessoa_lunar = AstrologicalSubject(
-        name='Analise_Lunar',
-        year=1995,
-        month=6,
-        day=21,  # Solstício de inverno
-        hour=12,
-        minute=0,
-        city='Salvador',
-        lng=-38.5108,
-        lat=-12.9714,
-        tz_str='America/Bahia'
-    )
-    
-    # Lua Nova em Gêmeos 2025
-    lua_nova = AstrologicalSubject(
-        name='Lua_Nova_Gemeos_2025',
-        year=2025,
-        month=6,
-        day=6,  # Lua Nova em Gêmeos
-        hour=8,
-        minute=38,
-        city='Salvador',
-        lng=-38.5108,
-        lat=-12.9714,
-        tz_str='America/Bahia'
-    )
+    # As demonstrações não compartilham estado: cada uma roda em seu próprio processo
+    workers = min(len(_DEMONSTRACOES), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        svg_paths = list(executor.map(_render_one, _DEMONSTRACOES, repeat(output_dir)))
     
-    svg_path5 = generate_combined_chart(pessoa_lunar, lua_nova, output_dir)
-    if svg_path5:
-        print(f"✅ Mapa Lua Nova gerado: {svg_path5}")
+    for (cabecalho, rotulo, _, _), svg_path in zip(_DEMONSTRACOES, svg_paths):
+        print(f"\n{cabecalho}")
+        if svg_path:
+            print(f"✅ {rotulo} gerado: {svg_path}")
     
     # === ESTATÍSTICAS FINAIS ===
     print("\n📊 === ESTATÍSTICAS DA DEMONSTRAÇÃO ===")
@@ -13,8 +13,25 @@ Versão: 2.1.0
 """
 
 import requests
+import requests.adapters
+import asyncio
 import json
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import os
+import re
+import shelve
+import threading
+import time
+import unicodedata
 from datetime import datetime
+from pathlib import Path
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
 
 # URL base da API (ajuste conforme necessário)
 BASE_URL = "http://localhost:8000/api/v1"
@@ -25,6 +42,164 @@ headers = {
     "X-API-Key": API_KEY
 }
 
+# Sessão única: todas as chamadas reaproveitam a mesma conexão (keep-alive);
+# o pool comporta as requisições concorrentes das cidades internacionais
+SESSION = requests.Session()
+SESSION.headers.update(headers)
+SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=0))
+
+# Cache em disco das respostas bem-sucedidas: execuções repetidas da demonstração não
+# refazem a geocodificação/timezone das mesmas cidades no servidor
+GEO_CACHE_PATH = os.getenv("GEO_CACHE_PATH", "geo_cache.db")
+# Entradas mais antigas que o TTL são revalidadas com If-None-Match (quando há ETag)
+GEO_CACHE_TTL = float(os.getenv("GEO_CACHE_TTL", "86400"))  # segundos
+# O shelve não aceita acessos concorrentes: leituras e escritas passam por este lock
+_CACHE_LOCK = threading.Lock()
+
+# Marcador da última verificação bem-sucedida da API: execuções repetidas dentro
+# do TTL pulam o GET de verificação
+API_UP_FLAG = Path(os.getenv("ASTROMANUS_UP_FLAG", "~/.astromanus_up")).expanduser()
+API_UP_TTL = 60  # segundos
+
+# Cidades e corpos-base dos testes: cada requisição só acrescenta nome e cidade
+INTERNATIONAL_CITIES = (
+    "Paris, França",
+    "New York, USA",
+    "Tokyo, Japan",
+    "London, UK",
+    "Sydney, Australia"
+)
+INTERNATIONAL_NATAL_BASE = {
+    "year": 1995,
+    "month": 7,
+    "day": 10,
+    "hour": 12,
+    "minute": 0,
+    "house_system": "placidus"
+}
+ERROR_NATAL_BASE = {
+    "name": "Teste Erro",
+    "year": 1990,
+    "month": 6,
+    "day": 15,
+    "hour": 14,
+    "minute": 30,
+    "house_system": "placidus"
+}
+
+class _CachedResponse:
+    """Resposta servida do cache, com a mesma interface usada dos `requests.Response`"""
+    
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self._body = body
+    
+    def json(self):
+        return self._body
+    
+    @property
+    def text(self):
+        return json.dumps(self._body, ensure_ascii=False)
+
+def _normalize_city(city):
+    """NFC, minúsculas e espaços colapsados: "São Paulo,SP" e "são paulo, sp" coincidem"""
+    city = unicodedata.normalize("NFC", city).lower().strip()
+    city = re.sub(r"\s*,\s*", ", ", city)
+    return re.sub(r"\s+", " ", city)
+
+def _normalize_payload(value):
+    """Normaliza recursivamente os campos `city` do corpo da requisição"""
+    if isinstance(value, dict):
+        return {
+            key: _normalize_city(item) if key == "city" and isinstance(item, str) else _normalize_payload(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_normalize_payload(item) for item in value]
+    return value
+
+def _cache_key(url, payload):
+    """Chave do cache: SHA-1 da URL + corpo normalizado"""
+    canonical = json.dumps(_normalize_payload(payload), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(f"{url}\n{canonical}".encode("utf-8")).hexdigest()
+
+def _cache_get(key):
+    """Entrada em cache para a chave ({"response", "etag", "ts"}), ou None"""
+    with _CACHE_LOCK, shelve.open(GEO_CACHE_PATH) as db:
+        return db.get(key)
+
+def _cache_write(key, body, etag):
+    """Grava (ou renova) a entrada da chave"""
+    with _CACHE_LOCK, shelve.open(GEO_CACHE_PATH) as db:
+        db[key] = {"response": body, "etag": etag, "ts": time.time()}
+
+def _cache_fresh(entry):
+    """Resposta em cache se a entrada ainda estiver dentro do TTL, senão None"""
+    if entry is not None and time.time() - entry["ts"] < GEO_CACHE_TTL:
+        return _CachedResponse(200, entry["response"])
+    return None
+
+def _conditional_headers(entry):
+    """If-None-Match para revalidar uma entrada vencida que tenha ETag"""
+    if entry is not None and entry.get("etag"):
+        return {"If-None-Match": entry["etag"]}
+    return None
+
+def _cache_resolve(key, entry, response):
+    """
+    Trata a resposta de uma requisição (condicional ou não): 304 renova a entrada e
+    devolve o corpo em cache sem reprocessar; 200 é guardado com o ETag recebido.
+    """
+    if response.status_code == 304 and entry is not None:
+        _cache_write(key, entry["response"], entry["etag"])
+        return _CachedResponse(200, entry["response"])
+    if response.status_code == 200:
+        _cache_write(key, response.json(), response.headers.get("ETag"))
+    return response
+
+def cached_post(url, payload):
+    """
+    POST com cache persistente (shelve) por URL + corpo normalizado.
+    Só respostas 200 são guardadas; erros sempre vão ao servidor.
+    """
+    key = _cache_key(url, payload)
+    entry = _cache_get(key)
+    cached = _cache_fresh(entry)
+    if cached is not None:
+        return cached
+    
+    response = SESSION.post(url, json=payload, headers=_conditional_headers(entry))
+    return _cache_resolve(key, entry, response)
+
+async def _cached_post_many_async(url, payloads):
+    """
+    Versão assíncrona de `cached_post` para vários corpos: um único AsyncClient
+    (keep-alive) e as requisições que faltam no cache disparadas com asyncio.gather.
+    Retorna uma lista de (response, erro) na ordem dos corpos.
+    """
+    keys = [_cache_key(url, payload) for payload in payloads]
+    entries = [_cache_get(key) for key in keys]
+    results = [(_cache_fresh(entry), None) for entry in entries]
+    pending = [index for index, (cached, _) in enumerate(results) if cached is None]
+    if not pending:
+        return results
+    
+    async with httpx.AsyncClient(headers=headers, timeout=30) as client:
+        responses = await asyncio.gather(
+            *(
+                client.post(url, json=payloads[index], headers=_conditional_headers(entries[index]))
+                for index in pending
+            ),
+            return_exceptions=True
+        )
+    
+    for index, response in zip(pending, responses):
+        if isinstance(response, Exception):
+            results[index] = (None, response)
+        else:
+            results[index] = (_cache_resolve(keys[index], entries[index], response), None)
+    return results
+
 def test_natal_chart_with_city():
     """Testa criação de mapa natal usando nome da cidade"""
     print("=== TESTE: Mapa Natal com Cidade ===")
@@ -41,11 +216,7 @@ def test_natal_chart_with_city():
     }
     
     try:
-        response = requests.post(
-            f"{BASE_URL}/natal_chart",
-            json=natal_data,
-            headers=headers
-        )
+        response = cached_post(f"{BASE_URL}/natal_chart", natal_data)
         
         if response.status_code == 200:
             result = response.json()
@@ -95,11 +266,7 @@ def test_natal_chart_with_coordinates():
     }
     
     try:
-        response = requests.post(
-            f"{BASE_URL}/natal_chart",
-            json=natal_data,
-            headers=headers
-        )
+        response = cached_post(f"{BASE_URL}/natal_chart", natal_data)
         
         if response.status_code == 200:
             result = response.json()
@@ -152,11 +319,7 @@ def test_synastry_with_cities():
     }
     
     try:
-        response = requests.post(
-            f"{BASE_URL}/synastry",
-            json=synastry_data,
-            headers=headers
-        )
+        response = cached_post(f"{BASE_URL}/synastry", synastry_data)
         
         if response.status_code == 200:
             result = response.json()
@@ -179,47 +342,41 @@ def test_international_cities():
     """Testa com cidades internacionais"""
     print("=== TESTE: Cidades Internacionais ===")
     
-    cities_to_test = [
-        "Paris, França",
-        "New York, USA",
-        "Tokyo, Japan",
-        "London, UK",
-        "Sydney, Australia"
+    cities_to_test = INTERNATIONAL_CITIES
+    payloads = [
+        {**INTERNATIONAL_NATAL_BASE, "name": f"Teste {city}", "city": city}
+        for city in cities_to_test
     ]
+    url = f"{BASE_URL}/natal_chart"
     
-    for city in cities_to_test:
-        print(f"Testando: {city}")
+    # As cidades são independentes: as requisições (e geocodificações) se sobrepõem.
+    # Com httpx, um único event loop; sem ele, threads sobre a sessão compartilhada
+    if HTTPX_AVAILABLE:
+        results = asyncio.run(_cached_post_many_async(url, payloads))
+    else:
+        def resolve(payload):
+            try:
+                return cached_post(url, payload), None
+            except Exception as e:
+                return None, e
         
-        natal_data = {
-            "name": f"Teste {city}",
-            "year": 1995,
-            "month": 7,
-            "day": 10,
-            "hour": 12,
-            "minute": 0,
-            "city": city,
-            "house_system": "placidus"
-        }
+        with ThreadPoolExecutor(max_workers=len(payloads)) as executor:
+            results = list(executor.map(resolve, payloads))
+    
+    for city, (response, error) in zip(cities_to_test, results):
+        print(f"Testando: {city}")
         
-        try:
-            response = requests.post(
-                f"{BASE_URL}/natal_chart",
-                json=natal_data,
-                headers=headers
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                if 'resolved_location' in result:
-                    loc_info = result['resolved_location']
-                    print(f"  ✅ Resolvido: {loc_info.get('resolved_timezone', 'N/A')}")
-                else:
-                    print("  ✅ Sucesso (sem info de localização)")
+        if error is not None:
+            print(f"  ❌ Erro: {error}")
+        elif response.status_code == 200:
+            result = response.json()
+            if 'resolved_location' in result:
+                loc_info = result['resolved_location']
+                print(f"  ✅ Resolvido: {loc_info.get('resolved_timezone', 'N/A')}")
             else:
-                print(f"  ❌ Erro: {response.status_code}")
-                
-        except Exception as e:
-            print(f"  ❌ Erro: {e}")
+                print("  ✅ Sucesso (sem info de localização)")
+        else:
+            print(f"  ❌ Erro: {response.status_code}")
     
     print()
 
@@ -229,22 +386,10 @@ def test_error_cases():
     
     # Teste 1: Sem cidade nem coordenadas
     print("1. Sem localização:")
-    natal_data = {
-        "name": "Teste Erro",
-        "year": 1990,
-        "month": 6,
-        "day": 15,
-        "hour": 14,
-        "minute": 30,
-        "house_system": "placidus"
-    }
+    natal_data = ERROR_NATAL_BASE
     
     try:
-        response = requests.post(
-            f"{BASE_URL}/natal_chart",
-            json=natal_data,
-            headers=headers
-        )
+        response = SESSION.post(f"{BASE_URL}/natal_chart", json=natal_data)
         
         if response.status_code == 400:
             print("  ✅ Erro esperado capturado corretamente")
@@ -256,23 +401,10 @@ def test_error_cases():
     
     # Teste 2: Cidade inválida
     print("2. Cidade inexistente:")
-    natal_data = {
-        "name": "Teste Erro",
-        "year": 1990,
-        "month": 6,
-        "day": 15,
-        "hour": 14,
-        "minute": 30,
-        "city": "CidadeQueNaoExiste123456789",
-        "house_system": "placidus"
-    }
+    natal_data = {**ERROR_NATAL_BASE, "city": "CidadeQueNaoExiste123456789"}
     
     try:
-        response = requests.post(
-            f"{BASE_URL}/natal_chart",
-            json=natal_data,
-            headers=headers
-        )
+        response = SESSION.post(f"{BASE_URL}/natal_chart", json=natal_data)
         
         if response.status_code == 400:
             print("  ✅ Erro esperado capturado corretamente")
@@ -284,6 +416,13 @@ def test_error_cases():
     
     print()
 
+def api_recently_up():
+    """True se a API respondeu a uma verificação nos últimos API_UP_TTL segundos"""
+    try:
+        return time.time() - os.path.getmtime(API_UP_FLAG) < API_UP_TTL
+    except FileNotFoundError:
+        return False
+
 def main():
     """Executa todos os testes"""
     print("🌟 DEMONSTRAÇÃO DO ASTROMANUS V2.1.0 🌟")
@@ -292,14 +431,16 @@ def main():
     print()
     
     # Verificar se a API está rodando
-    try:
-        response = requests.get(f"{BASE_URL.replace('/api/v1', '')}/")
-        if response.status_code != 200:
-            print("❌ API não está respondendo. Certifique-se de que o servidor está rodando.")
+    if not api_recently_up():
+        try:
+            response = SESSION.get(f"{BASE_URL.replace('/api/v1', '')}/")
+            if response.status_code != 200:
+                print("❌ API não está respondendo. Certifique-se de que o servidor está rodando.")
+                return
+        except:
+            print("❌ Não foi possível conectar à API. Certifique-se de que o servidor está rodando em http://localhost:8000")
             return
-    except:
-        print("❌ Não foi possível conectar à API. Certifique-se de que o servidor está rodando em http://localhost:8000")
-        return
+        API_UP_FLAG.touch()
     
     print("✅ API está respondendo!")
     print()
@@ -323,4 +464,7 @@ def main():
     print("- ✅ Cache inteligente para melhor performance")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    try:
+        main()
+    finally:
+        SESSION.close()
\ No newline at end of file
@@ -7,44 +7,84 @@ similares aos exemplos fornecidos.
 """
 import sys
 import os
+import gzip
+import re
 from pathlib import Path
 
-# Adicionar o diretório app ao path para importar os módulos
-sys.path.append(str(Path(__file__).parent / 'app'))
+# Raiz do projeto (que contém o pacote app) no início do path: é consultada
+# primeiro, em vez de por último, em cada import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-from kerykeion import AstrologicalSubject
+from app.utils.subject_cache import cached_subject
 from app.svg.enhanced_svg_generator import EnhancedSVGGenerator
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# orjson é opcional: serializa o relatório em C e grava bytes diretamente
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# Elementos de qualidade procurados nos SVGs de referência, numa única varredura
+_QUALITY_INDICATORS = (
+    b"viewBox='0 0 820 550.0'",
+    b"xmlns:kr=",
+    b"kerykeion-chart-color",
+    b"preserveAspectRatio"
+)
+_QUALITY_RE = re.compile(b"|".join(re.escape(indicator) for indicator in _QUALITY_INDICATORS))
+_SCAN_CHUNK_SIZE = 1 << 20
+
+# Os SVGs de saída são gravados como .svgz (gzip), que os navegadores exibem diretamente
+_SVGZ_COMPRESSLEVEL = 6
+
+def _scan_svg_file(path):
+    """
+    Conta linhas e indicadores de qualidade de um SVG lendo-o em blocos, sem
+    carregar o arquivo inteiro na memória.
+    
+    Returns:
+        Tupla (número de linhas, quantidade de indicadores encontrados)
+    """
+    overlap = max(len(indicator) for indicator in _QUALITY_INDICATORS) - 1
+    lines = 0
+    found = set()
+    tail = b""
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(_SCAN_CHUNK_SIZE)
+            if not chunk:
+                break
+            lines += chunk.count(b'\n')
+            # Com todos os indicadores já encontrados, o resto do arquivo só conta linhas
+            if len(found) == len(_QUALITY_INDICATORS):
+                continue
+            # Sobreposição com o bloco anterior: indicadores que cruzam a fronteira
+            window = tail + chunk
+            found.update(_QUALITY_RE.findall(window))
+            tail = window[-overlap:]
+    return lines, len(found)
+
 def create_test_subjects():
-    """Cria subjects de teste para demonstração."""
+    """Cria subjects de teste para demonstração (via cache compartilhado de subjects)."""
     
-    # Subject natal de teste (João)
-    natal_subject = AstrologicalSubject(
-        name="João",
-        year=1995,
-        month=3,
-        day=15,
-        hour=14,
-        minute=30,
-        lat=40.7128,  # Nova York
-        lon=-74.0060,
-        tz_str="America/New_York"
+    # Subject natal de teste (João), em Nova York
+    natal_subject = cached_subject(
+        "João",
+        1995, 3, 15, 14, 30,
+        40.7128, -74.0060, "America/New_York"
     )
     
     # Subject de trânsito (data atual)
     now = datetime.now()
-    transit_subject = AstrologicalSubject(
-        name="Trânsitos",
-        year=now.year,
-        month=now.month,
-        day=now.day,
-        hour=now.hour,
-        minute=now.minute,
-        lat=40.7128,  # Nova York
-        lon=-74.0060,
-        tz_str="America/New_York"
+    transit_subject = cached_subject(
+        "Trânsitos",
+        now.year, now.month, now.day, now.hour, now.minute,
+        40.7128, -74.0060, "America/New_York"
     )
     
     return natal_subject, transit_subject
@@ -82,34 +122,54 @@ def demonstrate_enhanced_svg():
             {"chart_type": "synastry", "theme": "light", "filename": "joao_sinastria_light.svg"},
         ]
         
+        # Temas agrupados por tipo de chart: uma chamada de generate_theme_variants por tipo
+        themes_by_type = {}
+        for test_case in test_cases:
+            themes_by_type.setdefault(test_case["chart_type"], []).append(test_case["theme"])
+        
+        def render_chart_type(chart_type):
+            try:
+                return generator.generate_theme_variants(
+                    chart_type=chart_type,
+                    themes=tuple(themes_by_type[chart_type]),
+                    high_quality=True
+                )
+            except Exception as e:
+                return e
+        
+        # Os tipos de chart são independentes (o gerador só é lido): renderização em paralelo
+        with ThreadPoolExecutor(max_workers=len(themes_by_type)) as executor:
+            variants = dict(zip(themes_by_type, executor.map(render_chart_type, themes_by_type)))
+        
         results = []
         
         for i, test_case in enumerate(test_cases, 1):
             print(f"\n🎯 Teste {i}/{len(test_cases)}: {test_case['chart_type']} - {test_case['theme']}")
             
             try:
-                # Gerar SVG aprimorado
-                svg_content = generator.generate_enhanced_svg(
-                    chart_type=test_case["chart_type"],
-                    theme=test_case["theme"],
-                    show_aspects=True,
-                    high_quality=True
-                )
+                # SVG aprimorado já gerado para o tipo de chart
+                generated = variants[test_case["chart_type"]]
+                if isinstance(generated, Exception):
+                    raise generated
+                svg_content = generated[test_case["theme"]]
                 
-                # Salvar arquivo
-                output_file = output_dir / test_case["filename"]
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    f.write(svg_content)
+                # Salvar arquivo comprimido
+                output_file = (output_dir / test_case["filename"]).with_suffix(".svgz")
+                compressed = gzip.compress(svg_content, compresslevel=_SVGZ_COMPRESSLEVEL)
+                with open(output_file, 'wb') as f:
+                    f.write(compressed)
                 
-                # Informações do arquivo
-                file_size = len(svg_content.encode('utf-8'))
-                line_count = svg_content.count('\n')
+                # Informações do arquivo (tamanho em disco e do SVG descomprimido)
+                file_size = len(compressed)
+                line_count = svg_content.count(b'\n')
                 
                 result = {
                     "test_case": test_case,
                     "output_file": str(output_file),
                     "file_size_bytes": file_size,
                     "file_size_kb": round(file_size / 1024, 2),
+                    "uncompressed_size_bytes": len(svg_content),
+                    "uncompressed_size_kb": round(len(svg_content) / 1024, 2),
                     "line_count": line_count,
                     "status": "success"
                 }
@@ -118,7 +178,7 @@ def demonstrate_enhanced_svg():
                 
                 print(f"   ✅ Gerado com sucesso!")
                 print(f"   📄 Arquivo: {output_file.name}")
-                print(f"   📏 Tamanho: {result['file_size_kb']} KB ({line_count} linhas)")
+                print(f"   📏 Tamanho: {result['file_size_kb']} KB comprimido, {result['uncompressed_size_kb']} KB original ({line_count} linhas)")
                 
             except Exception as e:
                 print(f"   ❌ Erro: {str(e)}")
@@ -143,8 +203,13 @@ def demonstrate_enhanced_svg():
         
         # Salvar relatório JSON
         report_file = output_dir / "relatorio_svg_aprimorado.json"
-        with open(report_file, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=2, ensure_ascii=False)
+        if ORJSON_AVAILABLE:
+            with open(report_file, 'wb') as f:
+                f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            # json.dump grava o relatório em partes (iterencode), sem montar a string inteira
+            with open(report_file, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
         
         print(f"   📊 Relatório salvo: {report_file}")
         
@@ -158,25 +223,13 @@ def demonstrate_enhanced_svg():
         
         for example_file in example_files:
             if example_file.exists():
-                with open(example_file, 'r', encoding='utf-8') as f:
-                    example_content = f.read()
-                
-                example_size = len(example_content.encode('utf-8'))
-                example_lines = example_content.count('\n')
+                example_size = example_file.stat().st_size
+                example_lines, quality_score = _scan_svg_file(example_file)
                 
                 print(f"   📄 {example_file.name}:")
                 print(f"      📏 Tamanho: {round(example_size / 1024, 2)} KB ({example_lines} linhas)")
                 
-                # Verificar se contém elementos de qualidade
-                quality_indicators = [
-                    "viewBox='0 0 820 550.0'",
-                    "xmlns:kr=",
-                    "kerykeion-chart-color",
-                    "preserveAspectRatio"
-                ]
-                
-                quality_score = sum(1 for indicator in quality_indicators if indicator in example_content)
-                print(f"      🎯 Indicadores de qualidade: {quality_score}/{len(quality_indicators)}")
+                print(f"      🎯 Indicadores de qualidade: {quality_score}/{len(_QUALITY_INDICATORS)}")
         
         # Resumo final
         print("\n" + "=" * 60)
@@ -189,7 +242,7 @@ def demonstrate_enhanced_svg():
         
         if report['successful_tests'] > 0:
             avg_size = sum(r.get('file_size_kb', 0) for r in results if r.get('status') == 'success') / report['successful_tests']
-            print(f"📏 Tamanho médio dos SVGs: {round(avg_size, 2)} KB")
+            print(f"📏 Tamanho médio dos SVGs (.svgz): {round(avg_size, 2)} KB")
         
         print("\n🎨 Temas disponíveis:", ", ".join(report['available_themes']))
         print("📊 Tipos de chart disponíveis:", ", ".join(report['available_chart_types']))
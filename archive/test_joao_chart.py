@@ -6,13 +6,26 @@ Testa diretamente as funcionalidades do gerador SVG aprimorado
 
 import sys
 import os
-sys.path.append('/home/ubuntu/upload/AstroManus')
+import shutil
+import subprocess
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.models import SVGChartRequest, NatalChartRequest
 from app.utils.astro_helpers import create_subject
 from app.svg.enhanced_svg_generator import EnhancedSVGGenerator
 import json
 
+def _import_cairosvg():
+    """Importa o cairosvg uma única vez (None se ausente ou sem a libcairo do sistema)"""
+    try:
+        import cairosvg
+        return cairosvg
+    except (ImportError, OSError):
+        return None
+
+cairosvg = _import_cairosvg()
+_svg2png = cairosvg.svg2png if cairosvg is not None else None
+
 def test_joao_chart():
     """Testa o mapa do João (13/10/1997 às 22h em Fortaleza - CE)"""
     
@@ -71,10 +84,10 @@ def test_joao_chart():
     
     # Salvar SVG
     svg_filename = "/home/ubuntu/upload/AstroManus/joao_mapa_natal_light.svg"
-    with open(svg_filename, 'w', encoding='utf-8') as f:
+    with open(svg_filename, 'wb') as f:
         f.write(svg_light)
     print(f"   ✓ SVG salvo: {svg_filename}")
-    print(f"   ✓ Tamanho: {len(svg_light):,} caracteres")
+    print(f"   ✓ Tamanho: {len(svg_light):,} bytes")
     print()
     
     # Gerar SVG com tema colorful (fundo branco colorido)
@@ -88,61 +101,71 @@ def test_joao_chart():
     
     # Salvar SVG colorful
     svg_colorful_filename = "/home/ubuntu/upload/AstroManus/joao_mapa_natal_colorful.svg"
-    with open(svg_colorful_filename, 'w', encoding='utf-8') as f:
+    with open(svg_colorful_filename, 'wb') as f:
         f.write(svg_colorful)
     print(f"   ✓ SVG colorful salvo: {svg_colorful_filename}")
-    print(f"   ✓ Tamanho: {len(svg_colorful):,} caracteres")
+    print(f"   ✓ Tamanho: {len(svg_colorful):,} bytes")
     print()
     
-    return svg_filename, svg_colorful_filename
+    # Conteúdos já em memória seguem junto, para a conversão não reler os arquivos
+    return (svg_filename, svg_light), (svg_colorful_filename, svg_colorful)
 
-def convert_svg_to_png(svg_file, png_file):
-    """Converte SVG para PNG usando cairosvg"""
-    try:
-        import cairosvg
-        cairosvg.svg2png(url=svg_file, write_to=png_file, background_color='white')
-        print(f"   ✓ PNG gerado: {png_file}")
+def convert_svgs_to_png(jobs):
+    """
+    Converte SVGs para PNG: com cairosvg, direto do conteúdo em memória; sem ele,
+    numa única sessão do inkscape (--shell) para todos os arquivos.
+    
+    Args:
+        jobs: Lista de tuplas (svg_file, svg_content em bytes, png_file)
+    """
+    if _svg2png is not None:
+        for svg_file, svg_content, png_file in jobs:
+            _svg2png(bytestring=svg_content, write_to=png_file, background_color='white')
+            print(f"   ✓ PNG gerado: {png_file}")
         return True
-    except ImportError:
-        print("   ⚠ cairosvg não instalado, tentando com inkscape...")
-        try:
-            import subprocess
-            result = subprocess.run([
-                'inkscape', 
-                '--export-type=png',
-                '--export-background=white',
-                '--export-filename=' + png_file,
-                svg_file
-            ], capture_output=True, text=True)
-            if result.returncode == 0:
-                print(f"   ✓ PNG gerado com inkscape: {png_file}")
-                return True
-            else:
-                print(f"   ✗ Erro com inkscape: {result.stderr}")
-                return False
-        except Exception as e:
-            print(f"   ✗ Erro ao converter para PNG: {e}")
-            return False
+    
+    print("   ⚠ cairosvg não instalado, tentando com inkscape...")
+    commands = "".join(
+        f"file-open:{svg_file}; export-type:png; export-background:white; "
+        f"export-filename:{png_file}; export-do; file-close\n"
+        for svg_file, _, png_file in jobs
+    )
+    try:
+        result = subprocess.run(
+            ['inkscape', '--shell'],
+            input=commands + "quit\n", capture_output=True, text=True
+        )
+    except Exception as e:
+        print(f"   ✗ Erro ao converter para PNG: {e}")
+        return False
+    
+    converted = [png_file for _, _, png_file in jobs if os.path.exists(png_file)]
+    for png_file in converted:
+        print(f"   ✓ PNG gerado com inkscape: {png_file}")
+    if result.returncode != 0 or len(converted) != len(jobs):
+        print(f"   ✗ Erro com inkscape: {result.stderr}")
+        return False
+    return True
 
 if __name__ == "__main__":
+    # Sem cairosvg nem inkscape não há como gerar os PNGs: falha antes de calcular o mapa
+    if cairosvg is None and shutil.which('inkscape') is None:
+        print("❌ Instale o cairosvg (pip install cairosvg) ou o inkscape antes de executar este teste")
+        sys.exit(2)
+    
     try:
-        svg_light, svg_colorful = test_joao_chart()
+        (svg_light, svg_light_content), (svg_colorful, svg_colorful_content) = test_joao_chart()
         
         print("6. Convertendo SVGs para PNG...")
         
-        # Instalar cairosvg se necessário
-        try:
-            import cairosvg
-        except ImportError:
-            print("   Instalando cairosvg...")
-            os.system("pip3 install cairosvg")
-        
         # Converter para PNG
         png_light = "/home/ubuntu/upload/AstroManus/joao_mapa_natal_light.png"
         png_colorful = "/home/ubuntu/upload/AstroManus/joao_mapa_natal_colorful.png"
         
-        convert_svg_to_png(svg_light, png_light)
-        convert_svg_to_png(svg_colorful, png_colorful)
+        convert_svgs_to_png([
+            (svg_light, svg_light_content, png_light),
+            (svg_colorful, svg_colorful_content, png_colorful)
+        ])
         
         print()
         print("=== TESTE CONCLUÍDO COM SUCESSO ===")
@@ -5,8 +5,9 @@ Teste simples do gerador de SVG aprimorado.
 import sys
 from pathlib import Path
 
-# Adicionar o diretório app ao path
-sys.path.append(str(Path(__file__).parent / 'app'))
+# Raiz do projeto (que contém o pacote app) no início do path: é consultada
+# primeiro, em vez de por último, em cada import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 try:
     # Testar importações básicas
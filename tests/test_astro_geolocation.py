@@ -0,0 +1,59 @@
+import sys
+import os
+import asyncio
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+
+from app.utils import astro_geolocation
+
+GEO_DATA = {"address": "Fortaleza, Ceará, Brasil", "latitude": -3.7319, "longitude": -38.5434}
+
+
+@pytest.fixture
+def offline_lookups(monkeypatch):
+    # Sem rede: geocodificação e elevação fixas; caches novos só em memória, para não
+    # ler nem apagar os caches persistidos do usuário
+    for cache_name in ("_geocoding_cache", "_timezone_cache", "_elevation_cache", "_astro_data_cache"):
+        monkeypatch.setattr(astro_geolocation, cache_name, astro_geolocation.GeocodingCache())
+
+    async def geocode(location_name, use_cache=True):
+        return dict(GEO_DATA)
+
+    async def elevation(latitude, longitude, use_cache=True, session=None):
+        return 21.0
+
+    monkeypatch.setattr(astro_geolocation, "geocode_location_async", geocode)
+    monkeypatch.setattr(astro_geolocation, "get_elevation_data_async", elevation)
+    monkeypatch.setattr(astro_geolocation, "geocode_location", lambda location_name, use_cache=True: dict(GEO_DATA))
+    monkeypatch.setattr(astro_geolocation, "get_elevation_data", lambda latitude, longitude, use_cache=True: 21.0)
+
+
+def test_async_timezone_lookup_runs_off_the_event_loop(offline_lookups, monkeypatch):
+    threads = []
+    get_timezone_data = astro_geolocation.get_timezone_data
+
+    def recording_timezone_data(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return get_timezone_data(*args, **kwargs)
+
+    monkeypatch.setattr(astro_geolocation, "get_timezone_data", recording_timezone_data)
+
+    result = asyncio.run(astro_geolocation.get_astro_location_data_async("Fortaleza", use_cache=False))
+
+    assert result["timezone"]["timezone_name"] == "America/Fortaleza"
+    assert result["location"]["elevation"] == 21.0
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_cache_hit_returns_the_callers_location_name(offline_lookups):
+    first = astro_geolocation.get_astro_location_data("Fortaleza")
+    second = astro_geolocation.get_astro_location_data("  FORTALEZA ")
+    third = asyncio.run(astro_geolocation.get_astro_location_data_async("fortaleza"))
+
+    assert first["location"]["name"] == "Fortaleza"
+    assert second["location"]["name"] == "  FORTALEZA "
+    assert third["location"]["name"] == "fortaleza"
+    assert second["location"]["latitude"] == first["location"]["latitude"]
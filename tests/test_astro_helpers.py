@@ -0,0 +1,42 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app.models import PlanetPosition
+from app.utils.astro_helpers import calculate_aspects, create_subject, extract_all_planets
+
+NATAL_DATA = {
+    "name": "Joao",
+    "year": 1997, "month": 10, "day": 13, "hour": 22, "minute": 0,
+    "latitude": -3.7319, "longitude": -38.5434, "tz_str": "America/Fortaleza",
+}
+
+
+def test_create_subject_returns_independent_copies():
+    first, _ = create_subject(dict(NATAL_DATA), "Teste")
+    sun_position = first.sun.position
+    first.sun.position = 0.0
+
+    second, _ = create_subject(dict(NATAL_DATA), "Teste")
+    assert second.sun.position == sun_position
+    assert second.sun is not first.sun
+
+
+def test_natal_aspects_list_each_pair_once():
+    subject, _ = create_subject(dict(NATAL_DATA), "Teste")
+    planets = extract_all_planets(subject)
+
+    aspects = calculate_aspects(planets, planets)
+
+    pairs = [(a["p1"], a["p2"]) for a in aspects]
+    assert aspects
+    assert all(p1 != p2 for p1, p2 in pairs)
+    assert len({frozenset(pair) for pair in pairs}) == len(pairs)
+
+
+def test_extracted_planets_match_validated_models():
+    subject, _ = create_subject(dict(NATAL_DATA), "Teste")
+
+    for planet in extract_all_planets(subject).values():
+        assert PlanetPosition.model_validate(planet.model_dump()) == planet
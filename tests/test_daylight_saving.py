@@ -0,0 +1,33 @@
+import sys
+import os
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+
+from app.utils.daylight_saving import get_timezone_info, get_timezone_offset_with_dst, is_daylight_saving_active
+
+
+@pytest.mark.parametrize("year, tz_name", [
+    (1985, "America/Sao_Paulo"),
+    (2018, "America/Sao_Paulo"),
+    (2020, "America/New_York"),
+    (2024, "Europe/London"),
+    (2024, "Australia/Sydney"),
+    (2024, "America/Fortaleza"),
+])
+def test_dst_table_matches_zoneinfo(year, tz_name):
+    zone = ZoneInfo(tz_name)
+    day = date(year, 1, 1)
+    while day.year == year:
+        noon = datetime(day.year, day.month, day.day, 12, tzinfo=zone)
+        expected_offset = noon.utcoffset().total_seconds() / 3600
+
+        assert is_daylight_saving_active(day, tz_name) is bool(noon.dst())
+        assert get_timezone_offset_with_dst(day, tz_name) == expected_offset
+        info = get_timezone_info(day, tz_name)
+        assert info["is_dst_active"] is bool(noon.dst())
+        assert info["utc_offset"] == expected_offset
+        day += timedelta(days=1)
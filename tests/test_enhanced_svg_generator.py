@@ -0,0 +1,114 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from kerykeion import AstrologicalSubject
+
+from app.svg.enhanced_svg_generator import EnhancedSVGGenerator, _minify_svg, _svg_cache
+from app.utils.subject_cache import cached_subject
+
+
+@pytest.fixture
+def generator():
+    _svg_cache.clear()
+    natal = cached_subject("Joao", 1997, 10, 13, 22, 0, -3.7319, -38.5434, "America/Fortaleza")
+    transit = cached_subject("Transito", 2024, 6, 1, 12, 0, -3.7319, -38.5434, "America/Fortaleza")
+    yield EnhancedSVGGenerator(natal, transit)
+    _svg_cache.clear()
+
+
+def test_theme_variants_render_each_theme(generator):
+    themes = ("light", "dark", "colorful")
+    variants = generator.generate_theme_variants("natal", themes)
+
+    assert list(variants) == list(themes)
+    assert len(set(variants.values())) == len(themes)
+    for theme in themes:
+        paper = EnhancedSVGGenerator.THEME_CONFIGURATIONS[theme]["paper_1"].encode()
+        assert paper in variants[theme]
+
+
+def test_theme_variants_match_single_theme_render(generator):
+    variants = generator.generate_theme_variants("natal", ("light", "dark", "colorful"))
+    _svg_cache.clear()
+
+    for theme, svg in variants.items():
+        assert generator.generate_enhanced_svg("natal", theme) == svg
+
+
+def test_minify_keeps_text_and_style_content():
+    svg = (
+        b'<svg>\n  <style>\n    .a { stroke-width: 1.23456; }\n  </style>\n'
+        b'  <circle cx="10.123456" cy="2.5" r="3.98765"/>\n'
+        b'  <text x="1.23456"><tspan>Sol</tspan> <tspan>em 12.34567</tspan></text>\n</svg>'
+    )
+    minified = _minify_svg(svg)
+
+    assert b'<circle cx="10.12" cy="2.5" r="3.99"/>' in minified
+    assert b'.a { stroke-width: 1.23456; }' in minified
+    assert b'<text x="1.23456"><tspan>Sol</tspan> <tspan>em 12.34567</tspan></text>' in minified
+
+
+def test_minify_is_opt_in(generator):
+    assert generator.generate_enhanced_svg("natal", "light") == generator.generate_enhanced_svg(
+        "natal", "light", minify=False
+    )
+    assert generator.generate_enhanced_svg("natal", "light", minify=True) != generator.generate_enhanced_svg(
+        "natal", "light"
+    )
+
+
+def test_cache_key_includes_rendered_location():
+    _svg_cache.clear()
+    svgs = {}
+    for city in ("Fortaleza", "Caucaia"):
+        subject = AstrologicalSubject(
+            "Joao", 1997, 10, 13, 22, 0, city=city, nation="BR",
+            lng=-38.5434, lat=-3.7319, tz_str="America/Fortaleza", online=False
+        )
+        svgs[city] = EnhancedSVGGenerator(subject).generate_enhanced_svg("natal", "light")
+    _svg_cache.clear()
+
+    assert b"Fortaleza" in svgs["Fortaleza"]
+    assert b"Caucaia" in svgs["Caucaia"]
+
+
+def test_generate_batch_matches_single_renders(generator):
+    natal = generator.natal_subject
+    other = cached_subject("Maria", 1985, 3, 21, 6, 30, -23.5505, -46.6333, "America/Sao_Paulo")
+
+    batch = EnhancedSVGGenerator.generate_batch([natal, other], "natal", "dark")
+
+    assert batch == [EnhancedSVGGenerator(subject).generate_enhanced_svg("natal", "dark") for subject in (natal, other)]
+    assert EnhancedSVGGenerator.generate_batch([]) == []
+
+
+def test_multiple_formats_without_cairo_raises_clear_error(generator):
+    from app.utils import image_converter
+
+    if image_converter.CAIROSVG_AVAILABLE:
+        pytest.skip("cairosvg disponível neste ambiente")
+    with pytest.raises(RuntimeError, match="cairosvg"):
+        generator.generate_multiple_formats("natal", "light", ["svg", "png", "pdf"])
+    assert list(generator.generate_multiple_formats("natal", "light", ["svg"])) == ["svg"]
+
+
+def test_active_aspects_use_kerykeion_names():
+    aspects = EnhancedSVGGenerator._build_active_aspects({
+        "trine": {"active": True, "orb": 8},
+        "sesqui_square": {"active": True, "orb": 3},
+        "quintile": {"active": False, "orb": 2},
+    }, orb_factor=0.5)
+
+    assert aspects == [{"name": "trine", "orb": 4.0}, {"name": "sesquiquadrate", "orb": 1.5}]
+
+
+def test_custom_aspects_settings_change_the_chart(generator):
+    default_svg = generator.generate_enhanced_svg("natal", "light")
+    custom_svg = generator.generate_enhanced_svg(
+        "natal", "light", custom_settings={"aspects_settings": {"conjunction": {"active": True, "orb": 1}}}
+    )
+
+    assert custom_svg != default_svg
@@ -0,0 +1,70 @@
+import sys
+import os
+import json
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.utils.astro_geolocation import GeocodingCache, _MISS
+
+
+@pytest.fixture
+def frequent_thread_switches():
+    # Trocas de thread frequentes tornam as corridas no OrderedDict reproduzíveis
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_cache_concurrent_get_set_with_evictions(frequent_thread_switches):
+    # TTL curtíssimo e poucas chaves: leituras, expirações e descartes disputam as mesmas entradas
+    cache = GeocodingCache(max_size=32, ttl=1e-5)
+
+    def worker(seed):
+        for i in range(50000):
+            key = (seed * 7 + i) % 3
+            if cache.get(key) is None:
+                cache.set(key, {"n": key})
+        return True
+
+    for _ in range(3):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            assert all(executor.map(worker, range(8)))
+    assert cache.size() <= 32
+
+
+def test_cache_negative_result_is_miss_marker():
+    cache = GeocodingCache(max_size=4)
+    cache.set("nowhere", None)
+    assert cache.get("nowhere") is _MISS
+    assert cache.get("unknown") is None
+
+
+def test_cache_persists_values_as_json(tmp_path):
+    path = str(tmp_path / "geo.db")
+    cache = GeocodingCache(persist_path=path)
+    cache.set("sao paulo", {"latitude": -23.55, "longitude": -46.63})
+    cache.set("nowhere", None)
+    cache.flush()
+
+    reloaded = GeocodingCache(persist_path=path)
+    assert reloaded.get("sao paulo") == {"latitude": -23.55, "longitude": -46.63}
+    assert reloaded.get("nowhere") is _MISS
+
+    stored = reloaded._get_db().execute("SELECT v FROM kv_json WHERE k = 'sao paulo'").fetchone()[0]
+    assert json.loads(stored) == {"latitude": -23.55, "longitude": -46.63}
+
+
+def test_cache_ignores_undecodable_rows(tmp_path):
+    path = str(tmp_path / "geo.db")
+    cache = GeocodingCache(persist_path=path)
+    db = cache._get_db()
+    db.execute("INSERT INTO kv_json (k, v, ts) VALUES (?, ?, ?)", ("bad", b"\x80\x04not json", time.time()))
+    db.commit()
+
+    assert GeocodingCache(persist_path=path).get("bad") is None
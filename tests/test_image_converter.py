@@ -0,0 +1,34 @@
+import sys
+import os
+import struct
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+
+pytest.importorskip("resvg_py")
+
+from app.utils.image_converter import ImageConverter, RESVG_AVAILABLE
+
+SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="40" height="20" viewBox="0 0 40 20">'
+    '<rect width="40" height="20" fill="#ff6b6b"/></svg>'
+)
+
+
+def _png_size(png: bytes):
+    assert png.startswith(b"\x89PNG\r\n\x1a\n")
+    return struct.unpack(">II", png[16:24])
+
+
+def test_resvg_is_the_png_renderer():
+    assert RESVG_AVAILABLE
+
+
+@pytest.mark.parametrize("svg_content", [SVG, SVG.encode("utf-8")])
+def test_svg_to_png_with_resvg(svg_content):
+    assert _png_size(ImageConverter.svg_to_png(svg_content)) == (40, 20)
+
+
+def test_svg_to_png_with_resvg_honours_width():
+    assert _png_size(ImageConverter.svg_to_png(SVG, width=80)) == (80, 40)
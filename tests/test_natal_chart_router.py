@@ -0,0 +1,27 @@
+import sys
+import os
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app.routers.natal_chart_router import _unique_aspects
+
+
+def _aspect(p2_name, aspect_name):
+    return SimpleNamespace(p2_name=p2_name, aspect_name=aspect_name, orbit=1.5)
+
+
+def test_unique_aspects_keeps_each_pair_once():
+    # Cada aspecto aparece nas listas dos dois planetas, como o Kerykeion emite
+    sun = SimpleNamespace(name="Sun", aspects=[_aspect("Moon", "trine"), _aspect("Mars", "square"), _aspect("Chiron", "sextile")])
+    moon = SimpleNamespace(name="Moon", aspects=[_aspect("Sun", "trine"), _aspect("Mars", "trine")])
+    mars = SimpleNamespace(name="Mars", aspects=[_aspect("Sun", "square"), _aspect("Moon", "trine"), _aspect("Sun", "square")])
+
+    pairs = [(p1_name, asp.p2_name, asp.aspect_name) for p1_name, asp in _unique_aspects([sun, moon, None, mars])]
+
+    assert pairs == [
+        ("Sun", "Moon", "trine"),
+        ("Sun", "Mars", "square"),
+        ("Sun", "Chiron", "sextile"),
+        ("Moon", "Mars", "trine"),
+    ]